@@ -11,7 +11,10 @@ Endpoints principales:
 - GET /config - Configuración del OS
 - POST /agents/{agent_id}/chat - Chat con agentes
 - GET /sessions - Listar sesiones
+- POST /api/meta-agent/plan - Crear plan de agente
+- POST /api/meta-agent/plan-stream - Crear plan con streaming SSE
 - POST /api/meta-agent/generate - Generar código de agente
+- POST /api/agent-host/run/{agent} - Ejecutar un agente generado
 """
 
 import os
@@ -86,6 +89,27 @@ agent_os = AgentOS(
 from src.infrastructure.api.meta_routes import router as meta_router
 agent_os.app.include_router(meta_router, prefix="/api/meta-agent", tags=["Meta-Agent"])
 
+# Sesiones de aclaración (estado en el servidor, REST + WebSocket)
+from src.infrastructure.api.session_routes import router as session_router
+agent_os.app.include_router(session_router, prefix="/api/meta-agent/sessions", tags=["Meta-Agent"])
+
+# Trabajos de generación en segundo plano (cola SQLite con prioridades)
+from src.infrastructure.api.job_routes import router as job_router
+agent_os.app.include_router(job_router, prefix="/api/meta-agent/jobs", tags=["Meta-Agent"])
+
+# Host de agentes generados (pool LRU de instancias calientes)
+from src.infrastructure.api.host_routes import router as host_router
+agent_os.app.include_router(host_router, prefix="/api/agent-host", tags=["Agent-Host"])
+
+# Control de admisión: 429 + Retry-After cuando las rutas con LLM se saturan
+# (se registra antes que CORS para que los 429 también lleven sus cabeceras)
+from src.infrastructure.api.admission import AdmissionControlMiddleware, default_route_limits
+agent_os.app.add_middleware(AdmissionControlMiddleware, limits=default_route_limits())
+
+# Compresión brotli/gzip de JSON y SSE (los streams se vacían evento a evento)
+from src.infrastructure.api.compression import CompressionMiddleware
+agent_os.app.add_middleware(CompressionMiddleware)
+
 # CORS para desarrollo (permitir Lantui conectarse desde localhost)
 from fastapi.middleware.cors import CORSMiddleware
 agent_os.app.add_middleware(
@@ -113,9 +137,20 @@ def serve_agentos():
     print("  • Analyzer Agent (analyzer_agent)")
     print("  • Planner Agent (planner_agent)")
     print("\n🚀 Endpoints custom:")
+    print("  • POST /api/meta-agent/plan")
+    print("  • POST /api/meta-agent/plan-stream")
     print("  • POST /api/meta-agent/generate")
     print("  • POST /api/meta-agent/generate-stream")
     print("  • GET  /api/meta-agent/generated")
+    print("  • GET  /api/meta-agent/generated/events")
+    print("  • GET  /api/meta-agent/generated/{filename}")
+    print("  • GET  /api/meta-agent/generated/bundle")
+    print("  • GET  /api/meta-agent/generated/{filename}/versions")
+    print("  • POST /api/meta-agent/sessions")
+    print("  • WS   /api/meta-agent/sessions/ws")
+    print("  • POST /api/meta-agent/jobs")
+    print("  • GET  /api/agent-host/agents")
+    print("  • POST /api/agent-host/run/{agent}")
     print("\n" + "="*60 + "\n")
     
     uvicorn.run(
@@ -0,0 +1,138 @@
+"""
+Sesiones de aclaración del Meta-Agente.
+
+Mantiene en el servidor el estado del ciclo analizar → preguntar →
+responder que ``MetaAgent.interactive_creation`` ejecuta en la terminal,
+de modo que los clientes solo envían la respuesta nueva en cada turno.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from src.application.services.meta_agent import AgentPlan
+
+# Respuesta del analyzer cuando tiene toda la información
+INFO_COMPLETA = "INFO_COMPLETA"
+
+# Máximo de rondas de preguntas (igual que el modo interactivo)
+MAX_TURNS = 5
+
+
+@dataclass
+class ClarificationSession:
+    """
+    Estado de una conversación de aclaración.
+
+    Attributes:
+        id: Identificador de la sesión
+        conversation: Conversación acumulada (formato de interactive_creation)
+        last_message: Último mensaje del usuario (solicitud actual del analyzer)
+        question: Última pregunta del Meta-Agente pendiente de respuesta
+        turns: Rondas de análisis realizadas
+        ready: Si ya hay información suficiente para planificar
+        plan: Plan creado para la sesión, si existe
+        updated_at: Momento de la última actividad (time.monotonic)
+    """
+
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    conversation: str = ""
+    last_message: str = ""
+    question: str = ""
+    turns: int = 0
+    ready: bool = False
+    plan: Optional[AgentPlan] = None
+    updated_at: float = field(default_factory=time.monotonic)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    def add_user_message(self, message: str) -> None:
+        """Agrega la respuesta del usuario a la conversación."""
+        message = message.strip()
+        if not self.conversation:
+            self.conversation = f"Usuario: {message}"
+        else:
+            self.conversation += f"\n\nMeta-Agente: {self.question}"
+            self.conversation += f"\nUsuario: {message}"
+        self.last_message = message
+        self.question = ""
+        self.plan = None
+        self.updated_at = time.monotonic()
+
+    def record_analysis(self, analysis: str) -> None:
+        """Registra la respuesta del analyzer (pregunta o INFO_COMPLETA)."""
+        self.turns += 1
+        self.updated_at = time.monotonic()
+        if INFO_COMPLETA in analysis or self.turns >= MAX_TURNS:
+            self.ready = True
+            self.question = ""
+        else:
+            self.ready = False
+            self.question = analysis
+
+    def to_dict(self) -> Dict:
+        """Estado público de la sesión."""
+        return {
+            "session_id": self.id,
+            "status": "ready" if self.ready else "awaiting_answer",
+            "question": self.question,
+            "turns": self.turns,
+            "plan": self.plan.model_dump() if self.plan else None,
+        }
+
+
+class SessionStore:
+    """
+    Almacén LRU de sesiones en memoria con expiración por inactividad.
+
+    Una sesión inactiva solo ocupa su conversación, por lo que un proceso
+    puede mantener miles de ellas.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: float = 3600):
+        """
+        Inicializa el almacén.
+
+        Args:
+            max_sessions: Máximo de sesiones retenidas (se descartan las menos recientes)
+            ttl_seconds: Segundos de inactividad tras los que expira una sesión
+        """
+        self.max_sessions = max(max_sessions, 1)
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, ClarificationSession]" = OrderedDict()
+
+    def create(self) -> ClarificationSession:
+        """Crea una sesión nueva."""
+        self._expire()
+        session = ClarificationSession()
+        self._sessions[session.id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id: str) -> Optional[ClarificationSession]:
+        """Retorna la sesión indicada o None si no existe o expiró."""
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.updated_at = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """Elimina una sesión. Retorna True si existía."""
+        return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _expire(self) -> None:
+        """Descarta las sesiones inactivas (las más antiguas están al inicio)."""
+        limit = time.monotonic() - self.ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if oldest.updated_at >= limit:
+                break
+            self._sessions.popitem(last=False)
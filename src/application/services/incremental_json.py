@@ -0,0 +1,97 @@
+"""
+Parser incremental de objetos JSON.
+
+Permite leer la respuesta de un LLM a medida que llega en fragmentos y
+obtener cada campo de primer nivel del objeto en cuanto está completo,
+sin esperar al final de la respuesta.
+"""
+
+import json
+from typing import Any, List, Optional, Tuple
+
+
+class IncrementalJsonObject:
+    """
+    Extrae los campos de primer nivel de un objeto JSON recibido por partes.
+
+    Ignora el texto anterior a la primera llave (por ejemplo un bloque
+    ```json de markdown). Cada carácter se examina una sola vez, por lo que
+    el costo total es lineal en el tamaño de la respuesta.
+    """
+
+    def __init__(self):
+        """Inicializa el estado del parser."""
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._key: Optional[str] = None
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Agrega un fragmento y retorna los campos completados con él.
+
+        Args:
+            chunk: Texto recibido
+
+        Returns:
+            Lista de tuplas (campo, valor) en orden de aparición
+        """
+        self.buffer += chunk
+        fields: List[Tuple[str, Any]] = []
+
+        while self._pos < len(self.buffer) and not self.done:
+            char = self.buffer[self._pos]
+
+            if self._depth == 0 and char != "{":
+                # Texto previo al objeto (markdown, explicaciones)
+                self._pos += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key_start is not None:
+                        self._key = json.loads(self.buffer[self._key_start : self._pos + 1])
+                        self._key_start = None
+                self._pos += 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._key is None and self._value_start is None:
+                    self._key_start = self._pos
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1:
+                    self._emit(self._pos, fields)
+                    self.done = True
+                self._depth = max(self._depth - 1, 0)
+            elif char == ":" and self._depth == 1 and self._key is not None:
+                self._value_start = self._pos + 1
+            elif char == "," and self._depth == 1:
+                self._emit(self._pos, fields)
+
+            self._pos += 1
+
+        return fields
+
+    def _emit(self, end: int, fields: List[Tuple[str, Any]]) -> None:
+        """Decodifica el valor pendiente que termina en ``end``."""
+        if self._key is not None and self._value_start is not None:
+            raw = self.buffer[self._value_start : end].strip()
+            try:
+                fields.append((self._key, json.loads(raw)))
+            except json.JSONDecodeError:
+                pass
+        self._key = None
+        self._value_start = None
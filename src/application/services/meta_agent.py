@@ -5,18 +5,60 @@ Este módulo contiene la lógica principal para analizar solicitudes de usuarios
 crear planes estructurados y generar código de agentes usando el framework Agno.
 """
 
+import asyncio
 import json
 import os
 import re
-from typing import Dict, List, Optional
-from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Dict, List, Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
 from rich.console import Console
 from agno.agent import Agent
 from agno.models.deepseek import DeepSeek
 
+from src.application.services.incremental_json import IncrementalJsonObject
+from src.application.services.rate_limiter import ProviderLimiter, estimate_tokens, get_limiter
+
 console = Console()
 
 
+class PasoWorkflow(BaseModel):
+    """
+    Paso de un workflow (nivel 5).
+
+    Attributes:
+        nombre: Nombre único del paso (lo usan las dependencias)
+        rol: Rol del agente que ejecuta el paso
+        tarea: Tarea concreta del paso (por defecto el rol)
+        herramientas: Herramientas del agente del paso
+        modelo: Modelo propio del paso (vacío usa el del plan)
+        depende_de: Nombres de los pasos cuyo resultado necesita
+    """
+    nombre: str = Field(min_length=1, description="Nombre único del paso")
+    rol: str = Field(default="Ejecutar el paso", description="Rol del agente del paso")
+    tarea: str = Field(default="", description="Tarea del paso")
+    herramientas: List[str] = Field(default_factory=list, description="Herramientas del paso")
+    modelo: Optional[str] = Field(default=None, description="Modelo propio del paso")
+    depende_de: List[str] = Field(default_factory=list, description="Pasos de los que depende")
+
+    @field_validator("depende_de", mode="before")
+    @classmethod
+    def _normalize_dependencies(cls, value: Any) -> List[str]:
+        """Acepta un nombre suelto o una lista; descarta vacíos y repetidos."""
+        if value is None:
+            return []
+        if isinstance(value, str):
+            value = [value]
+        names: List[str] = []
+        for item in value:
+            if not isinstance(item, str):
+                raise ValueError(f"Dependencia inválida: {item!r}")
+            if item.strip() and item.strip() not in names:
+                names.append(item.strip())
+        return names
+
+
 class AgentPlan(BaseModel):
     """
     Modelo de datos para el plan de un agente.
@@ -27,11 +69,23 @@ class AgentPlan(BaseModel):
         modelo: Modelo LLM a utilizar (deepseek, claude, gpt-4, gemini)
         nivel: Nivel de complejidad (1-5)
         herramientas: Lista de herramientas/tools a incluir
+        directorio_conocimiento: Directorio de documentos del agente con conocimiento (nivel 2)
         instrucciones: Instrucciones específicas para el agente
         necesita_memoria: Si requiere persistencia de conversaciones
+        modelo_memoria: Modelo económico para extraer memorias y resumir sesiones
+        memoria_segundo_plano: Si actualiza la memoria en segundo plano tras responder
+        memoria_cada_n_turnos: Cada cuántos turnos se actualiza la memoria
         es_equipo: Si es un equipo de agentes colaborando
         miembros_equipo: Lista de miembros si es equipo
+        equipo_compacto: Si genera los miembros desde una tabla de datos (equipos grandes)
+        pasos_workflow: Pasos del workflow (nivel 5) con sus dependencias
+        max_pasos_paralelos: Máximo de pasos del workflow ejecutados a la vez
         ejemplo_uso: Ejemplo de cómo usar el agente
+        modo_async: Si el código generado debe ser asíncrono (arun/aprint_response)
+        modo_batch: Si el agente generado acepta prompts en batch (JSONL/stdin)
+        max_concurrencia: Máximo de prompts procesados en paralelo por el agente generado
+        cache_herramientas: Si cachea resultados de herramientas (memoria + SQLite)
+        cache_ttl_segundos: Tiempo de vida de los resultados cacheados
     """
     nombre: str = Field(description="Nombre del agente")
     rol: str = Field(description="Rol o propósito del agente")
@@ -39,10 +93,114 @@ class AgentPlan(BaseModel):
     nivel: int = Field(default=1, ge=1, le=5, description="Nivel de complejidad 1-5")
     herramientas: List[str] = Field(default_factory=list, description="Lista de herramientas")
     instrucciones: List[str] = Field(default_factory=list, description="Instrucciones específicas")
+    directorio_conocimiento: str = Field(default="conocimiento", description="Directorio de documentos (nivel 2)")
     necesita_memoria: bool = Field(default=False, description="Si necesita memoria persistente")
+    modelo_memoria: str = Field(default="", description="Modelo para mantenimiento de memoria")
+    memoria_segundo_plano: bool = Field(default=False, description="Si actualiza memoria en segundo plano")
+    memoria_cada_n_turnos: int = Field(default=1, ge=1, description="Turnos entre actualizaciones de memoria")
     es_equipo: bool = Field(default=False, description="Si es un equipo de agentes")
     miembros_equipo: List[Dict] = Field(default_factory=list, description="Miembros del equipo")
+    equipo_compacto: bool = Field(default=False, description="Si genera miembros desde una tabla")
+    pasos_workflow: List[PasoWorkflow] = Field(default_factory=list, description="Pasos del workflow")
+    max_pasos_paralelos: int = Field(default=4, ge=1, description="Pasos del workflow en paralelo")
     ejemplo_uso: str = Field(default="", description="Ejemplo de uso del agente")
+    modo_async: bool = Field(default=False, description="Si genera código asíncrono")
+    modo_batch: bool = Field(default=False, description="Si incluye modo batch JSONL")
+    max_concurrencia: int = Field(default=4, ge=1, description="Máximo de prompts concurrentes")
+    cache_herramientas: bool = Field(default=False, description="Si cachea resultados de herramientas")
+    cache_ttl_segundos: int = Field(default=3600, ge=0, description="TTL del cache de herramientas")
+
+    @model_validator(mode="after")
+    def _check_workflow(self) -> "AgentPlan":
+        """Valida que los pasos tengan nombres únicos y formen un DAG."""
+        names = [step.nombre for step in self.pasos_workflow]
+        duplicated = sorted({name for name in names if names.count(name) > 1})
+        if duplicated:
+            raise ValueError(f"Pasos de workflow repetidos: {', '.join(duplicated)}")
+
+        for step in self.pasos_workflow:
+            unknown = [name for name in step.depende_de if name not in names]
+            if unknown:
+                raise ValueError(
+                    f"El paso '{step.nombre}' depende de pasos inexistentes: {', '.join(unknown)}"
+                )
+
+        # Orden topológico (Kahn): los pasos que quedan sin ordenar forman un ciclo
+        pending = {step.nombre: set(step.depende_de) for step in self.pasos_workflow}
+        ready = [name for name, deps in pending.items() if not deps]
+        while ready:
+            done = ready.pop()
+            del pending[done]
+            for name, deps in pending.items():
+                if done in deps:
+                    deps.discard(done)
+                    if not deps:
+                        ready.append(name)
+        if pending:
+            raise ValueError(f"Los pasos del workflow forman un ciclo: {', '.join(sorted(pending))}")
+        return self
+
+    def canonical(self) -> "AgentPlan":
+        """
+        Retorna una copia normalizada del plan.
+
+        Resuelve alias de herramientas y las ordena sin duplicados, elimina
+        instrucciones repetidas y normaliza los ids de modelo (también en
+        miembros y pasos). Planes equivalentes producen el mismo resultado,
+        lo que mejora el cache y evita registrar una herramienta dos veces.
+
+        Returns:
+            Nuevo AgentPlan canónico
+        """
+        from src.infrastructure.templates.agent_templates import AgentTemplate
+
+        def tools(herramientas: List[str]) -> List[str]:
+            names = (" ".join(str(tool).split()).lower() for tool in herramientas)
+            return sorted({AgentTemplate.TOOL_ALIASES.get(name, name) for name in names if name})
+
+        def model(modelo: Optional[str]) -> Optional[str]:
+            if not modelo or not modelo.strip():
+                return modelo
+            return AgentTemplate._resolve_model(modelo.strip().lower())[1]
+
+        def unique(items: List[str]) -> List[str]:
+            seen = set()
+            result = []
+            for item in (" ".join(str(item).split()) for item in items):
+                if item and item.lower() not in seen:
+                    seen.add(item.lower())
+                    result.append(item)
+            return result
+
+        def component(data: Dict) -> Dict:
+            data = dict(data)
+            for key in ("nombre", "rol", "tarea"):
+                if isinstance(data.get(key), str):
+                    data[key] = data[key].strip()
+            if "herramientas" in data:
+                data["herramientas"] = tools(data["herramientas"])
+            if "instrucciones" in data:
+                data["instrucciones"] = unique(data["instrucciones"])
+            if data.get("modelo"):
+                data["modelo"] = model(data["modelo"])
+            if "depende_de" in data:
+                data["depende_de"] = sorted(set(data["depende_de"]))
+            return data
+
+        return self.model_copy(
+            update={
+                "nombre": self.nombre.strip(),
+                "rol": self.rol.strip(),
+                "modelo": model(self.modelo),
+                "modelo_memoria": model(self.modelo_memoria),
+                "herramientas": tools(self.herramientas),
+                "instrucciones": unique(self.instrucciones),
+                "miembros_equipo": [component(member) for member in self.miembros_equipo],
+                "pasos_workflow": [
+                    PasoWorkflow(**component(step.model_dump())) for step in self.pasos_workflow
+                ],
+            }
+        )
 
 
 class MetaAgent:
@@ -52,6 +210,9 @@ class MetaAgent:
     Este agente utiliza dos agentes internos:
     - analyzer_agent: Analiza solicitudes y hace preguntas aclaratorias
     - planner_agent: Crea planes estructurados en formato JSON
+
+    Los planes de equipo se crean en dos fases: un esqueleto con los
+    miembros y luego el detalle de cada miembro en paralelo.
     """
 
     def __init__(self):
@@ -59,6 +220,11 @@ class MetaAgent:
         self.analysis_model = DeepSeek(id="deepseek-chat")
         self.planning_model = DeepSeek(id="deepseek-reasoner")
 
+        # Máximo de miembros de equipo detallados en paralelo
+        self.max_member_concurrency = max(
+            int(os.getenv("PLANNER_MEMBER_CONCURRENCY", "4")), 1
+        )
+
         # Agente para analizar solicitudes
         self.analyzer_agent = Agent(
             name="Analyzer Agent",
@@ -89,6 +255,49 @@ class MetaAgent:
             markdown=True,
         )
 
+    @staticmethod
+    def _limiter(model: Any) -> ProviderLimiter:
+        """Limitador compartido del proveedor/modelo."""
+        provider = getattr(model, "provider", None) or type(model).__name__
+        return get_limiter(str(provider).lower(), str(getattr(model, "id", "default")))
+
+    def _run_limited(self, agent: Agent, model: Any, prompt: str) -> Any:
+        """Ejecuta ``agent.run`` respetando los límites del proveedor."""
+        with self._limiter(model).limit(estimate_tokens(prompt)) as call:
+            response = agent.run(prompt)
+            call.record_usage(response)
+        return response
+
+    async def _arun_limited(self, agent: Agent, model: Any, prompt: str) -> Any:
+        """Ejecuta ``agent.arun`` respetando los límites del proveedor."""
+        async with self._limiter(model).alimit(estimate_tokens(prompt)) as call:
+            response = await agent.arun(prompt)
+            call.record_usage(response)
+        return response
+
+    async def _astream_limited(self, agent: Agent, model: Any, prompt: str) -> AsyncIterator[Any]:
+        """
+        Transmite ``agent.arun`` respetando los límites del proveedor.
+
+        Al cerrar o cancelar este iterador se cierra también el stream de
+        agno, de modo que la llamada al LLM no sigue consumiendo tokens. El
+        consumo real se toma del último evento que informa métricas (el
+        evento final de agno) o, si no hay, de la respuesta del agente.
+        """
+        async with self._limiter(model).alimit(estimate_tokens(prompt)) as call:
+            stream = agent.arun(prompt, stream=True)
+            usage = None
+            try:
+                async for event in stream:
+                    if getattr(event, "metrics", None) is not None:
+                        usage = event
+                    yield event
+            finally:
+                aclose = getattr(stream, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+                call.record_usage(usage if usage is not None else getattr(agent, "run_response", None))
+
     def analyze_request(self, user_request: str, conversation_history: str = "") -> str:
         """
         Analiza la solicitud del usuario y determina qué información falta.
@@ -100,7 +309,35 @@ class MetaAgent:
         Returns:
             Preguntas aclaratorias o "INFO_COMPLETA" si tiene todo
         """
-        prompt = f"""
+        prompt = self._analysis_prompt(user_request, conversation_history)
+        response = self._run_limited(self.analyzer_agent, self.analysis_model, prompt)
+        return response.content
+
+    async def astream_analysis(
+        self, user_request: str, conversation_history: str = ""
+    ) -> AsyncIterator[str]:
+        """
+        Versión con streaming de analyze_request.
+
+        Args:
+            user_request: Solicitud actual del usuario
+            conversation_history: Historial de la conversación previa
+
+        Yields:
+            Fragmentos de la respuesta del analyzer
+        """
+        prompt = self._analysis_prompt(user_request, conversation_history)
+        stream = self._astream_limited(self.analyzer_agent, self.analysis_model, prompt)
+        async with aclosing(stream):
+            async for event in stream:
+                content = getattr(event, "content", None)
+                if isinstance(content, str) and content:
+                    yield content
+
+    @staticmethod
+    def _analysis_prompt(user_request: str, conversation_history: str) -> str:
+        """Construye el prompt del analyzer."""
+        return f"""
 Conversación hasta ahora:
 {conversation_history}
 
@@ -127,13 +364,13 @@ c) Análisis de archivos
 d) Otra (especifica)"
 """
 
-        response = self.analyzer_agent.run(prompt)
-        return response.content
-
     def create_plan(self, conversation: str) -> AgentPlan:
         """
         Crea un plan estructurado basado en la conversación completa.
 
+        Si el plan es un equipo, el planner solo esboza los miembros y cada
+        uno se detalla después en paralelo (ver elaborate_member).
+
         Args:
             conversation: Toda la conversación con el usuario
 
@@ -143,6 +380,74 @@ d) Otra (especifica)"
         Raises:
             ValueError: Si no puede parsear o validar el plan
         """
+        response = self._run_limited(
+            self.planner_agent, self.planning_model, self._plan_prompt(conversation)
+        )
+        return self._finalize_plan(conversation, response.content)
+
+    async def acreate_plan(self, conversation: str) -> AgentPlan:
+        """
+        Versión asíncrona de create_plan.
+
+        A diferencia de ejecutar create_plan en un hilo, cancelar la tarea
+        cancela también la llamada al planner y las de los miembros.
+
+        Args:
+            conversation: Toda la conversación con el usuario
+
+        Returns:
+            AgentPlan estructurado y validado
+
+        Raises:
+            ValueError: Si no puede parsear o validar el plan
+        """
+        response = await self._arun_limited(
+            self.planner_agent, self.planning_model, self._plan_prompt(conversation)
+        )
+        return await self._afinalize_plan(conversation, response.content)
+
+    async def astream_plan(self, conversation: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crea el plan transmitiendo la respuesta del planner a medida que llega.
+
+        Los campos de primer nivel del plan se emiten en cuanto el JSON de
+        cada uno está completo, antes de que termine la respuesta.
+
+        Args:
+            conversation: Toda la conversación con el usuario
+
+        Yields:
+            Eventos con "type":
+            - reasoning / token: Fragmento de razonamiento o de respuesta
+            - field: Campo del plan completado ("name" y "value")
+            - plan: AgentPlan final validado ("plan")
+
+        Raises:
+            ValueError: Si no puede parsear o validar el plan
+        """
+        parser = IncrementalJsonObject()
+        stream = self._astream_limited(
+            self.planner_agent, self.planning_model, self._plan_prompt(conversation)
+        )
+        async with aclosing(stream):
+            async for event in stream:
+                reasoning = getattr(event, "reasoning_content", None)
+                if isinstance(reasoning, str) and reasoning:
+                    yield {"type": "reasoning", "content": reasoning}
+
+                content = getattr(event, "content", None)
+                if not isinstance(content, str) or not content:
+                    continue
+                yield {"type": "token", "content": content}
+                for name, value in parser.feed(content):
+                    yield {"type": "field", "name": name, "value": value}
+
+        # Validación final (y detalle de miembros si es un equipo)
+        plan = await self._afinalize_plan(conversation, parser.buffer)
+        yield {"type": "plan", "plan": plan.model_dump()}
+
+    def _plan_prompt(self, conversation: str) -> str:
+        """Construye el prompt del planner para la conversación."""
         # Schema del modelo para el prompt
         schema = AgentPlan.model_json_schema()
 
@@ -159,11 +464,24 @@ Reglas importantes:
 - rol: Descripción clara de su función
 - modelo: Usa "deepseek-chat" por defecto (o "claude-sonnet-4", "gpt-4o", "gemini-2.0-flash-exp")
 - nivel: 1=básico, 2=con conocimiento, 3=con memoria, 4=equipo, 5=workflow
+- directorio_conocimiento: solo nivel 2, carpeta con los documentos (.txt, .md) a consultar
 - herramientas: Lista con nombres como ["duckduckgo", "yfinance", "reasoning"]
 - instrucciones: Lista de instrucciones específicas
 - necesita_memoria: true si debe recordar conversaciones
+- modelo_memoria: modelo más barato para memorias/resúmenes (ej: "gpt-4o-mini"); vacío usa el del agente
+- memoria_segundo_plano y memoria_cada_n_turnos: para agentes con memoria y mucho tráfico,
+  actualiza la memoria tras responder y cada N turnos
 - es_equipo: true si es un equipo de agentes
+- equipo_compacto: true si el equipo tiene decenas o cientos de miembros
+- miembros_equipo: Lista de miembros {{"nombre", "rol"}} con un rol breve; "modelo" solo si un miembro
+  necesita otro modelo. Las herramientas e instrucciones de cada miembro se detallan después
+- pasos_workflow: solo nivel 5, lista de pasos {{"nombre", "rol", "tarea", "herramientas", "depende_de"}};
+  "depende_de" lista los nombres de pasos previos (vacía si no depende de ninguno), de modo que los
+  pasos independientes corran en paralelo. Los nombres deben ser únicos y sin dependencias circulares
 - ejemplo_uso: Ejemplo de pregunta/tarea para el agente
+- modo_async: true si el agente debe atender muchas solicitudes concurrentes
+- modo_batch: true si procesará lotes de prompts (evaluaciones, cargas masivas)
+- cache_herramientas: true si repite búsquedas o consultas financieras (noticias, tickers)
 
 Herramientas disponibles:
 - duckduckgo: Búsqueda web
@@ -174,10 +492,61 @@ Herramientas disponibles:
 
 Retorna SOLO el JSON, sin markdown, sin explicaciones adicionales.
 """
+        return prompt
+
+    def _finalize_plan(self, conversation: str, content: str) -> AgentPlan:
+        """
+        Valida la respuesta del planner y completa el plan.
+
+        Args:
+            conversation: Toda la conversación con el usuario
+            content: Respuesta completa del planner
+
+        Returns:
+            AgentPlan canónico (con miembros detallados si es un equipo)
+
+        Raises:
+            ValueError: Si no puede parsear o validar el plan
+        """
+        plan = self._parse_plan(content)
+        if plan.es_equipo and plan.miembros_equipo:
+            plan = self._elaborate_members(conversation, plan)
+        return plan.canonical()
+
+    async def _afinalize_plan(self, conversation: str, content: str) -> AgentPlan:
+        """
+        Versión asíncrona de _finalize_plan.
+
+        Los miembros se detallan con llamadas asíncronas, de modo que
+        cancelar la tarea cancela también la de cada miembro.
+        """
+        plan = self._parse_plan(content)
+        if plan.es_equipo and plan.miembros_equipo:
+            plan = await self._aelaborate_members(conversation, plan)
+        return plan.canonical()
+
+    def _parse_plan(self, content: str) -> AgentPlan:
+        """
+        Parsea y valida la respuesta del planner (sin detallar miembros).
 
-        response = self.planner_agent.run(prompt)
-        content = response.content
+        Raises:
+            ValueError: Si no puede parsear o validar el plan
+        """
+        content = self._extract_json(content)
 
+        try:
+            return AgentPlan(**json.loads(content))
+        except json.JSONDecodeError as e:
+            console.print("[red]Error al parsear JSON:[/red]")
+            console.print(f"[yellow]Contenido recibido:[/yellow]\n{content}")
+            raise ValueError(f"No se pudo parsear el plan como JSON: {e}")
+        except Exception as e:
+            console.print(f"[red]Error al validar el plan:[/red] {e}")
+            raise ValueError(f"Plan inválido: {e}")
+
+    @staticmethod
+    def _extract_json(content: str) -> str:
+        """Extrae el objeto JSON de una respuesta (con o sin markdown)."""
         # Limpiar contenido si viene con markdown
         if "```json" in content:
             content = content.split("```json")[1].split("```")[0]
@@ -190,18 +559,136 @@ Retorna SOLO el JSON, sin markdown, sin explicaciones adicionales.
             json_match = re.search(r'\{.*\}', content, re.DOTALL)
             if json_match:
                 content = json_match.group()
+        return content
 
-        try:
-            plan_dict = json.loads(content)
-            plan = AgentPlan(**plan_dict)
-            return plan
-        except json.JSONDecodeError as e:
-            console.print(f"[red]Error al parsear JSON:[/red]")
-            console.print(f"[yellow]Contenido recibido:[/yellow]\n{content}")
-            raise ValueError(f"No se pudo parsear el plan como JSON: {e}")
-        except Exception as e:
-            console.print(f"[red]Error al validar el plan:[/red] {e}")
-            raise ValueError(f"Plan inválido: {e}")
+    def _create_member_planner(self) -> Agent:
+        """Crea un planner de miembros (uno por llamada, para ejecutarlos en paralelo)."""
+        return Agent(
+            name="Member Planner Agent",
+            role="Detallar un miembro de un equipo de agentes AI",
+            model=self.planning_model,
+            instructions=[
+                "Detalla solo el miembro indicado, sin solaparte con el resto del equipo",
+                "Retorna SOLO el JSON, sin texto adicional",
+            ],
+            markdown=False,
+        )
+
+    def elaborate_member(self, conversation: str, plan: AgentPlan, member: Dict) -> Dict:
+        """
+        Detalla rol, herramientas e instrucciones de un miembro del equipo.
+
+        Args:
+            conversation: Toda la conversación con el usuario
+            plan: Plan esqueleto del equipo
+            member: Miembro a detallar (al menos "nombre" y "rol")
+
+        Returns:
+            Miembro detallado
+        """
+        prompt = self._member_prompt(conversation, plan, member)
+        response = self._run_limited(self._create_member_planner(), self.planning_model, prompt)
+        return self._merge_member(member, response.content)
+
+    async def aelaborate_member(self, conversation: str, plan: AgentPlan, member: Dict) -> Dict:
+        """Versión asíncrona de elaborate_member (cancelable)."""
+        prompt = self._member_prompt(conversation, plan, member)
+        response = await self._arun_limited(
+            self._create_member_planner(), self.planning_model, prompt
+        )
+        return self._merge_member(member, response.content)
+
+    @staticmethod
+    def _member_prompt(conversation: str, plan: AgentPlan, member: Dict) -> str:
+        """Construye el prompt del planner de miembros."""
+        equipo = "\n".join(
+            f"- {other.get('nombre', '')}: {other.get('rol', '')}"
+            for other in plan.miembros_equipo
+        )
+        prompt = f"""
+Conversación con el usuario:
+{conversation}
+
+Equipo: {plan.nombre} - {plan.rol}
+Miembros:
+{equipo}
+
+Detalla el miembro "{member.get('nombre', '')}" ({member.get('rol', '')}).
+
+Retorna un JSON con:
+- rol: Descripción clara de su función dentro del equipo
+- herramientas: Lista con nombres como ["duckduckgo", "yfinance", "reasoning"] (puede ser vacía)
+- instrucciones: Lista de instrucciones específicas del miembro
+
+Herramientas disponibles: duckduckgo, yfinance, reasoning, python, file
+
+Retorna SOLO el JSON, sin markdown, sin explicaciones adicionales.
+"""
+        return prompt
+
+    def _merge_member(self, member: Dict, content: str) -> Dict:
+        """Combina el miembro del esqueleto con el detalle del planner."""
+        detail = json.loads(self._extract_json(content))
+
+        elaborated = dict(member)
+        elaborated["rol"] = detail.get("rol") or member.get("rol", "")
+        for key in ("herramientas", "instrucciones"):
+            value = detail.get(key, member.get(key, []))
+            elaborated[key] = [value] if isinstance(value, str) else list(value)
+        return elaborated
+
+    def _elaborate_members(self, conversation: str, plan: AgentPlan) -> AgentPlan:
+        """
+        Detalla todos los miembros del plan en paralelo (acotado).
+
+        Si un miembro no puede detallarse se conserva tal como vino en el
+        esqueleto.
+
+        Args:
+            conversation: Toda la conversación con el usuario
+            plan: Plan esqueleto del equipo
+
+        Returns:
+            AgentPlan validado con los miembros detallados
+        """
+
+        def elaborate(member: Dict) -> Dict:
+            try:
+                return self.elaborate_member(conversation, plan, member)
+            except Exception as e:
+                console.print(
+                    f"[yellow]No se pudo detallar el miembro {member.get('nombre', '?')}: {e}[/yellow]"
+                )
+                return member
+
+        workers = min(self.max_member_concurrency, len(plan.miembros_equipo))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            members = list(executor.map(elaborate, plan.miembros_equipo))
+
+        return AgentPlan(**{**plan.model_dump(), "miembros_equipo": members})
+
+    async def _aelaborate_members(self, conversation: str, plan: AgentPlan) -> AgentPlan:
+        """
+        Versión asíncrona de _elaborate_members.
+
+        Cada miembro es una tarea de ``asyncio.gather`` (acotadas a
+        ``max_member_concurrency`` a la vez): cancelar la creación del plan
+        cancela las llamadas de todos los miembros.
+        """
+        slots = asyncio.Semaphore(self.max_member_concurrency)
+
+        async def elaborate(member: Dict) -> Dict:
+            async with slots:
+                try:
+                    return await self.aelaborate_member(conversation, plan, member)
+                except Exception as e:
+                    console.print(
+                        f"[yellow]No se pudo detallar el miembro {member.get('nombre', '?')}: {e}[/yellow]"
+                    )
+                    return member
+
+        members = await asyncio.gather(*(elaborate(member) for member in plan.miembros_equipo))
+        return AgentPlan(**{**plan.model_dump(), "miembros_equipo": list(members)})
 
     def generate_code(self, plan: AgentPlan) -> str:
         """
@@ -219,12 +706,19 @@ Retorna SOLO el JSON, sin markdown, sin explicaciones adicionales.
         if plan.es_equipo and plan.modelo == "deepseek-chat":
             plan.modelo = "deepseek-reasoner"
 
-        if plan.es_equipo:
-            return AgentTemplate.generate_agent_team(plan.model_dump())
-        elif plan.necesita_memoria or plan.nivel >= 3:
-            return AgentTemplate.generate_agent_with_memory(plan.model_dump())
+        spec = plan.canonical().model_dump()
+        kind = AgentTemplate.get_agent_kind(spec)
+
+        if kind == "team":
+            return AgentTemplate.generate_agent_team(spec)
+        elif kind == "workflow":
+            return AgentTemplate.generate_workflow(spec)
+        elif kind == "memory":
+            return AgentTemplate.generate_agent_with_memory(spec)
+        elif kind == "knowledge":
+            return AgentTemplate.generate_knowledge_agent(spec)
         else:
-            return AgentTemplate.generate_basic_agent(plan.model_dump())
+            return AgentTemplate.generate_basic_agent(spec)
 
     def interactive_creation(self):
         """
@@ -309,14 +803,10 @@ Retorna SOLO el JSON, sin markdown, sin explicaciones adicionales.
             console.print(f"[red]Error al generar código: {e}[/red]")
             return
 
-        # Paso 6: Guardar archivo
-        filename = f"{plan.nombre.lower().replace(' ', '_')}_agent.py"
-        output_dir = os.path.join(os.getcwd(), "generated", "agents")
-        os.makedirs(output_dir, exist_ok=True)
-        filepath = os.path.join(output_dir, filename)
+        # Paso 6: Guardar archivo (mismo almacenamiento, versiones y avisos que la API)
+        from src.infrastructure.storage.agent_files import save_agent_file
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            f.write(code)
+        _, filepath = save_agent_file(plan, code)
 
         console.print(f"\n[bold green]✓ Agente generado exitosamente:[/bold green] {filepath}")
         console.print("\n[bold]Para usar tu agente:[/bold]")
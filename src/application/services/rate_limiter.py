@@ -0,0 +1,227 @@
+"""
+Limitador de llamadas salientes a proveedores de LLM.
+
+Cada proveedor/modelo tiene un limitador compartido por el proceso que
+combina dos token buckets (solicitudes por segundo y tokens por minuto) con
+un máximo de llamadas en curso. Las llamadas esperan su turno antes de salir
+en lugar de recibir un 429 del proveedor y reintentar.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+# Espera máxima entre reintentos de admisión (segundos)
+MAX_POLL_INTERVAL = 0.25
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida de tokens de un texto (~4 caracteres por token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """
+    Token bucket clásico: se recarga a ``rate`` unidades por segundo hasta
+    ``capacity``. No es thread-safe por sí mismo (lo protege el limitador).
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Inicializa el bucket lleno.
+
+        Args:
+            rate: Unidades recargadas por segundo
+            capacity: Máximo de unidades acumuladas (ráfaga)
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Segundos hasta que haya ``amount`` unidades disponibles."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        """Descuenta unidades (puede quedar negativo para cobrar excesos)."""
+        self.tokens -= min(amount, self.capacity)
+
+
+class ProviderLimiter:
+    """
+    Limita las llamadas a un proveedor/modelo.
+
+    Sirve tanto a código síncrono (hilos) como asíncrono: la admisión se
+    decide bajo un lock y cada llamador espera con ``time.sleep`` o
+    ``asyncio.sleep`` según corresponda.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = 5.0,
+        tokens_per_minute: float = 120000,
+        max_in_flight: int = 4,
+    ):
+        """
+        Inicializa el limitador.
+
+        Args:
+            requests_per_second: Solicitudes por segundo sostenidas (la ráfaga
+                admite al menos max_in_flight llamadas simultáneas)
+            tokens_per_minute: Tokens por minuto (ráfaga de 1 minuto)
+            max_in_flight: Máximo de llamadas en curso a la vez
+        """
+        self.requests = TokenBucket(
+            requests_per_second, max(requests_per_second, max_in_flight)
+        )
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute)
+        self.max_in_flight = max(max_in_flight, 1)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Admite la llamada (retorna 0) o retorna los segundos a esperar."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(tokens, now))
+            if self.in_flight >= self.max_in_flight:
+                wait = max(wait, MAX_POLL_INTERVAL)
+            if wait > 0:
+                return min(wait, MAX_POLL_INTERVAL)
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def _admitted(self, waited: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+
+    def _enqueue(self) -> float:
+        with self._lock:
+            self.waiting += 1
+        return time.monotonic()
+
+    def release(self, extra_tokens: int = 0) -> None:
+        """
+        Libera el lugar de una llamada terminada.
+
+        Args:
+            extra_tokens: Tokens consumidos por encima de la estimación inicial
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if extra_tokens > 0:
+                self.tokens.consume(extra_tokens)
+
+    @contextmanager
+    def limit(self, tokens: int = 1) -> Iterator["LimitedCall"]:
+        """Espera turno (bloqueando el hilo) y libera al terminar."""
+        started = self._enqueue()
+        while (wait := self._try_acquire(tokens)) > 0:
+            time.sleep(wait)
+        self._admitted(time.monotonic() - started)
+        call = LimitedCall(tokens)
+        try:
+            yield call
+        finally:
+            self.release(call.extra_tokens())
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 1) -> AsyncIterator["LimitedCall"]:
+        """Versión asíncrona de limit (no bloquea el event loop)."""
+        started = self._enqueue()
+        try:
+            while (wait := self._try_acquire(tokens)) > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            with self._lock:
+                self.waiting -= 1
+            raise
+        self._admitted(time.monotonic() - started)
+        call = LimitedCall(tokens)
+        try:
+            yield call
+        finally:
+            self.release(call.extra_tokens())
+
+    def stats(self) -> Dict[str, float]:
+        """Métricas del limitador (tiempos de espera en segundos)."""
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "admitted": self.admitted,
+                "avg_wait": round(self.total_wait / self.admitted, 4) if self.admitted else 0.0,
+                "max_wait": round(self.max_wait, 4),
+            }
+
+
+class LimitedCall:
+    """Llamada admitida; permite informar el consumo real de tokens."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+
+    def record_usage(self, response) -> None:
+        """Registra los tokens reales de una respuesta de agno (si los informa)."""
+        total = getattr(getattr(response, "metrics", None), "total_tokens", None)
+        if isinstance(total, int):
+            self.used_tokens = total
+
+    def extra_tokens(self) -> int:
+        if self.used_tokens is None:
+            return 0
+        return self.used_tokens - self.estimated_tokens
+
+
+# Limitadores compartidos por el proceso, por "proveedor:modelo"
+_limiters: Dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(provider: str, model_id: str) -> ProviderLimiter:
+    """
+    Retorna el limitador compartido del proveedor/modelo.
+
+    Los límites se leen de LLM_REQUESTS_PER_SECOND, LLM_TOKENS_PER_MINUTE y
+    LLM_MAX_IN_FLIGHT al crear el limitador.
+    """
+    key = f"{provider}:{model_id}"
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter = ProviderLimiter(
+                requests_per_second=float(os.getenv("LLM_REQUESTS_PER_SECOND", "5")),
+                tokens_per_minute=float(os.getenv("LLM_TOKENS_PER_MINUTE", "120000")),
+                max_in_flight=int(os.getenv("LLM_MAX_IN_FLIGHT", "4")),
+            )
+            _limiters[key] = limiter
+        return limiter
+
+
+def limiter_stats() -> Dict[str, Dict[str, float]]:
+    """Métricas de todos los limitadores creados."""
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {key: limiter.stats() for key, limiter in sorted(limiters.items())}
@@ -1,10 +1,14 @@
 """
 Módulo de API para AgentOS.
 
-Contiene las rutas custom del Meta-Agente para generación de código.
+Contiene las rutas custom del Meta-Agente para generación de código,
+las sesiones de aclaración, los trabajos en segundo plano y el host de agentes generados.
 """
 
+from .host_routes import router as host_router
+from .job_routes import router as job_router
 from .meta_routes import router as meta_router
+from .session_routes import router as session_router
 
-__all__ = ["meta_router"]
+__all__ = ["host_router", "job_router", "meta_router", "session_router"]
 
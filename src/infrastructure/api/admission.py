@@ -0,0 +1,297 @@
+"""
+Control de admisión para la API de AgentOS.
+
+Middleware ASGI que limita las solicitudes concurrentes por grupo de rutas.
+Cada grupo admite ``max_concurrency`` solicitudes a la vez y deja esperar a
+``max_queue`` más durante ``queue_timeout`` segundos; el resto recibe
+``429 Too Many Requests`` con ``Retry-After``. Las conexiones WebSocket
+cuentan como método ``WEBSOCKET`` y ocupan su lugar mientras siguen
+abiertas; si no son admitidas se rechazan antes del handshake. Las
+conexiones de larga vida que pasan casi todo el tiempo inactivas (sesiones
+de aclaración) no se controlan como conexión: cada turno toma un lugar del
+grupo con ``RouteLimit.hold``. Las rutas que no pertenecen a ningún grupo
+(health, listados, configuración) no pasan por el control, de modo que
+siguen respondiendo aunque las rutas con LLM estén saturadas.
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Sequence
+
+# Peso del último valor en la media móvil de duración de solicitudes
+EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """El grupo de rutas está saturado (ver RouteLimit.hold)."""
+
+    def __init__(self, limit: "RouteLimit"):
+        self.retry_after = limit.retry_after()
+        super().__init__(f"Servicio saturado ({limit.name}), reintenta en {self.retry_after} s")
+
+
+class RouteLimit:
+    """
+    Límite de concurrencia y cola para un grupo de rutas.
+
+    El cupo se mantiene hasta que la respuesta termina de enviarse, por lo
+    que los streams SSE y las conexiones WebSocket cuentan durante toda su
+    duración.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pattern: str,
+        methods: Iterable[str] = ("POST", "WEBSOCKET"),
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        queue_timeout: float = 10.0,
+    ):
+        """
+        Inicializa el grupo.
+
+        Args:
+            name: Nombre del grupo (para métricas)
+            pattern: Expresión regular que deben cumplir las rutas (desde el inicio)
+            methods: Métodos HTTP controlados (``WEBSOCKET`` para conexiones WebSocket)
+            max_concurrency: Solicitudes atendidas a la vez
+            max_queue: Solicitudes que pueden esperar un lugar
+            queue_timeout: Segundos máximos de espera en la cola
+        """
+        self.name = name
+        self.pattern = re.compile(pattern)
+        self.methods = {method.upper() for method in methods}
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.avg_duration = 0.0
+
+    def matches(self, method: str, path: str) -> bool:
+        """Indica si la solicitud pertenece al grupo."""
+        return method in self.methods and self.pattern.match(path) is not None
+
+    async def acquire(self) -> bool:
+        """
+        Intenta obtener un lugar, esperando en la cola si hay espacio.
+
+        Returns:
+            True si la solicitud fue admitida
+        """
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            return False
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return False
+        finally:
+            self.waiting -= 1
+
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[None]:
+        """
+        Ocupa un lugar del grupo durante el bloque (p. ej. un turno de WebSocket).
+
+        Raises:
+            AdmissionRejected: Si no hay lugar
+        """
+        if not await self.acquire():
+            raise AdmissionRejected(self)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    def release(self, duration: float) -> None:
+        """Libera el lugar y actualiza la duración media."""
+        self.active -= 1
+        self._slots.release()
+        if self.avg_duration:
+            self.avg_duration += EWMA_ALPHA * (duration - self.avg_duration)
+        else:
+            self.avg_duration = duration
+
+    def retry_after(self) -> int:
+        """Segundos sugeridos antes de reintentar (estimado con la cola actual)."""
+        backlog = (self.waiting + self.active + 1) / self.max_concurrency
+        return max(1, math.ceil(self.avg_duration * backlog))
+
+    def stats(self) -> Dict[str, float]:
+        """Métricas del grupo."""
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_duration": round(self.avg_duration, 4),
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Middleware ASGI de control de admisión.
+
+    Controla solicitudes HTTP y conexiones WebSocket; las rutas exentas
+    pasan directamente.
+    """
+
+    def __init__(
+        self,
+        app,
+        limits: Sequence[RouteLimit],
+        exempt: Iterable[str] = ("/health", "/api/meta-agent/health"),
+    ):
+        """
+        Inicializa el middleware.
+
+        Args:
+            app: Aplicación ASGI envuelta
+            limits: Grupos de rutas controlados (gana el primero que coincide)
+            exempt: Rutas que nunca se limitan
+        """
+        self.app = app
+        self.limits = list(limits)
+        self.exempt = set(exempt)
+
+    def _limit_for(self, scope) -> Optional[RouteLimit]:
+        path = scope.get("path", "")
+        if scope["type"] not in ("http", "websocket") or path in self.exempt:
+            return None
+        if scope["type"] == "websocket":
+            method = "WEBSOCKET"
+        else:
+            method = scope.get("method", "GET").upper()
+        for limit in self.limits:
+            if limit.matches(method, path):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limit.acquire():
+            if scope["type"] == "websocket":
+                await self._reject_websocket(limit, scope, receive, send)
+            else:
+                await self._reject(limit, send)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(limit: RouteLimit, send, prefix: str = "http") -> None:
+        """Responde 429 con Retry-After."""
+        body = json.dumps(
+            {"detail": f"Servicio saturado ({limit.name}), reintenta más tarde"},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        await send(
+            {
+                "type": f"{prefix}.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(limit.retry_after()).encode()),
+                ],
+            }
+        )
+        await send({"type": f"{prefix}.response.body", "body": body})
+
+    @classmethod
+    async def _reject_websocket(cls, limit: RouteLimit, scope, receive, send) -> None:
+        """
+        Rechaza una conexión WebSocket antes del handshake.
+
+        Si el servidor soporta la extensión ``websocket.http.response`` se
+        responde 429 con Retry-After; si no, se cierra con el código 1013
+        (Try Again Later).
+        """
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        if "websocket.http.response" in scope.get("extensions", {}):
+            await cls._reject(limit, send, prefix="websocket.http")
+        else:
+            await send({"type": "websocket.close", "code": 1013})
+
+
+# Grupos configurados para la aplicación (ver default_route_limits)
+_route_limits: List[RouteLimit] = []
+
+
+def default_route_limits() -> List[RouteLimit]:
+    """
+    Grupos de rutas por defecto de AgentOS.
+
+    - llm: rutas que llaman al LLM (ejecuciones de agentes de AgentOS,
+      planificación, sesiones de aclaración y agentes del host). El
+      WebSocket de sesiones queda fuera: limita cada turno y no la conexión
+    - generate: renderizado de código a partir de un plan
+
+    Configurables con ADMISSION_LLM_CONCURRENCY, ADMISSION_LLM_QUEUE,
+    ADMISSION_GENERATE_CONCURRENCY, ADMISSION_GENERATE_QUEUE y
+    ADMISSION_QUEUE_TIMEOUT.
+    """
+    global _route_limits
+    if not _route_limits:
+        timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+        _route_limits = [
+            RouteLimit(
+                "llm",
+                r"/(agents/[^/]+/runs|teams/[^/]+/runs"
+                r"|api/meta-agent/((plan|plan-stream)$|sessions(?!/ws$)(/|$))|api/agent-host/run/)",
+                max_concurrency=int(os.getenv("ADMISSION_LLM_CONCURRENCY", "8")),
+                max_queue=int(os.getenv("ADMISSION_LLM_QUEUE", "32")),
+                queue_timeout=timeout,
+            ),
+            RouteLimit(
+                "generate",
+                r"/api/meta-agent/(generate|generate-stream)$",
+                max_concurrency=int(os.getenv("ADMISSION_GENERATE_CONCURRENCY", "16")),
+                max_queue=int(os.getenv("ADMISSION_GENERATE_QUEUE", "64")),
+                queue_timeout=timeout,
+            ),
+        ]
+    return _route_limits
+
+
+def route_limit(name: str) -> Optional[RouteLimit]:
+    """Grupo configurado con ese nombre (None si el control no está activo)."""
+    for limit in _route_limits:
+        if limit.name == name:
+            return limit
+    return None
+
+
+def admission_stats() -> Dict[str, Dict[str, float]]:
+    """Métricas de los grupos por defecto."""
+    return {limit.name: limit.stats() for limit in _route_limits}
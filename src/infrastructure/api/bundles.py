@@ -0,0 +1,118 @@
+"""
+Empaquetado en streaming de agentes generados (tar o zip).
+
+Los archivos se leen y se emiten por bloques a medida que se envían: el
+paquete nunca se arma completo en memoria, sin importar cuántos agentes
+incluya.
+"""
+
+import io
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, List, NamedTuple, Union
+
+# Tamaño de los bloques leídos de cada archivo
+BLOCK_SIZE = 64 * 1024
+
+
+class BundleFile(NamedTuple):
+    """Archivo a empaquetar, leído con ``open`` al momento de enviarlo."""
+
+    name: str
+    size: int
+    mtime: float
+    open: Callable[[], IO[bytes]]
+
+
+def _bundle_file(item: Union[Path, BundleFile]) -> BundleFile:
+    """Normaliza una ruta local a BundleFile."""
+    if isinstance(item, BundleFile):
+        return item
+    path = Path(item)
+    stat = path.stat()
+    return BundleFile(path.name, stat.st_size, stat.st_mtime, lambda: open(path, "rb"))
+
+
+def iter_tar(files: Iterable[Union[Path, BundleFile]]) -> Iterator[bytes]:
+    """
+    Genera un archivo tar (formato POSIX) con los archivos indicados.
+
+    Args:
+        files: Rutas o BundleFile a incluir (se guardan con su nombre, sin directorios)
+
+    Yields:
+        Bloques del tar
+    """
+    for item in files:
+        entry = _bundle_file(item)
+        with entry.open() as source:
+            info = tarfile.TarInfo(entry.name)
+            info.size = entry.size
+            info.mtime = int(entry.mtime)
+            info.mode = 0o644
+            yield info.tobuf(format=tarfile.PAX_FORMAT)
+
+            remaining = info.size
+            while remaining > 0:
+                block = source.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    # El archivo se acortó mientras se enviaba
+                    block = b"\0" * remaining
+                remaining -= len(block)
+                yield block
+
+        padding = -info.size % tarfile.BLOCKSIZE
+        if padding:
+            yield b"\0" * padding
+
+    # Fin del archivo: dos bloques vacíos
+    yield b"\0" * (tarfile.BLOCKSIZE * 2)
+
+
+class _Sink(io.RawIOBase):
+    """Destino no posicionable que acumula lo escrito hasta que se retira."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> Iterator[bytes]:
+        chunks, self._chunks = self._chunks, []
+        if chunks:
+            yield b"".join(chunks)
+
+
+def iter_zip(files: Iterable[Union[Path, BundleFile]]) -> Iterator[bytes]:
+    """
+    Genera un archivo zip (deflate) con los archivos indicados.
+
+    Como el destino no es posicionable, zipfile usa descriptores de datos
+    tras cada archivo en lugar de reescribir las cabeceras.
+
+    Args:
+        files: Rutas o BundleFile a incluir (se guardan con su nombre, sin directorios)
+
+    Yields:
+        Bloques del zip
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for item in files:
+            entry = _bundle_file(item)
+            info = zipfile.ZipInfo(entry.name, date_time=time.localtime(entry.mtime)[:6])
+            info.external_attr = 0o644 << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with entry.open() as source, archive.open(info, "w", force_zip64=True) as target:
+                while block := source.read(BLOCK_SIZE):
+                    target.write(block)
+                    yield from sink.drain()
+            yield from sink.drain()
+    yield from sink.drain()
@@ -0,0 +1,125 @@
+"""
+Cancelación del trabajo cuando el cliente se desconecta.
+
+Si un cliente abandona una solicitud (cierra la pestaña, corta un stream),
+el trabajo que la atendía se cancela en lugar de seguir consumiendo tokens
+del LLM. La cancelación llega como ``asyncio.CancelledError`` a las etapas
+del Meta-Agente, que cierran sus streams de agno.
+"""
+
+import asyncio
+from collections import Counter
+from typing import AsyncIterator, Awaitable, Dict, Optional, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+# Segundos entre comprobaciones de desconexión
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class ClientDisconnected(Exception):
+    """El cliente se desconectó antes de recibir la respuesta."""
+
+
+class CancellationStats:
+    """Contador de trabajos cancelados por etapa."""
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+
+    def record(self, stage: str) -> None:
+        """Registra una cancelación en la etapa indicada."""
+        self._counts[stage] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Cancelaciones por etapa."""
+        return dict(self._counts)
+
+
+# Métricas del proceso
+cancellation_stats = CancellationStats()
+
+
+async def wait_for_disconnect(request: Request) -> None:
+    """Retorna cuando el cliente de ``request`` se desconecta."""
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def run_cancellable(request: Request, stage: str, work: Awaitable[T]) -> T:
+    """
+    Ejecuta ``work`` y lo cancela si el cliente se desconecta.
+
+    Args:
+        request: Solicitud HTTP del cliente
+        stage: Nombre de la etapa (para métricas)
+        work: Corrutina o future a ejecutar
+
+    Returns:
+        Resultado de ``work``
+
+    Raises:
+        ClientDisconnected: Si el cliente se desconectó antes de terminar
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        cancellation_stats.record(stage)
+        raise ClientDisconnected(stage)
+    except asyncio.CancelledError:
+        cancellation_stats.record(stage)
+        raise
+    finally:
+        watcher.cancel()
+        task.cancel()
+
+
+async def stream_cancellable(
+    request: Request, stage: str, events: AsyncIterator[T]
+) -> AsyncIterator[T]:
+    """
+    Itera ``events`` mientras el cliente siga conectado.
+
+    Si el cliente se desconecta (o el servidor cierra la respuesta), el
+    paso pendiente del iterador se cancela, de modo que la cancelación llega
+    a la llamada al LLM en curso.
+
+    Args:
+        request: Solicitud HTTP del cliente
+        stage: Nombre de la etapa (para métricas)
+        events: Iterador asíncrono con el trabajo (p. ej. MetaAgent.astream_plan)
+
+    Yields:
+        Los elementos de ``events``
+    """
+    watcher = asyncio.ensure_future(wait_for_disconnect(request))
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(events.__anext__())
+            await asyncio.wait({pending, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if not pending.done():
+                cancellation_stats.record(stage)
+                return
+            try:
+                item = pending.result()
+            except StopAsyncIteration:
+                return
+            yield item
+    except (asyncio.CancelledError, GeneratorExit):
+        cancellation_stats.record(stage)
+        raise
+    finally:
+        watcher.cancel()
+        if pending is not None and not pending.done():
+            # Cancelar el paso en curso cierra el iterador desde dentro
+            pending.cancel()
+        else:
+            aclose = getattr(events, "aclose", None)
+            if aclose is not None:
+                asyncio.ensure_future(aclose())
@@ -0,0 +1,254 @@
+"""
+Feed de cambios de los agentes generados.
+
+Los clientes se suscriben una vez y reciben eventos ``created``, ``updated``
+y ``deleted`` con la versión del manifiesto, en lugar de consultar
+``GET /generated`` periódicamente. Los cambios llegan de dos fuentes:
+
+- ``notify``: ``save_agent_file`` avisa del archivo que acaba de escribir
+  (sin listar el almacenamiento)
+- un observador que lista el almacenamiento cada cierto tiempo para detectar
+  escrituras externas; solo corre mientras haya suscriptores y es uno por
+  feed, sin importar cuántos clientes estén conectados
+
+Cada evento tiene un número de secuencia; con ``Last-Event-ID`` el cliente
+recibe los eventos que se perdió mientras estuvo desconectado.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from src.infrastructure.storage.agent_store import StoredAgent
+
+
+class _Subscriber:
+    """Cola de eventos de un cliente, atada a su event loop."""
+
+    __slots__ = ("loop", "queue")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict]" = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event: Dict) -> None:
+        """Encola el evento (se ejecuta en el loop del suscriptor)."""
+        if self.queue.full():
+            # Cliente demasiado lento: descartar lo pendiente y pedirle releer
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = {**event, "type": "reset"}
+        self.queue.put_nowait(event)
+
+
+class ChangeFeed:
+    """Feed de cambios de los agentes generados de un tenant."""
+
+    def __init__(
+        self,
+        list_entries: Callable[[], List[StoredAgent]],
+        stat_entry: Callable[[str], Optional[StoredAgent]],
+        version_of: Callable[[List[StoredAgent]], str],
+        poll_interval: float = 2.0,
+        history_size: int = 1024,
+    ):
+        """
+        Inicializa el feed.
+
+        Args:
+            list_entries: Retorna los archivos de agentes
+            stat_entry: Retorna un archivo por nombre (None si no existe)
+            version_of: Calcula la versión del manifiesto a partir de los archivos
+            poll_interval: Segundos entre revisiones del almacenamiento
+            history_size: Eventos retenidos para reanudar con Last-Event-ID
+                (también es el máximo de eventos pendientes por cliente)
+        """
+        self._list_entries = list_entries
+        self._stat_entry = stat_entry
+        self._version_of = version_of
+        self.poll_interval = poll_interval
+        self.history_size = max(history_size, 1)
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[Dict[str, StoredAgent]] = None
+        self._version = ""
+        self._seq = 0
+        self._history: Deque[Dict] = deque(maxlen=self.history_size)
+        self._subscribers: Set[_Subscriber] = set()
+        self._watcher: Optional[asyncio.Task] = None
+        self.scans = 0
+
+    # ==================== Detección de cambios ====================
+
+    def scan(self) -> List[Dict]:
+        """
+        Compara el almacenamiento con el último estado conocido.
+
+        La primera llamada solo fija la línea base.
+
+        Returns:
+            Eventos publicados
+        """
+        entries = self._list_entries()
+        current = {entry.filename: entry for entry in entries}
+        with self._lock:
+            self.scans += 1
+            if self._snapshot is None:
+                self._snapshot = current
+                self._version = self._version_of(entries)
+                return []
+
+            changes = []
+            for name, entry in current.items():
+                previous = self._snapshot.get(name)
+                if previous is None:
+                    changes.append(("created", name, entry))
+                elif previous.version != entry.version:
+                    changes.append(("updated", name, entry))
+            for name in self._snapshot.keys() - current.keys():
+                changes.append(("deleted", name, None))
+
+            self._snapshot = current
+            return self._publish(changes)
+
+    def notify(self, filename: str) -> List[Dict]:
+        """
+        Registra el cambio de un archivo concreto sin listar el almacenamiento.
+
+        Si aún no hay línea base (nadie se ha suscrito) no hace nada: el
+        primer escaneo ya incluirá el archivo.
+
+        Returns:
+            Eventos publicados
+        """
+        if self._snapshot is None:
+            return []
+        entry = self._stat_entry(filename)
+
+        with self._lock:
+            previous = self._snapshot.get(filename)
+            if entry is None:
+                if previous is None:
+                    return []
+                del self._snapshot[filename]
+                return self._publish([("deleted", filename, None)])
+            if previous is not None and previous.version == entry.version:
+                return []
+            self._snapshot[filename] = entry
+            kind = "created" if previous is None else "updated"
+            return self._publish([(kind, filename, entry)])
+
+    def _publish(self, changes: List[Tuple[str, str, Optional[StoredAgent]]]) -> List[Dict]:
+        """Numera los cambios y los entrega a los suscriptores (con el lock tomado)."""
+        if not changes:
+            return []
+        self._version = self._version_of(list(self._snapshot.values()))
+
+        events = []
+        for kind, name, entry in changes:
+            self._seq += 1
+            event = {
+                "type": kind,
+                "seq": self._seq,
+                "filename": name,
+                "manifest_version": self._version,
+            }
+            if entry is not None:
+                event["size_bytes"] = entry.size
+                event["modified_at"] = datetime.fromtimestamp(entry.modified).isoformat()
+            self._history.append(event)
+            events.append(event)
+
+        for subscriber in list(self._subscribers):
+            for event in events:
+                try:
+                    subscriber.loop.call_soon_threadsafe(subscriber.deliver, event)
+                except RuntimeError:
+                    # El loop del suscriptor ya se cerró
+                    self._subscribers.discard(subscriber)
+        return events
+
+    # ==================== Suscripción ====================
+
+    async def subscribe(
+        self, last_seq: Optional[int] = None, heartbeat: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict]]:
+        """
+        Suscribe al cliente al feed.
+
+        El primer evento es ``manifest`` con la versión actual. Con
+        ``last_seq`` se entregan antes los eventos posteriores a ese número;
+        si ya no están en el historial se envía ``reset`` para que el
+        cliente vuelva a leer ``GET /generated``.
+
+        Args:
+            last_seq: Último número de secuencia recibido por el cliente
+            heartbeat: Segundos sin eventos tras los cuales se produce None
+
+        Yields:
+            Eventos del feed, o None como heartbeat
+        """
+        if self._snapshot is None:
+            await asyncio.to_thread(self.scan)
+
+        loop = asyncio.get_running_loop()
+        subscriber = _Subscriber(loop, self.history_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            initial = self._catch_up(last_seq)
+        self._ensure_watcher(loop)
+
+        try:
+            for event in initial:
+                yield event
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+                idle = not self._subscribers
+            if idle and self._watcher is not None:
+                self._watcher.cancel()
+                self._watcher = None
+
+    def _catch_up(self, last_seq: Optional[int]) -> List[Dict]:
+        """Eventos iniciales de una suscripción (con el lock tomado)."""
+        manifest = {
+            "type": "manifest",
+            "seq": self._seq,
+            "manifest_version": self._version,
+            "total": len(self._snapshot),
+        }
+        if last_seq is None or last_seq >= self._seq:
+            return [manifest]
+        oldest = self._history[0]["seq"] if self._history else self._seq + 1
+        if last_seq + 1 < oldest:
+            return [{**manifest, "type": "reset"}]
+        missed = [event for event in self._history if event["seq"] > last_seq]
+        return [*missed, manifest]
+
+    def _ensure_watcher(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Arranca el observador si no está corriendo en este loop."""
+        watcher = self._watcher
+        if watcher is None or watcher.done() or watcher.get_loop() is not loop:
+            self._watcher = loop.create_task(self._watch())
+
+    async def _watch(self) -> None:
+        """Revisa el almacenamiento mientras haya suscriptores."""
+        while self._subscribers:
+            await asyncio.sleep(self.poll_interval)
+            await asyncio.to_thread(self.scan)
+
+    def stats(self) -> Dict:
+        """Métricas del feed."""
+        return {
+            "subscribers": len(self._subscribers),
+            "seq": self._seq,
+            "scans": self.scans,
+            "manifest_version": self._version,
+        }
@@ -0,0 +1,211 @@
+"""
+Compresión de respuestas (brotli o gzip) para la API.
+
+Middleware ASGI que comprime las respuestas JSON, de texto y los streams
+SSE según ``Accept-Encoding``. En los streams cada fragmento se vacía del
+compresor al enviarlo, de modo que los eventos llegan sin demora. Brotli se
+usa cuando el paquete ``brotli`` está instalado; si no, gzip.
+
+Las respuestas que ya traen ``Content-Encoding``, las que admiten rangos
+(archivos servidos con ``Accept-Ranges``) y las muy pequeñas se envían tal
+cual.
+"""
+
+import zlib
+from typing import Dict, Optional, Sequence
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+# Tipos de contenido comprimibles
+COMPRESSIBLE_TYPES = ("application/json", "text/event-stream", "text/plain", "text/html")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Elige la codificación a partir de la cabecera Accept-Encoding.
+
+    Returns:
+        "br", "gzip" o None si el cliente no acepta ninguna
+    """
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    def allowed(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Compresor incremental con la misma interfaz para gzip y brotli."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool) -> bytes:
+        """Comprime ``data``; con ``flush`` vacía el compresor para enviar ya."""
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        """Cierra el stream comprimido."""
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Middleware ASGI de compresión de respuestas."""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        content_types: Sequence[str] = COMPRESSIBLE_TYPES,
+    ):
+        """
+        Inicializa el middleware.
+
+        Args:
+            app: Aplicación ASGI envuelta
+            minimum_size: Tamaño mínimo (bytes) de una respuesta completa para comprimirla
+            gzip_level: Nivel de compresión gzip (1-9)
+            brotli_quality: Calidad de brotli (0-11)
+            content_types: Tipos de contenido que se comprimen
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = tuple(content_types)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, send, encoding)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    """
+    Envoltura de ``send`` que decide y aplica la compresión de una respuesta.
+
+    El inicio de la respuesta se retiene hasta ver el primer fragmento del
+    cuerpo: una respuesta completa pequeña se envía sin comprimir y un
+    stream se comprime fragmento a fragmento.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, send, encoding: str):
+        self.middleware = middleware
+        self.send = send
+        self.encoding = encoding
+        self.start: Optional[dict] = None
+        self.compressor: Optional[_Compressor] = None
+
+    def _should_compress(self, message: dict) -> bool:
+        if message.get("status", 200) in (204, 206, 304):
+            return False
+        headers = {name.lower(): value for name, value in message.get("headers", [])}
+        if b"content-encoding" in headers or b"accept-ranges" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip()
+        return content_type in self.middleware.content_types
+
+    def _compressed_start(self, start: dict, length: Optional[int]) -> dict:
+        headers = []
+        for name, value in start.get("headers", []):
+            lower = name.lower()
+            if lower == b"content-length":
+                continue
+            if lower == b"etag" and value.endswith(b'"'):
+                # La representación comprimida tiene su propio ETag fuerte
+                value = value[:-1] + f'-{self.encoding}"'.encode()
+            headers.append((name, value))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**start, "headers": headers}
+
+    async def __call__(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            if self._should_compress(message):
+                self.start = message
+            else:
+                await self.send(message)
+            return
+
+        if self.start is None and self.compressor is None:
+            # Respuesta que no se comprime
+            await self.send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            # Extensiones (pathsend, zerocopysend): enviar sin comprimir
+            start, self.start = self.start, None
+            if start is not None:
+                await self.send(start)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.middleware.minimum_size:
+                await self.send(start)
+                await self.send(message)
+                return
+
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            if not more_body:
+                compressed = self.compressor.compress(body, flush=False) + self.compressor.finish()
+                await self.send(self._compressed_start(start, len(compressed)))
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self._compressed_start(start, None))
+
+        if more_body:
+            chunk = self.compressor.compress(body, flush=True)
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            chunk = self.compressor.compress(body, flush=False) + self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
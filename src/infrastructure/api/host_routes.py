@@ -0,0 +1,131 @@
+"""
+Rutas del host de agentes generados.
+
+Sirve los agentes generados de cada tenant desde el proceso de AgentOS
+usando un pool LRU de instancias calientes por tenant:
+- GET /agents - Listar agentes disponibles y estado del pool
+- POST /run/{agent} - Ejecutar un agente (con streaming SSE opcional)
+"""
+
+import asyncio
+import json
+import os
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.infrastructure.api.meta_routes import get_tenant
+from src.infrastructure.runtime.agent_pool import StoreAgentPool
+from src.infrastructure.storage.agent_store import DEFAULT_TENANT, get_agent_store
+
+router = APIRouter()
+
+# Pools del proceso por tenant; tamaño configurable por entorno
+_pools: Dict[str, StoreAgentPool] = {}
+
+
+def get_pool(tenant: str = DEFAULT_TENANT) -> StoreAgentPool:
+    """Retorna el pool de agentes del tenant, creándolo si no existe."""
+    store = get_agent_store()
+    pool = _pools.get(tenant)
+    if pool is None or pool.store is not store:
+        max_size = int(os.getenv("AGENT_HOST_POOL_SIZE", "32"))
+        pool = _pools[tenant] = StoreAgentPool(store, tenant, max_size=max_size)
+    return pool
+
+
+# ==================== Modelos de Request/Response ====================
+
+
+class RunRequest(BaseModel):
+    """Request para ejecutar un agente generado."""
+
+    prompt: str = Field(description="Mensaje o tarea para el agente")
+    stream: bool = Field(default=False, description="Responder con eventos SSE")
+    session_id: Optional[str] = Field(default=None, description="Sesión del agente")
+    user_id: Optional[str] = Field(default=None, description="Usuario de la sesión")
+
+
+class RunResponse(BaseModel):
+    """Response de una ejecución sin streaming."""
+
+    agent: str
+    content: str
+
+
+# ==================== Endpoints ====================
+
+
+@router.get("/agents")
+async def list_hosted_agents(tenant: str = Depends(get_tenant)):
+    """Listar agentes disponibles para el host y estado del pool."""
+    pool = get_pool(tenant)
+    agents = await asyncio.to_thread(pool.discover)
+    return {
+        "agents": [
+            {"name": name, "filename": path.name} for name, path in sorted(agents.items())
+        ],
+        "total": len(agents),
+        "loaded": pool.loaded(),
+        "pool": pool.stats(),
+    }
+
+
+@router.post("/run/{agent_name}")
+async def run_hosted_agent(
+    agent_name: str, req: RunRequest, tenant: str = Depends(get_tenant)
+):
+    """
+    Ejecutar un agente generado.
+
+    Con ``stream=true`` retorna eventos SSE:
+    - content: Fragmento de la respuesta
+    - complete: Ejecución completada
+    - error: Error durante la ejecución
+    """
+    pool = get_pool(tenant)
+    try:
+        # Reservado hasta terminar: un desalojo no lo cierra a mitad de la ejecución
+        agent = await asyncio.to_thread(pool.acquire, agent_name)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Agente no encontrado: {agent_name}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error al cargar el agente: {str(e)}"
+        )
+
+    run_kwargs = {"session_id": req.session_id, "user_id": req.user_id}
+
+    if not req.stream:
+        try:
+            response = await agent.arun(req.prompt, **run_kwargs)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Error al ejecutar el agente: {str(e)}"
+            )
+        finally:
+            pool.release(agent)
+        return RunResponse(agent=agent_name, content=str(response.content or ""))
+
+    async def event_generator():
+        try:
+            async for event in agent.arun(req.prompt, stream=True, **run_kwargs):
+                content = getattr(event, "content", None)
+                if isinstance(content, str) and content:
+                    yield f"data: {json.dumps({'type': 'content', 'content': content})}\n\n"
+            yield f"data: {json.dumps({'type': 'complete', 'agent': agent_name})}\n\n"
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+        finally:
+            pool.release(agent)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
@@ -0,0 +1,59 @@
+"""
+ETags y peticiones condicionales.
+
+Los ETags son fuertes y se derivan del contenido lógico de la respuesta
+(el hash del plan canónico o la versión del manifiesto de agentes). Con
+``If-None-Match`` coincidente la ruta responde ``304 Not Modified`` sin
+volver a calcular el cuerpo.
+"""
+
+from typing import Any, Optional
+
+from fastapi import Response
+
+from src.infrastructure.api.single_flight import canonical_key
+
+# Sufijos que el middleware de compresión agrega al ETag de cada codificación
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Calcula un ETag fuerte a partir de datos serializables en JSON.
+
+    Returns:
+        ETag entre comillas (p. ej. ``"3f2a..."``)
+    """
+    return f'"{canonical_key(*parts)[:32]}"'
+
+
+def _opaque(tag: str) -> str:
+    """Valor del ETag sin prefijo débil, comillas ni sufijo de codificación."""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[: -len(suffix)]
+    return tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indica si la cabecera If-None-Match coincide con el ETag.
+
+    Usa la comparación débil de RFC 9110 para If-None-Match y acepta las
+    variantes comprimidas del mismo ETag.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    expected = _opaque(etag)
+    return any(_opaque(tag) == expected for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str, cache_control: str = "no-cache") -> Response:
+    """Respuesta 304 con el ETag vigente."""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
@@ -0,0 +1,195 @@
+"""
+Rutas de trabajos de generación en segundo plano.
+
+Un trabajo ejecuta el ciclo completo (análisis, plan y generación) fuera
+de la solicitud HTTP, en la cola persistente de ``job_queue``:
+- POST / - Encolar un trabajo (202, o 429 si la cola está llena)
+- GET / - Estado de la cola (trabajos del tenant)
+- GET /{job_id} - Estado del trabajo (posición en la cola si espera)
+- GET /{job_id}/result - Resultado del trabajo terminado
+- DELETE /{job_id} - Cancelar un trabajo en espera
+
+Los trabajos pertenecen al tenant de la solicitud (cabecera X-Tenant-ID):
+otro tenant no puede consultarlos ni cancelarlos. Los trabajos terminados
+se conservan JOB_RESULT_TTL_SECONDS (por defecto 24 h).
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+
+from src.infrastructure.api.meta_routes import (
+    GenerateOptions,
+    get_meta_agent,
+    get_tenant,
+    render_agent,
+)
+from src.infrastructure.runtime.job_queue import (
+    CANCELLED,
+    DEFAULT_RESULT_TTL,
+    JobQueue,
+    QueueFullError,
+)
+from src.infrastructure.storage.agent_files import generate_filename, save_agent_file
+from src.infrastructure.storage.agent_store import DEFAULT_TENANT, get_agent_store
+
+router = APIRouter()
+
+# Cola del proceso (se crea y arranca en la primera solicitud)
+_queue: Optional[JobQueue] = None
+
+
+# ==================== Modelos de Request/Response ====================
+
+
+class JobRequest(BaseModel):
+    """Request para encolar un trabajo de generación."""
+
+    request: str = Field(description="Solicitud o conversación completa con el usuario")
+    priority: Literal["interactive", "normal", "batch"] = Field(
+        default="normal", description="Clase de prioridad del trabajo"
+    )
+    analyze: bool = Field(
+        default=True, description="Ejecutar el analyzer antes de planificar"
+    )
+    options: Optional[GenerateOptions] = Field(default_factory=GenerateOptions)
+
+
+# ==================== Utilidades ====================
+
+
+def run_generation_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ejecuta un trabajo completo: análisis, plan y generación.
+
+    Sin usuario que responda, las preguntas del analyzer quedan registradas
+    en el resultado y se continúa con la información disponible (igual que
+    una respuesta vacía en el modo interactivo).
+    """
+    meta_agent = get_meta_agent()
+    request = payload["request"].strip()
+    options = GenerateOptions(**payload.get("options") or {})
+    tenant = payload.get("tenant") or DEFAULT_TENANT
+    conversation = request if request.startswith("Usuario:") else f"Usuario: {request}"
+
+    analysis = None
+    if payload.get("analyze", True):
+        analysis = meta_agent.analyze_request(request, conversation)
+        if "INFO_COMPLETA" in analysis:
+            analysis = None
+
+    plan = meta_agent.create_plan(conversation).canonical()
+    code = render_agent(plan, options.output_format)
+
+    if options.save_to_file:
+        filename, filepath = save_agent_file(plan, code, options.output_format, tenant)
+    else:
+        filename = generate_filename(plan, options.output_format)
+        filepath = get_agent_store().location(tenant, filename)
+
+    return {
+        "plan": plan.model_dump(),
+        "preguntas_pendientes": analysis,
+        "code": code,
+        "filename": filename,
+        "filepath": filepath,
+        "lines": len(code.split("\n")),
+    }
+
+
+def get_job_queue() -> JobQueue:
+    """Retorna la cola de trabajos del proceso, creándola si no existe."""
+    global _queue
+    if _queue is None:
+        default_db = Path(os.getcwd()) / "generated" / "jobs.sqlite3"
+        _queue = JobQueue(
+            Path(os.getenv("JOB_QUEUE_DB", str(default_db))),
+            run_generation_job,
+            workers=int(os.getenv("JOB_WORKERS", "2")),
+            max_pending=int(os.getenv("JOB_QUEUE_MAX", "100")),
+            result_ttl=float(os.getenv("JOB_RESULT_TTL_SECONDS", str(DEFAULT_RESULT_TTL))),
+        )
+        _queue.start()
+    return _queue
+
+
+def _get_job(job_id: str, tenant: str) -> Dict[str, Any]:
+    """Retorna el trabajo del tenant o responde 404."""
+    job = get_job_queue().get(job_id, tenant)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
+
+# ==================== Endpoints ====================
+
+
+@router.post("", status_code=202)
+async def submit_job(req: JobRequest, tenant: str = Depends(get_tenant)):
+    """
+    Encolar un trabajo de análisis, plan y generación.
+
+    Retorna 429 con Retry-After cuando la cola está llena para la prioridad
+    solicitada; los trabajos interactive tienen capacidad reservada. El
+    agente se guarda en el tenant de la solicitud (cabecera X-Tenant-ID).
+    """
+    if not req.request.strip():
+        raise HTTPException(
+            status_code=422, detail="No puedo crear un agente sin una descripción"
+        )
+    try:
+        job = get_job_queue().submit(
+            {**req.model_dump(), "tenant": tenant}, req.priority, tenant=tenant
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    return {key: job.get(key) for key in ("job_id", "status", "priority", "position")}
+
+
+@router.get("")
+async def job_queue_stats(tenant: str = Depends(get_tenant)):
+    """Estado de la cola de trabajos, con los conteos del tenant de la solicitud."""
+    return get_job_queue().stats(tenant)
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, tenant: str = Depends(get_tenant)):
+    """Estado del trabajo (sin el resultado)."""
+    job = _get_job(job_id, tenant)
+    job.pop("result")
+    return job
+
+
+@router.get("/{job_id}/result")
+async def get_job_result(job_id: str, tenant: str = Depends(get_tenant)):
+    """
+    Resultado del trabajo.
+
+    Retorna 409 mientras el trabajo no haya terminado (o si fue cancelado).
+    """
+    job = _get_job(job_id, tenant)
+    if job["status"] == "done":
+        return {"job_id": job_id, **job["result"]}
+    if job["status"] == "failed":
+        raise HTTPException(status_code=500, detail=f"Error en el trabajo: {job['error']}")
+    raise HTTPException(status_code=409, detail=f"Trabajo {job['status']}")
+
+
+@router.delete("/{job_id}")
+async def cancel_job(job_id: str, tenant: str = Depends(get_tenant)):
+    """
+    Cancelar un trabajo en espera.
+
+    Retorna 409 si el trabajo ya está en ejecución o terminó.
+    """
+    job = get_job_queue().cancel(job_id, tenant)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    if job["status"] != CANCELLED:
+        raise HTTPException(
+            status_code=409, detail=f"Trabajo {job['status']}: no se puede cancelar"
+        )
+    return {"job_id": job_id, "status": job["status"]}
@@ -2,27 +2,102 @@
 Rutas custom de API para el Meta-Agente.
 
 Endpoints para generación de código de agentes:
+- POST /plan - Crear el plan del agente a partir de la conversación
+- POST /plan-stream - Crear el plan con streaming de campos parciales
 - POST /generate - Generar código del agente
 - POST /generate-stream - Generación con streaming
 - GET /generated - Listar agentes generados
+- GET /generated/events - Feed de cambios de los agentes (SSE o WebSocket)
+- GET /generated/{filename} - Descargar un agente generado
+- GET /generated/bundle - Descargar varios agentes (tar o zip)
+- GET /generated/{filename}/versions - Historial de versiones de un agente
+- GET /generated/{filename}/versions/{version} - Contenido de una versión
+- GET /generated/{filename}/diff - Diff entre dos versiones
 """
 
 import asyncio
 import json
 import os
+import re
+from collections import OrderedDict
 from datetime import datetime
-from pathlib import Path
-from typing import Dict, List, Optional
-
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import StreamingResponse
+from functools import partial
+from typing import Dict, List, Literal, Optional
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
-from src.application.services.meta_agent import AgentPlan
+from src.application.services.meta_agent import AgentPlan, MetaAgent
+from src.application.services.rate_limiter import limiter_stats
+from src.infrastructure.api.admission import admission_stats
+from src.infrastructure.api.bundles import BundleFile, iter_tar, iter_zip
+from src.infrastructure.api.cancellation import (
+    ClientDisconnected,
+    cancellation_stats,
+    run_cancellable,
+    stream_cancellable,
+)
+from src.infrastructure.api.change_feed import ChangeFeed
+from src.infrastructure.api.http_cache import etag_matches, make_etag, not_modified
+from src.infrastructure.api.single_flight import SingleFlight, canonical_key
+from src.infrastructure.api.sse import (
+    HEARTBEAT,
+    ReplayBuffer,
+    format_event,
+    wait_with_heartbeats,
+)
+from src.infrastructure.storage.agent_files import (
+    add_save_listener,
+    generate_filename,
+    save_agent_file,
+)
+from src.infrastructure.storage.agent_store import (
+    DEFAULT_TENANT,
+    StoredAgent,
+    check_filename,
+    get_agent_store,
+    normalize_tenant,
+)
+from src.infrastructure.storage.agent_versions import get_agent_versions
 from src.infrastructure.templates.agent_templates import AgentTemplate
 
 router = APIRouter()
 
+# Solicitudes idénticas concurrentes comparten una sola ejecución
+_render_flight = SingleFlight()
+_plan_flight = SingleFlight()
+
+# Eventos de /generate-stream retenidos para reanudar con Last-Event-ID
+_stream_buffer = ReplayBuffer(
+    max_streams=int(os.getenv("SSE_REPLAY_STREAMS", "256")),
+    ttl_seconds=float(os.getenv("SSE_REPLAY_TTL_SECONDS", "300")),
+)
+
+# Segundos entre heartbeats de los streams SSE
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Listados de /generated por ETag (versión del manifiesto y paginación)
+GENERATED_CACHE_SIZE = 16
+_generated_cache: "OrderedDict[str, GeneratedAgentsResponse]" = OrderedDict()
+
+# Feeds de cambios de /generated/events por tenant
+GENERATED_WATCH_INTERVAL = float(os.getenv("GENERATED_WATCH_INTERVAL", "2"))
+_change_feeds: Dict[str, ChangeFeed] = {}
+
+# Meta-agente del proceso (se crea en la primera solicitud de planificación)
+_meta_agent: Optional[MetaAgent] = None
+
 
 # ==================== Modelos de Request/Response ====================
 
@@ -37,6 +112,22 @@ class GenerateOptions(BaseModel):
     save_to_file: bool = Field(
         default=True, description="Guardar automáticamente el archivo"
     )
+    output_format: Literal["python", "spec"] = Field(
+        default="python",
+        description="Formato de salida: código Python o spec JSON para el runtime compartido",
+    )
+    chunk_size: int = Field(
+        default=int(os.getenv("SSE_CHUNK_SIZE", "8192")),
+        ge=256,
+        le=262144,
+        description="Caracteres de código por evento en /generate-stream",
+    )
+
+
+class PlanRequest(BaseModel):
+    """Request para crear el plan de un agente."""
+
+    conversation: str = Field(description="Conversación completa con el usuario")
 
 
 class GenerateRequest(BaseModel):
@@ -49,7 +140,7 @@ class GenerateRequest(BaseModel):
 class GenerateResponse(BaseModel):
     """Response con el código generado."""
 
-    code: str = Field(description="Código Python del agente")
+    code: str = Field(description="Código Python del agente (o spec JSON)")
     plan: AgentPlan = Field(description="Plan usado para generar")
     filename: str = Field(description="Nombre del archivo")
     filepath: str = Field(description="Ruta completa del archivo")
@@ -69,85 +160,246 @@ class GeneratedAgentInfo(BaseModel):
     lines: int
 
 
+class AgentVersionInfo(BaseModel):
+    """Metadatos de una versión de un agente generado."""
+
+    version: int
+    kind: str = Field(description="full (contenido completo) o delta (contra la anterior)")
+    size_bytes: int
+    stored_bytes: int = Field(description="Bytes ocupados en el almacenamiento (comprimido)")
+    sha256: str
+    created_at: str
+
+
+class AgentVersionsResponse(BaseModel):
+    """Historial de versiones de un agente generado."""
+
+    filename: str
+    versions: List[AgentVersionInfo]
+    total: int
+    size_bytes: int = Field(description="Suma del tamaño de todas las versiones")
+    stored_bytes: int = Field(description="Bytes que ocupa el historial")
+
+
 class GeneratedAgentsResponse(BaseModel):
     """Response con lista de agentes generados."""
 
     agents: List[GeneratedAgentInfo]
     total: int
     output_dir: str
+    manifest_version: str = Field(default="", description="Versión del manifiesto de agentes")
 
 
 # ==================== Utilidades ====================
 
 
-def get_output_dir() -> Path:
-    """Retorna el directorio de salida para agentes generados."""
-    output_dir = Path(os.getcwd()) / "generated" / "agents"
-    output_dir.mkdir(parents=True, exist_ok=True)
-    return output_dir
+def get_meta_agent() -> MetaAgent:
+    """Retorna el meta-agente del proceso, creándolo si no existe."""
+    global _meta_agent
+    if _meta_agent is None:
+        _meta_agent = MetaAgent()
+    return _meta_agent
 
 
-def generate_filename(plan: AgentPlan) -> str:
-    """Genera el nombre de archivo basado en el plan."""
-    safe_name = plan.nombre.lower().replace(" ", "_").replace("-", "_")
-    # Remover caracteres especiales
-    safe_name = "".join(c for c in safe_name if c.isalnum() or c == "_")
-    return f"{safe_name}_agent.py"
+def get_tenant(x_tenant_id: Optional[str] = Header(default=None)) -> str:
+    """Tenant de la solicitud (cabecera X-Tenant-ID; por defecto DEFAULT_TENANT)."""
+    try:
+        return normalize_tenant(x_tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def get_change_feed(tenant: str) -> ChangeFeed:
+    """Retorna el feed de cambios del tenant, creándolo si no existe."""
+    feed = _change_feeds.get(tenant)
+    if feed is None:
+        feed = _change_feeds.setdefault(
+            tenant,
+            ChangeFeed(
+                list_entries=lambda: get_agent_store().list(tenant),
+                stat_entry=lambda filename: get_agent_store().stat(tenant, filename),
+                version_of=manifest_version,
+                poll_interval=GENERATED_WATCH_INTERVAL,
+            ),
+        )
+    return feed
+
+
+def manifest_version(entries: List[StoredAgent]) -> str:
+    """
+    Versión del manifiesto de agentes generados.
+
+    Cambia cuando se crea, modifica o elimina cualquier archivo, sin
+    necesidad de leer su contenido.
+    """
+    return canonical_key(sorted((entry.filename, entry.version) for entry in entries))[:16]
+
+
+def _notify_change_feed(tenant: str, filename: str) -> None:
+    """Avisa al feed de cambios del tenant (si existe) del archivo guardado."""
+    feed = _change_feeds.get(tenant)
+    if feed is not None:
+        feed.notify(filename)
+
+
+add_save_listener(_notify_change_feed)
 
 
-def save_agent_file(plan: AgentPlan, code: str) -> tuple[str, str]:
+def render_agent(plan: AgentPlan, output_format: str = "python") -> str:
     """
-    Guarda el código del agente en un archivo.
+    Renderiza el plan con la plantilla adecuada según su tipo.
+
+    Args:
+        plan: Plan del agente
+        output_format: "python" para código completo o "spec" para JSON compacto
 
     Returns:
-        Tupla (filename, filepath)
+        Código Python o spec JSON como string
+    """
+    template = AgentTemplate()
+    plan_dict = plan.canonical().model_dump()
+
+    # Ajustar modelo si es necesario
+    if plan.es_equipo and plan.modelo == "deepseek-chat":
+        plan_dict["modelo"] = "deepseek-reasoner"
+
+    if output_format == "spec":
+        return template.generate_agent_spec(plan_dict)
+
+    kind = template.get_agent_kind(plan_dict)
+    if kind == "team":
+        return template.generate_agent_team(plan_dict)
+    elif kind == "workflow":
+        return template.generate_workflow(plan_dict)
+    elif kind == "memory":
+        return template.generate_agent_with_memory(plan_dict)
+    elif kind == "knowledge":
+        return template.generate_knowledge_agent(plan_dict)
+    else:
+        return template.generate_basic_agent(plan_dict)
+
+
+async def render_agent_coalesced(plan: AgentPlan, output_format: str = "python") -> str:
     """
-    output_dir = get_output_dir()
-    filename = generate_filename(plan)
-    filepath = output_dir / filename
+    Renderiza el plan compartiendo el resultado entre solicitudes idénticas.
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        f.write(code)
+    Args:
+        plan: Plan del agente
+        output_format: "python" o "spec"
 
-    return filename, str(filepath)
+    Returns:
+        Código Python o spec JSON como string
+    """
+    plan = plan.canonical()
+    key = canonical_key("render", plan.model_dump(), output_format)
+    return await _render_flight.do(
+        key, lambda: asyncio.to_thread(render_agent, plan, output_format)
+    )
 
 
 # ==================== Endpoints ====================
 
 
+@router.post("/plan", response_model=AgentPlan)
+async def create_agent_plan(req: PlanRequest, request: Request):
+    """
+    Crear un plan estructurado (AgentPlan) a partir de la conversación.
+
+    Las solicitudes concurrentes con la misma conversación (ignorando
+    diferencias de espacios) comparten una única llamada al planner, que
+    se cancela si todos los clientes que la esperan se desconectan.
+    """
+    key = canonical_key("plan", " ".join(req.conversation.split()))
+    try:
+        return await run_cancellable(
+            request,
+            "plan",
+            _plan_flight.do(key, lambda: get_meta_agent().acreate_plan(req.conversation)),
+        )
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Cliente desconectado")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error al crear el plan: {str(e)}"
+        )
+
+
+@router.post("/plan-stream")
+async def create_agent_plan_stream(req: PlanRequest, request: Request):
+    """
+    Crear el plan del agente con streaming.
+
+    Retorna eventos SSE (Server-Sent Events):
+    - start: Inicio de la planificación
+    - reasoning: Fragmento del razonamiento del planner
+    - token: Fragmento de la respuesta del planner
+    - field: Campo del plan completado (name, value), en cuanto está disponible
+    - complete: Plan final validado (plan)
+    - error: Error durante la planificación
+
+    Si el cliente se desconecta se cancela la llamada al planner.
+    """
+
+    async def event_generator():
+        try:
+            yield f"data: {json.dumps({'type': 'start', 'stage': 'planning'})}\n\n"
+
+            events = get_meta_agent().astream_plan(req.conversation)
+            async for event in stream_cancellable(request, "plan_stream", events):
+                if event["type"] == "plan":
+                    event = {"type": "complete", "plan": event["plan"]}
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+        except Exception as e:
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
+
+
 @router.post("/generate", response_model=GenerateResponse)
-async def generate_agent(req: GenerateRequest):
+async def generate_agent(
+    req: GenerateRequest,
+    response: Response,
+    tenant: str = Depends(get_tenant),
+):
     """
     Generar código Python del agente basado en el plan.
 
     Este endpoint toma un AgentPlan y genera el código Python completo
     del agente usando las plantillas apropiadas según el nivel y configuración.
+
+    El ETag identifica el código generado (hash del plan canónico y las
+    opciones). Al ser un POST que guarda el archivo no responde 304: el
+    guardado se hace siempre.
     """
     try:
-        # Seleccionar template según el tipo de agente
-        template = AgentTemplate()
-        plan_dict = req.plan.model_dump()
-
-        # Ajustar modelo si es necesario
-        if req.plan.es_equipo and req.plan.modelo == "deepseek-chat":
-            plan_dict["modelo"] = "deepseek-reasoner"
-
-        # Generar código según el tipo
-        if req.plan.es_equipo:
-            code = template.generate_agent_team(plan_dict)
-        elif req.plan.necesita_memoria or req.plan.nivel >= 3:
-            code = template.generate_agent_with_memory(plan_dict)
-        else:
-            code = template.generate_basic_agent(plan_dict)
+        # Generar código según el tipo (a partir del plan canónico)
+        plan = req.plan.canonical()
+        output_format = req.options.output_format
+        response.headers["ETag"] = make_etag(
+            "generate", tenant, plan.model_dump(), req.options.model_dump()
+        )
+        code = await render_agent_coalesced(plan, output_format)
 
         # Guardar archivo si está configurado
         filename = ""
         filepath = ""
         if req.options.save_to_file:
-            filename, filepath = save_agent_file(req.plan, code)
+            filename, filepath = await asyncio.to_thread(
+                save_agent_file, plan, code, output_format, tenant
+            )
         else:
-            filename = generate_filename(req.plan)
-            filepath = str(get_output_dir() / filename)
+            filename = generate_filename(plan, output_format)
+            filepath = get_agent_store().location(tenant, filename)
 
         # Calcular métricas
         lines = len(code.split("\n"))
@@ -155,7 +407,7 @@ async def generate_agent(req: GenerateRequest):
 
         return GenerateResponse(
             code=code,
-            plan=req.plan,
+            plan=plan,
             filename=filename,
             filepath=filepath,
             lines=lines,
@@ -170,83 +422,121 @@ async def generate_agent(req: GenerateRequest):
 
 
 @router.post("/generate-stream")
-async def generate_agent_stream(req: GenerateRequest):
+async def generate_agent_stream(
+    req: GenerateRequest,
+    request: Request,
+    last_event_id: Optional[str] = Header(default=None),
+    tenant: str = Depends(get_tenant),
+):
     """
     Generar código del agente con streaming de progreso.
 
-    Retorna eventos SSE (Server-Sent Events) con el progreso:
+    Retorna eventos SSE (Server-Sent Events) con id ``<stream>:<seq>``:
     - start: Inicio de generación
-    - progress: Progreso porcentual
-    - code_chunk: Fragmento de código
+    - progress: Progreso porcentual de cada etapa
+    - code_chunk: Fragmento de código (incluye el porcentaje)
     - complete: Generación completada
     - error: Error durante generación
+
+    Mientras se renderiza se envían comentarios de heartbeat. Si la
+    conexión se corta, repetir la misma solicitud con la cabecera
+    ``Last-Event-ID`` retoma el stream desde el último evento recibido
+    (409 si el plan o las opciones difieren); mientras tanto el trabajo
+    pendiente se cancela. Si el stream original ya llegó a guardar el
+    archivo, la reanudación no lo guarda de nuevo.
     """
+    # El plan canónico se usa para renderizar, guardar y validar reanudaciones
+    plan = req.plan.canonical()
+    key = canonical_key("generate-stream", tenant, plan.model_dump(), req.options.model_dump())
+    try:
+        resumed = _stream_buffer.replay(last_event_id, key)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     async def event_generator():
-        try:
-            # Evento de inicio
-            yield f"data: {json.dumps({'type': 'start', 'stage': 'analyzing'})}\n\n"
-            await asyncio.sleep(0.3)
-
-            # Preparar generación
-            yield f"data: {json.dumps({'type': 'progress', 'stage': 'planning', 'percentage': 10})}\n\n"
-            await asyncio.sleep(0.2)
-
-            # Generar código
-            template = AgentTemplate()
-            plan_dict = req.plan.model_dump()
-
-            if req.plan.es_equipo and req.plan.modelo == "deepseek-chat":
-                plan_dict["modelo"] = "deepseek-reasoner"
+        if resumed is not None:
+            stream_id, next_seq, pending, finished = resumed
+            for frame in pending:
+                yield frame
+            if finished:
+                return
+        else:
+            stream_id, next_seq = _stream_buffer.create(key), 0
 
-            yield f"data: {json.dumps({'type': 'progress', 'stage': 'generating', 'percentage': 30})}\n\n"
+        seq = 0
 
-            # Seleccionar y generar
-            if req.plan.es_equipo:
-                code = template.generate_agent_team(plan_dict)
-            elif req.plan.necesita_memoria or req.plan.nivel >= 3:
-                code = template.generate_agent_with_memory(plan_dict)
-            else:
-                code = template.generate_basic_agent(plan_dict)
+        def emit(data: Dict) -> Optional[str]:
+            """Frame del siguiente evento (None si el cliente ya lo recibió)."""
+            nonlocal seq
+            frame = _stream_buffer.emit(stream_id, seq, data)
+            seq += 1
+            return frame if seq > next_seq else None
 
-            yield f"data: {json.dumps({'type': 'progress', 'stage': 'code_ready', 'percentage': 70})}\n\n"
+        try:
+            for data in (
+                {"type": "start", "stage": "analyzing"},
+                {"type": "progress", "stage": "planning", "percentage": 10},
+                {"type": "progress", "stage": "generating", "percentage": 30},
+            ):
+                if frame := emit(data):
+                    yield frame
+
+            # Renderizar enviando heartbeats si tarda
+            output_format = req.options.output_format
+            render = asyncio.ensure_future(render_agent_coalesced(plan, output_format))
+            try:
+                async for heartbeat in wait_with_heartbeats(render, SSE_HEARTBEAT_SECONDS):
+                    yield heartbeat
+            finally:
+                render.cancel()
+            code = render.result()
 
-            # Enviar código en chunks
-            chunk_size = 500
+            if frame := emit({"type": "progress", "stage": "code_ready", "percentage": 70}):
+                yield frame
 
+            # Enviar código en chunks con el progreso en el mismo evento
+            chunk_size = req.options.chunk_size
             for index in range(0, len(code), chunk_size):
                 chunk = code[index : index + chunk_size]
-                yield f"data: {json.dumps({'type': 'code_chunk', 'content': chunk})}\n\n"
-
-                # Progreso incremental
-                progress = 70 + int((index / max(len(code), 1)) * 20)
-                yield f"data: {json.dumps({'type': 'progress', 'percentage': progress})}\n\n"
-                await asyncio.sleep(0.05)  # Simular trabajo
+                progress = 70 + int(((index + len(chunk)) / max(len(code), 1)) * 20)
+                if frame := emit({"type": "code_chunk", "content": chunk, "percentage": progress}):
+                    yield frame
 
-            # Guardar archivo
+            # Guardar archivo (salvo que el stream original ya lo hiciera)
             if req.options.save_to_file:
-                yield f"data: {json.dumps({'type': 'progress', 'stage': 'saving', 'percentage': 95})}\n\n"
-                filename, filepath = save_agent_file(req.plan, code)
-                await asyncio.sleep(0.2)
+                frame = emit({"type": "progress", "stage": "saving", "percentage": 95})
+                if frame:
+                    yield frame
+                    filename, filepath = await asyncio.to_thread(
+                        save_agent_file, plan, code, output_format, tenant
+                    )
+                else:
+                    filename = generate_filename(plan, output_format)
+                    filepath = get_agent_store().location(tenant, filename)
             else:
-                filename = generate_filename(req.plan)
-                filepath = str(get_output_dir() / filename)
+                filename = generate_filename(plan, output_format)
+                filepath = get_agent_store().location(tenant, filename)
 
             # Completado
             lines = len(code.split("\n"))
-            yield f"data: {json.dumps({
-                'type': 'complete',
-                'filename': filename,
-                'filepath': filepath,
-                'lines': lines,
-                'percentage': 100
-            })}\n\n"
+            if frame := emit({
+                "type": "complete",
+                "filename": filename,
+                "filepath": filepath,
+                "lines": lines,
+                "percentage": 100,
+            }):
+                yield frame
+            _stream_buffer.finish(stream_id)
 
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+            # El error se envía siempre, aunque su número ya se hubiera emitido
+            data = {"type": "error", "error": str(e)}
+            yield emit(data) or format_event(data)
+            _stream_buffer.finish(stream_id)
 
     return StreamingResponse(
-        event_generator(),
+        stream_cancellable(request, "generate_stream", event_generator()),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -256,41 +546,62 @@ async def generate_agent_stream(req: GenerateRequest):
 
 
 @router.get("/generated", response_model=GeneratedAgentsResponse)
-async def list_generated_agents(limit: int = 50, offset: int = 0):
+async def list_generated_agents(
+    response: Response,
+    limit: int = 50,
+    offset: int = 0,
+    if_none_match: Optional[str] = Header(default=None),
+    tenant: str = Depends(get_tenant),
+):
     """
     Listar agentes generados.
 
-    Retorna información de los archivos de agentes en el directorio generated/agents/
+    Retorna información de los archivos de agentes del tenant en el almacenamiento.
+
+    El ETag se deriva de la versión del manifiesto (nombres, tamaños y fechas
+    de los archivos): si nada cambió responde 304 sin leer los archivos.
     """
     try:
-        output_dir = get_output_dir()
+        store = get_agent_store()
 
-        # Buscar archivos Python
-        agent_files = sorted(
-            output_dir.glob("*_agent.py"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,  # Más recientes primero
-        )
+        # Buscar archivos (más recientes primero)
+        entries = await asyncio.to_thread(store.list, tenant)
+        version = manifest_version(entries)
+        etag = make_etag("generated", tenant, version, limit, offset)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+
+        cached = _generated_cache.get(etag)
+        if cached is not None:
+            return cached
 
         # Aplicar paginación
-        total = len(agent_files)
-        agent_files = agent_files[offset : offset + limit]
+        total = len(entries)
+        page = entries[offset : offset + limit]
 
         # Recopilar información
         agents_info = []
-        for filepath in agent_files:
-            stat = filepath.stat()
-
+        for entry in page:
+            stem = entry.filename.rsplit(".", 1)[0]
+            content = ""
             # Leer primeras líneas para extraer info del docstring
             try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    content = f.read()
-                    lines = content.split("\n")
+                data = await asyncio.to_thread(store.read, tenant, entry.filename)
+                content = data.decode("utf-8")
+                lines = content.split("\n")
 
-                    # Extraer nombre y rol del docstring
-                    nombre = (
-                        filepath.stem.replace("_agent", "").replace("_", " ").title()
-                    )
+                if entry.filename.endswith(".json"):
+                    # Formato spec: el plan viene serializado
+                    plan = json.loads(content).get("plan", {})
+                    plan_summary = {
+                        "nombre": plan.get("nombre", stem),
+                        "rol": plan.get("rol", "Agente AI"),
+                    }
+                else:
+                    # Extraer nombre y rol del docstring (el nombre sin el hash)
+                    nombre = re.sub(r"_[0-9a-f]{8}$", "", stem[: -len("_agent")])
+                    nombre = nombre.replace("_", " ").title()
                     rol = "Agente AI"
 
                     # Buscar info en el docstring
@@ -308,24 +619,29 @@ async def list_generated_agents(limit: int = 50, offset: int = 0):
                         "rol": rol,
                     }
             except Exception:
-                plan_summary = {"nombre": filepath.stem, "rol": "Unknown"}
+                plan_summary = {"nombre": stem, "rol": "Unknown"}
 
             agents_info.append(
                 GeneratedAgentInfo(
-                    filename=filepath.name,
-                    filepath=str(filepath),
+                    filename=entry.filename,
+                    filepath=store.location(tenant, entry.filename),
                     plan_summary=plan_summary,
-                    created_at=datetime.fromtimestamp(stat.st_mtime).isoformat(),
-                    size_bytes=stat.st_size,
-                    lines=len(content.split("\n")) if "content" in locals() else 0,
+                    created_at=datetime.fromtimestamp(entry.modified).isoformat(),
+                    size_bytes=entry.size,
+                    lines=len(content.split("\n")) if content else 0,
                 )
             )
 
-        return GeneratedAgentsResponse(
+        result = GeneratedAgentsResponse(
             agents=agents_info,
             total=total,
-            output_dir=str(output_dir),
+            output_dir=store.tenant_location(tenant),
+            manifest_version=version,
         )
+        _generated_cache[etag] = result
+        while len(_generated_cache) > GENERATED_CACHE_SIZE:
+            _generated_cache.popitem(last=False)
+        return result
 
     except Exception as e:
         raise HTTPException(
@@ -333,6 +649,275 @@ async def list_generated_agents(limit: int = 50, offset: int = 0):
         )
 
 
+def resolve_generated_file(tenant: str, filename: str) -> StoredAgent:
+    """
+    Metadatos de un agente generado a partir de su nombre de archivo.
+
+    Raises:
+        HTTPException: 404 si el nombre no es un agente generado existente
+    """
+    try:
+        stored = get_agent_store().stat(tenant, check_filename(filename))
+    except ValueError:
+        stored = None
+    if stored is None:
+        raise HTTPException(status_code=404, detail=f"Agente no encontrado: {filename}")
+    return stored
+
+
+def _parse_last_seq(value: Optional[str]) -> Optional[int]:
+    """Número de secuencia de un Last-Event-ID del feed (None si no es válido)."""
+    if value is None or not value.strip().isdigit():
+        return None
+    return int(value.strip())
+
+
+@router.get("/generated/events")
+async def generated_events(
+    last_event_id: Optional[str] = Header(default=None),
+    tenant: str = Depends(get_tenant),
+):
+    """
+    Feed de cambios de los agentes generados del tenant (SSE).
+
+    Eventos: manifest (al conectar), created, updated, deleted y reset
+    (volver a leer ``GET /generated``). Cada evento incluye la versión del
+    manifiesto; ``Last-Event-ID`` entrega los eventos perdidos.
+    """
+    last_seq = _parse_last_seq(last_event_id)
+    feed = get_change_feed(tenant)
+
+    async def event_generator():
+        async for event in feed.subscribe(last_seq, SSE_HEARTBEAT_SECONDS):
+            if event is None:
+                yield HEARTBEAT
+            else:
+                yield format_event(event, str(event["seq"]))
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        },
+    )
+
+
+@router.websocket("/generated/events")
+async def generated_events_websocket(
+    websocket: WebSocket,
+    last_event_id: Optional[str] = None,
+    tenant: Optional[str] = None,
+):
+    """
+    Feed de cambios de los agentes generados sobre WebSocket.
+
+    Mismos eventos que la versión SSE; ``?last_event_id=`` retoma el feed y
+    los heartbeats llegan como ``{"type": "heartbeat"}``. El tenant se indica
+    con ``?tenant=`` o la cabecera X-Tenant-ID.
+    """
+    try:
+        tenant = normalize_tenant(tenant or websocket.headers.get("x-tenant-id"))
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    await websocket.accept()
+    try:
+        async for event in get_change_feed(tenant).subscribe(
+            _parse_last_seq(last_event_id), SSE_HEARTBEAT_SECONDS
+        ):
+            await websocket.send_json(event or {"type": "heartbeat"})
+    except WebSocketDisconnect:
+        pass
+
+
+def _bundle_file(tenant: str, stored: StoredAgent) -> BundleFile:
+    """Entrada del paquete que lee el archivo del almacenamiento al enviarlo."""
+    return BundleFile(
+        stored.filename,
+        stored.size,
+        stored.modified,
+        partial(get_agent_store().open, tenant, stored.filename),
+    )
+
+
+@router.get("/generated/bundle")
+async def download_generated_bundle(
+    format: Literal["tar", "zip"] = "tar",
+    files: Optional[List[str]] = Query(default=None),
+    tenant: str = Depends(get_tenant),
+):
+    """
+    Descargar varios agentes generados en un solo archivo tar o zip.
+
+    Sin ``files`` incluye todos los agentes del tenant. El archivo se genera
+    en streaming mientras se envía, sin armarlo en memoria.
+    """
+    if files:
+        entries = [
+            await asyncio.to_thread(resolve_generated_file, tenant, filename)
+            for filename in dict.fromkeys(files)
+        ]
+    else:
+        entries = await asyncio.to_thread(get_agent_store().list, tenant)
+    bundle = [_bundle_file(tenant, stored) for stored in entries]
+
+    if format == "zip":
+        body, media_type = iter_zip(bundle), "application/zip"
+    else:
+        body, media_type = iter_tar(bundle), "application/x-tar"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="agents.{format}"',
+            "Cache-Control": "no-cache",
+        },
+    )
+
+
+@router.api_route("/generated/{filename}", methods=["GET", "HEAD"])
+async def download_generated_agent(
+    filename: str,
+    if_none_match: Optional[str] = Header(default=None),
+    tenant: str = Depends(get_tenant),
+):
+    """
+    Descargar el archivo de un agente generado.
+
+    En el almacenamiento local se sirve como archivo (sendfile cuando el
+    servidor lo soporta) con soporte de ``Range`` e ``If-Range``; en S3 se
+    transmite el objeto completo. El ETag se deriva de la versión del
+    archivo y ``If-None-Match`` responde 304.
+    """
+    store = get_agent_store()
+    stored = await asyncio.to_thread(resolve_generated_file, tenant, filename)
+    etag = make_etag("file", tenant, stored.filename, stored.version)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    media_type = "application/json" if stored.filename.endswith(".json") else "text/x-python"
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if store.backend == "local":
+        path = store.local_path(tenant, stored.filename)
+        if path is not None:
+            return FileResponse(
+                path,
+                media_type=media_type,
+                filename=stored.filename,
+                stat_result=path.stat(),
+                headers=headers,
+            )
+
+    try:
+        source = await asyncio.to_thread(store.open, tenant, stored.filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Agente no encontrado: {filename}")
+
+    def iter_source():
+        with source:
+            while block := source.read(64 * 1024):
+                yield block
+
+    return StreamingResponse(
+        iter_source(),
+        media_type=media_type,
+        headers={
+            **headers,
+            "Content-Length": str(stored.size),
+            "Content-Disposition": f'attachment; filename="{stored.filename}"',
+        },
+    )
+
+
+def _versioned_filename(filename: str) -> str:
+    """Valida el nombre de un agente con historial o responde 404."""
+    try:
+        return check_filename(filename)
+    except ValueError:
+        raise HTTPException(status_code=404, detail=f"Agente no encontrado: {filename}")
+
+
+@router.get("/generated/{filename}/versions", response_model=AgentVersionsResponse)
+async def list_agent_versions(filename: str, tenant: str = Depends(get_tenant)):
+    """
+    Historial de versiones de un agente generado.
+
+    Cada vez que se guarda el agente se agrega una versión; el historial se
+    conserva aunque el archivo se elimine.
+    """
+    filename = _versioned_filename(filename)
+    versions = await asyncio.to_thread(get_agent_versions().list, tenant, filename)
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Agente sin historial: {filename}")
+    return AgentVersionsResponse(
+        filename=filename,
+        versions=versions,
+        total=len(versions),
+        size_bytes=sum(version["size_bytes"] for version in versions),
+        stored_bytes=sum(version["stored_bytes"] for version in versions),
+    )
+
+
+@router.get("/generated/{filename}/versions/{version}")
+async def get_agent_version(
+    filename: str,
+    version: int,
+    if_none_match: Optional[str] = Header(default=None),
+    tenant: str = Depends(get_tenant),
+):
+    """Contenido de una versión de un agente generado."""
+    filename = _versioned_filename(filename)
+    history = get_agent_versions()
+    versions = await asyncio.to_thread(history.list, tenant, filename)
+    if not 1 <= version <= len(versions):
+        raise HTTPException(status_code=404, detail=f"Versión no encontrada: {version}")
+
+    # Las versiones no cambian: el ETag es el hash de su contenido
+    etag = f'"{versions[version - 1]["sha256"][:32]}"'
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    content = await asyncio.to_thread(history.get, tenant, filename, version)
+    media_type = "application/json" if filename.endswith(".json") else "text/x-python"
+    return Response(
+        content,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/generated/{filename}/diff")
+async def diff_agent_versions(
+    filename: str,
+    from_version: Optional[int] = Query(default=None, alias="from"),
+    to_version: Optional[int] = Query(default=None, alias="to"),
+    tenant: str = Depends(get_tenant),
+):
+    """
+    Diff unificado entre dos versiones de un agente generado.
+
+    Por defecto compara la última versión con la anterior.
+    """
+    filename = _versioned_filename(filename)
+    history = get_agent_versions()
+    versions = await asyncio.to_thread(history.list, tenant, filename)
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Agente sin historial: {filename}")
+
+    new = to_version or len(versions)
+    old = from_version or max(new - 1, 1)
+    try:
+        diff = await asyncio.to_thread(history.diff, tenant, filename, old, new)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Versión no encontrada: {e.args[0]}")
+    return Response(diff, media_type="text/plain; charset=utf-8")
+
+
 @router.get("/health")
 async def meta_agent_health():
     """Health check del módulo Meta-Agent."""
@@ -340,5 +925,15 @@ async def meta_agent_health():
         "status": "ok",
         "service": "meta-agent-api",
         "version": "1.0.0",
-        "output_dir": str(get_output_dir()),
+        "output_dir": get_agent_store().tenant_location(DEFAULT_TENANT),
+        "storage": get_agent_store().backend,
+        "single_flight": {
+            "render": _render_flight.stats(),
+            "plan": _plan_flight.stats(),
+        },
+        "sse_replay": _stream_buffer.stats(),
+        "cancelled": cancellation_stats.stats(),
+        "llm_limits": limiter_stats(),
+        "admission": admission_stats(),
+        "change_feed": {tenant: feed.stats() for tenant, feed in _change_feeds.items()},
     }
@@ -0,0 +1,282 @@
+"""
+Rutas de sesiones de aclaración del Meta-Agente.
+
+El servidor guarda la conversación de cada sesión y el cliente solo envía
+la respuesta nueva en cada turno. La salida del analyzer se transmite a
+medida que se genera.
+
+Endpoints:
+- POST /                  - Crear sesión con la solicitud inicial
+- GET /{session_id}       - Estado de la sesión
+- POST /{session_id}/messages - Responder la última pregunta
+- POST /{session_id}/plan - Crear el plan con la conversación acumulada
+- DELETE /{session_id}    - Cerrar la sesión
+- WS /ws                  - Sesión completa sobre WebSocket
+"""
+
+import json
+import os
+from contextlib import nullcontext
+from typing import AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+
+from src.application.services.clarification import ClarificationSession, SessionStore
+from src.application.services.meta_agent import AgentPlan
+from src.infrastructure.api.admission import AdmissionRejected, route_limit
+from src.infrastructure.api.cancellation import (
+    ClientDisconnected,
+    run_cancellable,
+    stream_cancellable,
+)
+from src.infrastructure.api.meta_routes import get_meta_agent
+
+router = APIRouter()
+
+# Sesiones activas del proceso
+_store = SessionStore(
+    max_sessions=int(os.getenv("META_SESSION_MAX", "10000")),
+    ttl_seconds=float(os.getenv("META_SESSION_TTL_SECONDS", "3600")),
+)
+
+
+# ==================== Modelos de Request/Response ====================
+
+
+class SessionMessage(BaseModel):
+    """Mensaje del usuario en una sesión."""
+
+    message: str = Field(
+        default="", description="Respuesta del usuario (vacía para continuar con lo que hay)"
+    )
+    stream: bool = Field(
+        default=False, description="Transmitir la salida del analyzer como eventos SSE"
+    )
+
+
+class SessionResponse(BaseModel):
+    """Estado de una sesión de aclaración."""
+
+    session_id: str
+    status: str = Field(description="awaiting_answer o ready")
+    question: str = Field(description="Pregunta pendiente del Meta-Agente")
+    turns: int = Field(description="Rondas de análisis realizadas")
+    plan: Optional[AgentPlan] = None
+
+
+# ==================== Utilidades ====================
+
+
+def _get_session(session_id: str) -> ClarificationSession:
+    """Retorna la sesión o responde 404."""
+    session = _store.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    return session
+
+
+def _turn_slot():
+    """Lugar del grupo "llm" para un turno de WebSocket (sin límite si el control no está activo)."""
+    limit = route_limit("llm")
+    return limit.hold() if limit is not None else nullcontext()
+
+
+async def _analysis_events(session: ClarificationSession, message: str) -> AsyncIterator[Dict]:
+    """
+    Agrega el mensaje a la sesión y ejecuta el analyzer.
+
+    Yields:
+        Eventos token con la salida parcial y un evento final question o ready
+    """
+    async with session.lock:
+        if not message.strip():
+            if not session.conversation:
+                raise ValueError("El primer mensaje de la sesión no puede estar vacío")
+            # Igual que en la terminal: respuesta vacía = continuar con lo que hay
+            session.ready = True
+            session.question = ""
+        else:
+            snapshot = (session.conversation, session.last_message, session.question, session.plan)
+            session.add_user_message(message)
+            chunks = []
+            try:
+                async for chunk in get_meta_agent().astream_analysis(
+                    session.last_message, session.conversation
+                ):
+                    chunks.append(chunk)
+                    yield {"type": "token", "content": chunk}
+            except BaseException:
+                # Turno interrumpido (error o desconexión): el cliente puede reenviarlo
+                session.conversation, session.last_message, session.question, session.plan = snapshot
+                raise
+            session.record_analysis("".join(chunks))
+
+    state = session.to_dict()
+    if session.ready:
+        yield {"type": "ready", **state}
+    else:
+        yield {"type": "question", **state}
+
+
+async def _create_plan(session: ClarificationSession) -> AgentPlan:
+    """Crea y guarda el plan de la sesión."""
+    async with session.lock:
+        if not session.conversation:
+            raise ValueError("La sesión no tiene conversación")
+        if session.plan is None:
+            session.plan = await get_meta_agent().acreate_plan(session.conversation)
+        return session.plan
+
+
+async def _consume(events: AsyncIterator[Dict]) -> None:
+    """Consume los eventos de un turno sin transmitirlos."""
+    async for _ in events:
+        pass
+
+
+async def _respond(session: ClarificationSession, req: SessionMessage, request: Request):
+    """
+    Ejecuta un turno y responde en JSON o como SSE.
+
+    Si el cliente se desconecta, el análisis se cancela y el turno se descarta.
+    """
+    if req.stream:
+
+        async def event_generator():
+            yield f"data: {json.dumps({'type': 'session', 'session_id': session.id})}\n\n"
+            try:
+                events = _analysis_events(session, req.message)
+                async for event in stream_cancellable(request, "analysis_stream", events):
+                    yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+            except Exception as e:
+                yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+        return StreamingResponse(
+            event_generator(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            },
+        )
+
+    try:
+        await run_cancellable(request, "analysis", _consume(_analysis_events(session, req.message)))
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Cliente desconectado")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error al analizar la solicitud: {str(e)}"
+        )
+    return session.to_dict()
+
+
+# ==================== Endpoints ====================
+
+
+@router.post("", response_model=SessionResponse)
+async def create_session(req: SessionMessage, request: Request):
+    """
+    Crear una sesión con la solicitud inicial y ejecutar el primer análisis.
+
+    Con ``stream=true`` retorna eventos SSE: session, token, question/ready, error.
+    """
+    if not req.message.strip():
+        raise HTTPException(
+            status_code=422, detail="No puedo crear un agente sin una descripción"
+        )
+    return await _respond(_store.create(), req, request)
+
+
+@router.get("/{session_id}", response_model=SessionResponse)
+async def get_session(session_id: str):
+    """Estado actual de la sesión."""
+    return _get_session(session_id).to_dict()
+
+
+@router.post("/{session_id}/messages", response_model=SessionResponse)
+async def send_message(session_id: str, req: SessionMessage, request: Request):
+    """
+    Responder la última pregunta del Meta-Agente.
+
+    Solo se envía la respuesta nueva: la conversación vive en el servidor.
+    """
+    return await _respond(_get_session(session_id), req, request)
+
+
+@router.post("/{session_id}/plan", response_model=AgentPlan)
+async def create_session_plan(session_id: str, request: Request):
+    """Crear el plan del agente con la conversación de la sesión."""
+    session = _get_session(session_id)
+    try:
+        return await run_cancellable(request, "plan", _create_plan(session))
+    except ClientDisconnected:
+        raise HTTPException(status_code=499, detail="Cliente desconectado")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error al crear el plan: {str(e)}"
+        )
+
+
+@router.delete("/{session_id}")
+async def delete_session(session_id: str):
+    """Cerrar la sesión y liberar su estado."""
+    if not _store.delete(session_id):
+        raise HTTPException(status_code=404, detail="Sesión no encontrada o expirada")
+    return {"session_id": session_id, "deleted": True}
+
+
+@router.websocket("/ws")
+async def session_websocket(websocket: WebSocket):
+    """
+    Sesión de aclaración sobre WebSocket.
+
+    Mensajes del cliente (JSON):
+    - {"message": "..."}: solicitud inicial o respuesta a la última pregunta
+    - {"action": "plan"}: crear el plan con la conversación acumulada
+    - {"session_id": "..."} en el primer mensaje para retomar una sesión
+
+    Eventos del servidor: session, token, question, ready, plan, error.
+    """
+    await websocket.accept()
+    session: Optional[ClarificationSession] = None
+
+    try:
+        while True:
+            data = await websocket.receive_json()
+
+            if session is None:
+                session_id = data.get("session_id")
+                session = _store.get(session_id) if session_id else _store.create()
+                if session is None:
+                    await websocket.send_json(
+                        {"type": "error", "error": "Sesión no encontrada o expirada"}
+                    )
+                    continue
+                await websocket.send_json({"type": "session", **session.to_dict()})
+
+            try:
+                # Cada turno ocupa un lugar del grupo "llm"; la conexión inactiva no
+                async with _turn_slot():
+                    if data.get("action") == "plan":
+                        plan = await _create_plan(session)
+                        await websocket.send_json({"type": "plan", "plan": plan.model_dump()})
+                    elif "message" in data:
+                        async for event in _analysis_events(session, str(data["message"])):
+                            await websocket.send_json(event)
+            except AdmissionRejected as e:
+                await websocket.send_json(
+                    {"type": "error", "error": str(e), "retry_after": e.retry_after}
+                )
+            except Exception as e:
+                await websocket.send_json({"type": "error", "error": str(e)})
+
+    except WebSocketDisconnect:
+        # La sesión sigue en el almacén para retomarla más tarde
+        pass
@@ -0,0 +1,100 @@
+"""
+Coalescencia de solicitudes concurrentes (single-flight).
+
+Cuando varias solicitudes idénticas llegan a la vez, solo la primera ejecuta
+el trabajo; las demás esperan esa misma ejecución y comparten su resultado
+(o su error). Evita que los reintentos de los clientes multipliquen las
+llamadas al LLM o el renderizado de plantillas.
+"""
+
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def canonical_key(*parts: Any) -> str:
+    """
+    Calcula una clave estable a partir de datos serializables en JSON.
+
+    Args:
+        parts: Componentes de la clave (dicts, strings, flags...)
+
+    Returns:
+        Hash SHA-256 hexadecimal del JSON canónico de los componentes
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """
+    Agrupa ejecuciones concurrentes con la misma clave en una sola.
+
+    El trabajo corre en su propia tarea, de modo que si el cliente que lo
+    inició se desconecta, el resto de solicitudes sigue recibiendo el
+    resultado; solo cuando se cancelan todas las solicitudes que lo esperan
+    se cancela también el trabajo. Las claves se liberan al terminar: no es
+    un cache.
+    """
+
+    def __init__(self):
+        """Inicializa el registro de ejecuciones en curso."""
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.cancelled = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Ejecuta ``fn`` o se une a la ejecución en curso con la misma clave.
+
+        Args:
+            key: Clave de la solicitud (ver canonical_key)
+            fn: Función sin argumentos que retorna el awaitable a ejecutar
+
+        Returns:
+            Resultado compartido de la ejecución
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters[task] == 1 and not task.done():
+                # Nadie más espera el resultado
+                task.cancel()
+                self.cancelled += 1
+            raise
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _release(self, key: str, task: asyncio.Task) -> None:
+        """Libera la clave cuando su ejecución termina."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Marcar la excepción como recuperada aunque nadie siga esperando
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Estadísticas de coalescencia."""
+        return {
+            "in_flight": len(self._inflight),
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "cancelled": self.cancelled,
+        }
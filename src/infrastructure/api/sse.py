@@ -0,0 +1,184 @@
+"""
+Utilidades de Server-Sent Events.
+
+- format_event: serializa un evento con su id
+- ReplayBuffer: guarda los eventos de cada stream para retomarlo con
+  ``Last-Event-ID`` tras una desconexión
+- wait_with_heartbeats: emite comentarios de keep-alive mientras se espera
+  un resultado, para que proxies y clientes no cierren la conexión
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Comentario SSE usado como heartbeat (los clientes lo ignoran)
+HEARTBEAT = ": heartbeat\n\n"
+
+
+def format_event(data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    """
+    Serializa un evento SSE.
+
+    Args:
+        data: Datos del evento (se envían como JSON en una sola línea)
+        event_id: Id del evento para Last-Event-ID
+
+    Returns:
+        Frame SSE terminado en línea vacía
+    """
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if event_id is None:
+        return f"data: {payload}\n\n"
+    return f"id: {event_id}\ndata: {payload}\n\n"
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Separa un id ``<stream>:<seq>`` en sus partes (None si no es válido)."""
+    if not value or ":" not in value:
+        return None
+    stream_id, _, seq = value.strip().rpartition(":")
+    if not stream_id or not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+class _Stream:
+    """Eventos emitidos por un stream."""
+
+    __slots__ = ("key", "frames", "finished", "updated_at")
+
+    def __init__(self, key: str = ""):
+        # Identifica la solicitud que originó el stream (ver ReplayBuffer.replay)
+        self.key = key
+        self.frames: List[str] = []
+        self.finished = False
+        self.updated_at = time.monotonic()
+
+
+class ReplayBuffer:
+    """
+    Buffer acotado de eventos por stream para reanudar con Last-Event-ID.
+
+    Los frames se guardan ya serializados una sola vez por stream; las
+    conexiones solo mantienen su posición, de modo que el costo por
+    conexión no crece con el tamaño del código transmitido.
+    """
+
+    def __init__(self, max_streams: int = 256, ttl_seconds: float = 300):
+        """
+        Inicializa el buffer.
+
+        Args:
+            max_streams: Streams retenidos como máximo (se descartan los más antiguos)
+            ttl_seconds: Segundos que un stream puede retomarse tras su último evento
+        """
+        self.max_streams = max(max_streams, 1)
+        self.ttl_seconds = ttl_seconds
+        self._streams: "OrderedDict[str, _Stream]" = OrderedDict()
+        self.resumed = 0
+
+    def create(self, key: str = "") -> str:
+        """
+        Registra un stream nuevo y retorna su id.
+
+        Args:
+            key: Hash de la solicitud; solo se puede retomar con la misma
+        """
+        self._expire()
+        stream_id = uuid.uuid4().hex
+        self._streams[stream_id] = _Stream(key)
+        while len(self._streams) > self.max_streams:
+            self._streams.popitem(last=False)
+        return stream_id
+
+    def emit(self, stream_id: str, seq: int, data: Dict[str, Any]) -> str:
+        """
+        Retorna el frame del evento ``seq`` del stream, registrándolo si es nuevo.
+
+        Si el stream se está regenerando tras una reanudación, se reutiliza
+        el frame ya emitido con ese número.
+        """
+        stream = self._streams.get(stream_id)
+        event_id = f"{stream_id}:{seq}"
+        if stream is None:
+            return format_event(data, event_id)
+        stream.updated_at = time.monotonic()
+        self._streams.move_to_end(stream_id)
+        if seq < len(stream.frames):
+            return stream.frames[seq]
+        frame = format_event(data, event_id)
+        stream.frames.append(frame)
+        return frame
+
+    def finish(self, stream_id: str) -> None:
+        """Marca el stream como completo (no hay más eventos)."""
+        stream = self._streams.get(stream_id)
+        if stream is not None:
+            stream.finished = True
+
+    def replay(
+        self, last_event_id: Optional[str], key: str = ""
+    ) -> Optional[Tuple[str, int, List[str], bool]]:
+        """
+        Busca los eventos posteriores a ``last_event_id``.
+
+        Args:
+            last_event_id: Último id recibido por el cliente
+            key: Hash de la solicitud que intenta retomar el stream
+
+        Returns:
+            (stream_id, siguiente seq, frames pendientes, finished) o None si
+            el stream no existe o expiró
+
+        Raises:
+            ValueError: Si el stream se originó con otra solicitud
+        """
+        parsed = parse_event_id(last_event_id)
+        if parsed is None:
+            return None
+        self._expire()
+        stream_id, seq = parsed
+        stream = self._streams.get(stream_id)
+        if stream is None:
+            return None
+        if stream.key != key:
+            raise ValueError("El stream se originó con otra solicitud")
+        self.resumed += 1
+        stream.updated_at = time.monotonic()
+        self._streams.move_to_end(stream_id)
+        pending = stream.frames[seq + 1 :]
+        return stream_id, len(stream.frames), pending, stream.finished
+
+    def stats(self) -> Dict[str, int]:
+        """Métricas del buffer."""
+        return {
+            "streams": len(self._streams),
+            "frames": sum(len(stream.frames) for stream in self._streams.values()),
+            "resumed": self.resumed,
+        }
+
+    def _expire(self) -> None:
+        """Descarta los streams inactivos (los más antiguos están al inicio)."""
+        limit = time.monotonic() - self.ttl_seconds
+        while self._streams:
+            oldest = next(iter(self._streams.values()))
+            if oldest.updated_at >= limit:
+                break
+            self._streams.popitem(last=False)
+
+
+async def wait_with_heartbeats(task: "asyncio.Future", interval: float) -> AsyncIterator[str]:
+    """
+    Espera ``task`` emitiendo un heartbeat cada ``interval`` segundos.
+
+    El resultado se obtiene después con ``task.result()``.
+    """
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=interval)
+        if done:
+            return
+        yield HEARTBEAT
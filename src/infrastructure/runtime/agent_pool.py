@@ -0,0 +1,294 @@
+"""
+Pool LRU de agentes generados listos para ejecutar.
+
+Descubre los agentes de un directorio o del almacenamiento de un tenant
+(código Python con ``crear_agente()`` o specs JSON), los importa de forma
+diferida y mantiene un número acotado de instancias calientes para servir
+muchos agentes desde un mismo proceso.
+"""
+
+import importlib.util
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.infrastructure.runtime import agent_runtime
+from src.infrastructure.storage.agent_store import AGENT_SUFFIXES, AgentStore, check_filename
+
+# Nombre de la función fábrica en el código Python generado
+FACTORY_NAME = "crear_agente"
+
+# Función opcional del código generado que libera sus recursos de módulo
+CLOSE_NAME = "cerrar_agente"
+
+
+class _PoolEntry:
+    """Agente instanciado del pool con sus ejecuciones en curso."""
+
+    def __init__(self, mtime: float, agent: Any, close: Callable[[], None]):
+        self.mtime = mtime
+        self.agent = agent
+        self.close = close
+        # Ejecuciones que tienen reservado el agente (ver AgentPool.acquire)
+        self.refs = 0
+        # True cuando la entrada salió del pool (desalojo o recarga)
+        self.dropped = False
+
+
+class AgentPool:
+    """
+    Pool LRU de agentes instanciados.
+
+    Las entradas se invalidan cuando cambia la fecha de modificación del
+    archivo, de modo que regenerar un agente no requiere reiniciar el host.
+    Al descartar una entrada (por desalojo o recarga) se liberan sus
+    recursos con ``cerrar_agente()`` o los cierres del runtime de specs,
+    pero solo cuando ya no quedan ejecuciones que la tengan reservada.
+    """
+
+    def __init__(self, agents_dir: Path, max_size: int = 32):
+        """
+        Inicializa el pool.
+
+        Args:
+            agents_dir: Directorio con los agentes generados
+            max_size: Número máximo de agentes instanciados en memoria
+        """
+        self.agents_dir = Path(agents_dir)
+        self.max_size = max(max_size, 1)
+        self._agents: "OrderedDict[str, _PoolEntry]" = OrderedDict()
+        # Entradas reservadas, por id del agente
+        self._leases: Dict[int, _PoolEntry] = {}
+        self._lock = threading.Lock()
+        # Un lock de carga por agente: dos fallos simultáneos cargan una sola vez
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def discover(self) -> Dict[str, Path]:
+        """
+        Descubre los agentes disponibles en el directorio.
+
+        Returns:
+            Diccionario nombre -> ruta (los specs JSON tienen prioridad)
+        """
+        agents: Dict[str, Path] = {}
+        if not self.agents_dir.exists():
+            return agents
+
+        for suffix in reversed(AGENT_SUFFIXES):
+            for path in self.agents_dir.glob(f"*{suffix}"):
+                agents.setdefault(path.name[: -len(suffix)], path)
+        return agents
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """Retorna la ruta del agente indicado o None si no existe."""
+        for suffix in reversed(AGENT_SUFFIXES):
+            path = self.agents_dir / f"{name}{suffix}"
+            if path.exists():
+                return path
+        return None
+
+    def get(self, name: str) -> Any:
+        """
+        Retorna el agente indicado, instanciándolo si no está en el pool.
+
+        No reserva el agente: para ejecutarlo usar acquire/release, de modo
+        que un desalojo no libere sus recursos a mitad de la ejecución.
+
+        Args:
+            name: Nombre del agente (archivo sin el sufijo _agent)
+
+        Returns:
+            Instancia de Agent o Team
+
+        Raises:
+            KeyError: Si el agente no existe
+            ValueError: Si el archivo no puede cargarse como agente
+        """
+        agent = self.acquire(name)
+        self.release(agent)
+        return agent
+
+    def acquire(self, name: str) -> Any:
+        """
+        Retorna el agente indicado reservado para una ejecución.
+
+        Cada acquire debe terminar con un release del agente retornado.
+
+        Raises:
+            KeyError: Si el agente no existe
+            ValueError: Si el archivo no puede cargarse como agente
+        """
+        path = self.resolve(name)
+        if path is None:
+            raise KeyError(name)
+        mtime = path.stat().st_mtime
+
+        entry = self._reserve_cached(name, mtime)
+        if entry is not None:
+            return entry.agent
+
+        with self._load_lock(name):
+            # Otra solicitud pudo cargarlo mientras se esperaba el lock
+            entry = self._reserve_cached(name, mtime)
+            if entry is not None:
+                return entry.agent
+
+            agent, close = self._load(path)
+            entry = _PoolEntry(mtime, agent, close)
+            entry.refs = 1
+
+            stale = []
+            with self._lock:
+                self.misses += 1
+                self._leases[id(agent)] = entry
+                previous = self._agents.pop(name, None)
+                if previous is not None:
+                    stale.append(previous)
+                self._agents[name] = entry
+                while len(self._agents) > self.max_size:
+                    stale.append(self._agents.popitem(last=False)[1])
+                    self.evictions += 1
+                for old in stale:
+                    old.dropped = True
+                closable = [old for old in stale if old.refs == 0]
+        for old in closable:
+            self._close(old.close)
+        return agent
+
+    def release(self, agent: Any) -> None:
+        """
+        Libera la reserva de un agente obtenido con acquire.
+
+        Si la entrada ya salió del pool y era la última ejecución, se
+        liberan sus recursos.
+        """
+        with self._lock:
+            entry = self._leases.get(id(agent))
+            if entry is None:
+                return
+            entry.refs -= 1
+            if entry.refs > 0:
+                return
+            del self._leases[id(agent)]
+            if not entry.dropped:
+                return
+        self._close(entry.close)
+
+    def _reserve_cached(self, name: str, mtime: float) -> Optional[_PoolEntry]:
+        """Reserva la entrada en caché si sigue vigente."""
+        with self._lock:
+            entry = self._agents.get(name)
+            if entry is None or entry.mtime != mtime:
+                return None
+            self._agents.move_to_end(name)
+            self.hits += 1
+            entry.refs += 1
+            self._leases[id(entry.agent)] = entry
+            return entry
+
+    def _load_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(name, threading.Lock())
+
+    @staticmethod
+    def _close(close: Callable[[], None]) -> None:
+        """Libera los recursos de una entrada descartada sin afectar al host."""
+        try:
+            close()
+        except Exception:
+            # Un fallo al liberar no debe afectar a la solicitud que provocó el desalojo
+            pass
+
+    def _load(self, path: Path) -> Tuple[Any, Callable[[], None]]:
+        """
+        Instancia el agente desde un spec JSON o un módulo Python generado.
+
+        Returns:
+            Tupla (agente, función que libera sus recursos)
+        """
+        if path.suffix == ".json":
+            closers: List[Callable[[], None]] = []
+            agent = agent_runtime.load_agent(path, closers)
+            return agent, lambda: [close() for close in closers]
+
+        module_spec = importlib.util.spec_from_file_location(
+            f"generated_agents.{path.stem}", path
+        )
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+
+        factory = getattr(module, FACTORY_NAME, None)
+        if factory is None:
+            raise ValueError(
+                f"{path.name} no define {FACTORY_NAME}(); regenera el agente para servirlo"
+            )
+        return factory(), getattr(module, CLOSE_NAME, None) or (lambda: None)
+
+    def loaded(self) -> List[str]:
+        """Nombres de los agentes instanciados, del menos al más reciente."""
+        with self._lock:
+            return list(self._agents)
+
+    def stats(self) -> Dict[str, int]:
+        """Estadísticas del pool."""
+        with self._lock:
+            return {
+                "size": len(self._agents),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class StoreAgentPool(AgentPool):
+    """
+    Pool de los agentes de un tenant del almacenamiento.
+
+    Con backends remotos los agentes se leen desde el caché local del
+    almacenamiento, que conserva la fecha del objeto para detectar cambios.
+    """
+
+    def __init__(self, store: AgentStore, tenant: str, max_size: int = 32):
+        """
+        Inicializa el pool.
+
+        Args:
+            store: Almacenamiento de agentes generados
+            tenant: Tenant cuyos agentes se sirven
+            max_size: Número máximo de agentes instanciados en memoria
+        """
+        super().__init__(Path(store.tenant_location(tenant)), max_size=max_size)
+        self.store = store
+        self.tenant = tenant
+
+    def discover(self) -> Dict[str, Path]:
+        """
+        Descubre los agentes del tenant.
+
+        Returns:
+            Diccionario nombre -> clave en el almacenamiento (los specs JSON tienen prioridad)
+        """
+        entries = {entry.filename: entry for entry in self.store.list(self.tenant)}
+        agents: Dict[str, Path] = {}
+        for suffix in reversed(AGENT_SUFFIXES):
+            for filename, entry in entries.items():
+                if filename.endswith(suffix):
+                    agents.setdefault(filename[: -len(suffix)], Path(entry.key))
+        return agents
+
+    def resolve(self, name: str) -> Optional[Path]:
+        """Retorna la ruta local del agente indicado o None si no existe."""
+        for suffix in reversed(AGENT_SUFFIXES):
+            try:
+                filename = check_filename(f"{name}{suffix}")
+            except ValueError:
+                return None
+            path = self.store.local_path(self.tenant, filename)
+            if path is not None:
+                return path
+        return None
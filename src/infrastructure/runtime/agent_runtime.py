@@ -0,0 +1,435 @@
+"""
+Runtime compartido para agentes generados en formato spec.
+
+Construye agentes y equipos de Agno bajo demanda a partir de las
+especificaciones JSON producidas por ``AgentTemplate.generate_agent_spec``,
+de modo que no es necesario generar un archivo Python por agente.
+
+Uso:
+    python -m src.infrastructure.runtime.agent_runtime generated/agents/mi_agente_agent.json
+    python -m src.infrastructure.runtime.agent_runtime mi_agente_agent.json --batch prompts.jsonl
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from dotenv import load_dotenv
+
+from src.infrastructure.templates.agent_templates import AgentTemplate
+
+# Clase de modelo -> módulo de Agno que la define
+MODEL_MODULES: Dict[str, str] = {
+    "DeepSeek": "agno.models.deepseek",
+    "Claude": "agno.models.anthropic",
+    "OpenAIChat": "agno.models.openai",
+    "Gemini": "agno.models.google",
+}
+
+# Id canónico de herramienta -> (módulo, clase, kwargs)
+TOOL_FACTORIES: Dict[str, tuple] = {
+    "duckduckgo": ("agno.tools.duckduckgo", "DuckDuckGoTools", {}),
+    "serper": ("agno.tools.serper", "SerperTools", {}),
+    "yfinance": (
+        "agno.tools.yfinance",
+        "YFinanceTools",
+        {"stock_price": True, "company_info": True},
+    ),
+    "reasoning": ("agno.tools.reasoning", "ReasoningTools", {"add_instructions": True}),
+    "python": ("agno.tools.python", "PythonTools", {}),
+    "file": ("agno.tools.file", "FileTools", {}),
+}
+
+# Instrucciones por defecto según el tipo (mismas que las plantillas Python)
+DEFAULT_INSTRUCTIONS: Dict[str, List[str]] = {
+    "basic": ["Eres un {rol}", "Sé útil y conciso", "Responde de forma clara"],
+    "memory": ["Eres un {rol}", "Recuerda conversaciones previas", "Sé útil y contextual"],
+    "knowledge": [
+        "Eres un {rol}",
+        "Busca en la base de conocimiento antes de responder",
+        "Cita la fuente de la información",
+    ],
+    "workflow": [
+        "Completa solo la tarea de tu paso",
+        "Apóyate en los resultados de los pasos previos",
+    ],
+    "team": [
+        "Colaboren efectivamente",
+        "Dividan el trabajo según especialidades",
+        "Combinen sus hallazgos",
+    ],
+}
+
+
+def _import_attr(module_name: str, attr: str) -> Any:
+    """Importa un atributo de un módulo de forma diferida."""
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def load_spec(path: Union[str, Path]) -> Dict:
+    """
+    Carga y valida una especificación de agente desde disco.
+
+    Args:
+        path: Ruta del archivo JSON
+
+    Returns:
+        Especificación como diccionario
+
+    Raises:
+        ValueError: Si la versión del formato no está soportada
+    """
+    spec = json.loads(Path(path).read_text(encoding="utf-8"))
+    version = spec.get("spec_version")
+    if version != AgentTemplate.SPEC_VERSION:
+        raise ValueError(f"Versión de spec no soportada: {version}")
+    return spec
+
+
+def build_model(model_spec: Dict) -> Any:
+    """
+    Instancia el modelo de Agno descrito en la especificación.
+
+    Args:
+        model_spec: Diccionario con "clase" e "id"
+
+    Returns:
+        Instancia del modelo
+    """
+    model_class = model_spec["clase"]
+    if model_class not in MODEL_MODULES:
+        raise ValueError(f"Modelo no soportado: {model_class}")
+    return _import_attr(MODEL_MODULES[model_class], model_class)(id=model_spec["id"])
+
+
+def build_tools(tool_ids: List[str], shared: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """
+    Instancia las herramientas indicadas, reutilizando instancias compartidas.
+
+    Args:
+        tool_ids: Ids canónicos de herramientas
+        shared: Cache de instancias por id (compartido entre miembros de un equipo)
+
+    Returns:
+        Lista de instancias de herramientas
+    """
+    shared = {} if shared is None else shared
+    tools = []
+    for tool_id in tool_ids:
+        if tool_id not in shared:
+            module_name, class_name, kwargs = TOOL_FACTORIES[tool_id]
+            if tool_id == "serper":
+                kwargs = {"api_key": os.getenv("SERPER_API_KEY")}
+            shared[tool_id] = _import_attr(module_name, class_name)(**kwargs)
+        tools.append(shared[tool_id])
+    return tools
+
+
+def _instructions(spec: Dict) -> List[str]:
+    """Retorna las instrucciones del plan o las de por defecto de su tipo."""
+    plan = spec["plan"]
+    if plan.get("instrucciones"):
+        return plan["instrucciones"]
+    rol = plan.get("rol", "Asistente general")
+    return [item.format(rol=rol) for item in DEFAULT_INSTRUCTIONS[spec["tipo"]]]
+
+
+def _exec_helpers(section: Dict, namespace: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Ejecuta los helpers de una sección de plantilla y retorna su namespace."""
+    namespace = {} if namespace is None else namespace
+    imports = "\n".join(f"import {module}" for module in ("os", *section["imports"]))
+    exec(imports + "\n" + section["helpers"], namespace)
+    return namespace
+
+
+def build_knowledge_tool(plan: Dict) -> Any:
+    """
+    Prepara el índice vectorial local y retorna la herramienta de búsqueda.
+
+    Reutiliza el mismo código que emite la plantilla de agentes con
+    conocimiento e ingesta los documentos nuevos del directorio del plan.
+
+    Args:
+        plan: Plan del agente (usa directorio_conocimiento)
+
+    Returns:
+        Función buscar_conocimiento lista para usar como herramienta
+    """
+    namespace = _exec_helpers(
+        AgentTemplate._build_knowledge_code(plan), {"np": importlib.import_module("numpy")}
+    )
+    namespace["indice_conocimiento"].ingestar_directorio()
+    return namespace["buscar_conocimiento"]
+
+
+def build_tool_cache(plan: Dict, db_file: Union[str, Path] = ":memory:") -> Optional[Any]:
+    """
+    Prepara el cache de resultados de herramientas del plan.
+
+    Reutiliza la clase CacheHerramientas que emiten las plantillas, pero sin
+    la instancia a nivel de módulo: no abre ``tools_cache.sqlite`` en el
+    directorio actual ni registra estadísticas en atexit.
+
+    Args:
+        plan: Plan del agente (usa cache_herramientas, cache_ttl_segundos y modo_async)
+        db_file: Archivo SQLite del cache (por defecto solo en memoria)
+
+    Returns:
+        Instancia de CacheHerramientas, o None si el plan no usa cache
+    """
+    section = AgentTemplate._build_tool_cache_code(plan)
+    if not section["classes"]:
+        return None
+    namespace = _exec_helpers({**section, "helpers": section["classes"]})
+    return namespace["CacheHerramientas"](db_file=str(db_file))
+
+
+def build_memory_maintenance(plan: Dict) -> Optional[Any]:
+    """
+    Prepara el mantenimiento diferido de memoria del plan.
+
+    Args:
+        plan: Plan del agente (usa memoria_segundo_plano y memoria_cada_n_turnos)
+
+    Returns:
+        Instancia de MantenimientoMemoria, o None si la memoria se actualiza
+        en cada respuesta
+    """
+    section = AgentTemplate._build_memory_code(plan)
+    if not section["helpers"]:
+        return None
+    return _exec_helpers(section)["mantenimiento_memoria"]
+
+
+def build_batch_runner(plan: Dict) -> Any:
+    """
+    Retorna la función ejecutar_batch que emite el modo batch de las plantillas.
+
+    Args:
+        plan: Plan del agente (usa modo_async y max_concurrencia)
+
+    Returns:
+        Función ejecutar_batch(ejecutor, origen, destino, max_concurrencia)
+        (corrutina si el plan es asíncrono)
+    """
+    section = AgentTemplate._build_batch_code({**plan, "modo_batch": True}, "agent")
+    max_concurrencia = max(int(plan.get("max_concurrencia", 4) or 1), 1)
+    return _exec_helpers(section, {"MAX_CONCURRENCIA": max_concurrencia})["ejecutar_batch"]
+
+
+def build_workflow_class(plan: Dict) -> Any:
+    """
+    Retorna la clase WorkflowDAG que emite la plantilla de workflows.
+
+    Args:
+        plan: Plan del workflow (usa max_pasos_paralelos)
+
+    Returns:
+        Clase WorkflowDAG(pasos, agentes)
+    """
+    return _exec_helpers(AgentTemplate._build_workflow_code(plan))["WorkflowDAG"]
+
+
+def build_agent(
+    spec: Dict,
+    closers: Optional[List[Callable[[], None]]] = None,
+    cache_file: Union[str, Path] = ":memory:",
+) -> Any:
+    """
+    Construye el agente o equipo descrito por la especificación.
+
+    Args:
+        spec: Especificación cargada con load_spec
+        closers: Si se indica, recibe las funciones que liberan los recursos
+            del agente (cache de herramientas, worker de memoria)
+        cache_file: Archivo SQLite del cache de herramientas (por defecto
+            solo en memoria)
+
+    Returns:
+        Instancia de Agent o Team
+    """
+    closers = [] if closers is None else closers
+    Agent = _import_attr("agno.agent", "Agent")
+    plan = spec["plan"]
+    kind = spec["tipo"]
+    model = build_model(spec["modelo"])
+
+    # Cache de herramientas compartido por todos los agentes del plan
+    cache = build_tool_cache(plan, cache_file)
+    hooks: Dict[str, Any] = {}
+    if cache is not None:
+        hooks["tool_hooks"] = [cache.hook]
+        closers.append(cache.cerrar)
+
+    if kind in ("team", "workflow"):
+        shared_tools: Dict[str, Any] = {}
+        shared_models: Dict[tuple, Any] = {
+            (spec["modelo"]["clase"], spec["modelo"]["id"]): model
+        }
+
+        def member_model(member: Dict) -> Any:
+            if not member.get("modelo"):
+                return model
+            key = (member["modelo"]["clase"], member["modelo"]["id"])
+            if key not in shared_models:
+                shared_models[key] = build_model(member["modelo"])
+            return shared_models[key]
+
+    if kind == "workflow":
+        pasos = spec.get("pasos", [])
+        agentes = {
+            paso["nombre"]: Agent(
+                name=paso["nombre"],
+                role=paso["rol"],
+                model=member_model(paso),
+                tools=build_tools(paso["herramientas"], shared_tools),
+                instructions=_instructions(spec),
+                markdown=True,
+                **hooks,
+            )
+            for paso in pasos
+        }
+        return build_workflow_class(plan)(pasos, agentes)
+
+    if kind == "team":
+        Team = _import_attr("agno.team", "Team")
+        members = [
+            Agent(
+                name=member["nombre"],
+                role=member["rol"],
+                model=member_model(member),
+                tools=build_tools(member["herramientas"], shared_tools),
+                instructions=member.get("instrucciones") or None,
+                **hooks,
+            )
+            for member in spec.get("miembros", [])
+        ]
+        return Team(
+            name=plan.get("nombre", "Mi Equipo"),
+            members=members,
+            model=model,
+            instructions=_instructions(spec),
+            markdown=True,
+        )
+
+    kwargs: Dict[str, Any] = {}
+    if kind == "memory":
+        SqliteDb = _import_attr("agno.db.sqlite", "SqliteDb")
+        db = SqliteDb(db_file="agents_memory.sqlite")
+        kwargs.update(db=db, enable_user_memories=True, enable_session_summary=True)
+        maintenance = build_memory_maintenance(plan)
+        if plan.get("modelo_memoria") or maintenance is not None:
+            memory_model = model
+            if plan.get("modelo_memoria"):
+                # Modelo económico para extraer memorias y resumir la sesión
+                memory_class, memory_id = AgentTemplate._resolve_model(plan["modelo_memoria"])
+                memory_model = build_model({"clase": memory_class, "id": memory_id})
+            MemoryManager = _import_attr("agno.memory", "MemoryManager")
+            SessionSummaryManager = _import_attr("agno.session", "SessionSummaryManager")
+            kwargs.update(
+                memory_manager=MemoryManager(model=memory_model, db=db),
+                session_summary_manager=SessionSummaryManager(model=memory_model),
+            )
+        if maintenance is not None:
+            closers.append(maintenance.cerrar)
+            # Memorias y resumen se actualizan en el post-hook, cada N turnos
+            kwargs.update(
+                enable_user_memories=False,
+                enable_session_summary=False,
+                add_memories_to_context=True,
+                add_session_summary_to_context=True,
+                post_hooks=[maintenance.hook],
+            )
+
+    tools = build_tools(spec.get("herramientas", []))
+    if kind == "knowledge":
+        tools.insert(0, build_knowledge_tool(plan))
+
+    return Agent(
+        name=plan.get("nombre", "Mi Agente"),
+        role=plan.get("rol", "Asistente general"),
+        model=model,
+        tools=tools,
+        instructions=_instructions(spec),
+        markdown=True,
+        **hooks,
+        **kwargs,
+    )
+
+
+def tool_cache_file(path: Union[str, Path]) -> Path:
+    """Archivo SQLite del cache de herramientas de un spec: junto a él, por agente."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.tools_cache.sqlite")
+
+
+def load_agent(path: Union[str, Path], closers: Optional[List[Callable[[], None]]] = None) -> Any:
+    """
+    Carga una especificación desde disco y construye su agente (ver build_agent).
+
+    El cache de herramientas persiste en ``tool_cache_file(path)``.
+    """
+    return build_agent(load_spec(path), closers, tool_cache_file(path))
+
+
+def _positive_int(value: str) -> int:
+    """Tipo de argparse para enteros mayores o iguales a 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError("debe ser un entero mayor o igual a 1")
+    return number
+
+
+def main():
+    """Ejecuta un agente en formato spec desde la línea de comandos."""
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Runtime de agentes en formato spec")
+    parser.add_argument("spec", help="Ruta del archivo *_agent.json")
+    parser.add_argument("--prompt", help="Prompt a ejecutar (por defecto ejemplo_uso)")
+    parser.add_argument(
+        "--batch",
+        metavar="ENTRADA",
+        help="Archivo JSONL con prompts a procesar ('-' para stdin)",
+    )
+    parser.add_argument(
+        "--salida",
+        default="-",
+        help="Archivo JSONL de resultados ('-' para stdout)",
+    )
+    parser.add_argument(
+        "--concurrencia",
+        type=_positive_int,
+        help="Máximo de prompts procesados en paralelo (por defecto el del plan)",
+    )
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    closers: List[Callable[[], None]] = []
+    agent = build_agent(spec, closers, tool_cache_file(args.spec))
+
+    try:
+        if args.batch:
+            ejecutar_batch = build_batch_runner(spec["plan"])
+            extra = [args.concurrencia] if args.concurrencia else []
+            resultado = ejecutar_batch(agent, args.batch, args.salida, *extra)
+            if asyncio.iscoroutine(resultado):
+                asyncio.run(resultado)
+            return
+        prompt = args.prompt or spec["plan"].get("ejemplo_uso") or "¿Cómo puedes ayudarme?"
+
+        if spec["plan"].get("modo_async", False):
+            asyncio.run(agent.aprint_response(prompt, stream=True))
+        else:
+            agent.print_response(prompt, stream=True)
+    finally:
+        for close in closers:
+            close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+Cola persistente de trabajos de generación.
+
+Los trabajos se guardan en SQLite y los ejecuta un pool de hilos en orden de
+prioridad (interactive antes que normal antes que batch, FIFO dentro de cada
+clase). La cola es acotada: cuando está llena se rechazan nuevos trabajos en
+lugar de acumular latencia, y una parte de la capacidad queda reservada para
+los trabajos interactivos. Los trabajos que estaban en ejecución al caer el
+proceso vuelven a la cola al reiniciar.
+
+Cada trabajo pertenece a un tenant; las consultas, cancelaciones y
+estadísticas con tenant solo ven los trabajos de ese tenant. Los trabajos
+terminados se borran pasado ``result_ttl`` para no retener su código
+generado indefinidamente.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from src.infrastructure.storage.agent_store import DEFAULT_TENANT
+
+# Clases de prioridad (menor valor = se atiende antes)
+PRIORITIES = {"interactive": 0, "normal": 1, "batch": 2}
+
+# Estados de un trabajo
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Segundos que se conservan los trabajos terminados (y su resultado)
+DEFAULT_RESULT_TTL = 24 * 3600
+
+
+class QueueFullError(Exception):
+    """La cola alcanzó su capacidad para la prioridad solicitada."""
+
+
+class JobQueue:
+    """
+    Cola de trabajos con prioridades respaldada por SQLite.
+
+    ``runner`` recibe el payload del trabajo y retorna un dict serializable
+    en JSON con el resultado; las excepciones marcan el trabajo como fallido.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        runner: Callable[[Dict[str, Any]], Dict[str, Any]],
+        workers: int = 2,
+        max_pending: int = 100,
+        reserved_interactive: Optional[int] = None,
+        result_ttl: float = DEFAULT_RESULT_TTL,
+    ):
+        """
+        Inicializa la cola y recupera los trabajos interrumpidos.
+
+        Args:
+            db_path: Archivo SQLite donde se persisten los trabajos
+            runner: Función que ejecuta un trabajo
+            workers: Número de hilos trabajadores
+            max_pending: Máximo de trabajos en espera
+            reserved_interactive: Lugares de la cola reservados a la prioridad
+                interactive (por defecto el 10% de max_pending)
+            result_ttl: Segundos que se conservan los trabajos terminados,
+                cancelados o fallidos antes de borrarlos
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.runner = runner
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 1)
+        if reserved_interactive is None:
+            reserved_interactive = max(self.max_pending // 10, 1)
+        self.reserved_interactive = min(reserved_interactive, self.max_pending - 1)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+        self.result_ttl = max(result_ttl, 0)
+        # Rechazos por cola llena, por tenant
+        self._rejected: Counter = Counter()
+
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                priority INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (status, priority, seq)"
+        )
+        # Colas creadas antes de existir los tenants: sus trabajos son del tenant por defecto
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "tenant" not in columns:
+            self._db.execute(
+                f"ALTER TABLE jobs ADD COLUMN tenant TEXT NOT NULL DEFAULT '{DEFAULT_TENANT}'"
+            )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at)")
+        # Los trabajos en ejecución cuando cayó el proceso vuelven a la cola
+        self._db.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+            (QUEUED, RUNNING),
+        )
+        self._prune()
+
+    # ==================== Ciclo de vida ====================
+
+    def start(self) -> None:
+        """Inicia los hilos trabajadores (idempotente)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping = False
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f"job-worker-{index}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Detiene los trabajadores tras terminar los trabajos en curso."""
+        with self._lock:
+            self._stopping = True
+            self._wakeup.notify_all()
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    # ==================== Operaciones ====================
+
+    def submit(
+        self, payload: Dict[str, Any], priority: str = "normal", tenant: str = DEFAULT_TENANT
+    ) -> Dict[str, Any]:
+        """
+        Encola un trabajo.
+
+        Args:
+            payload: Datos del trabajo (serializables en JSON)
+            priority: interactive, normal o batch
+            tenant: Tenant dueño del trabajo
+
+        Returns:
+            Estado del trabajo encolado
+
+        Raises:
+            ValueError: Si la prioridad no existe
+            QueueFullError: Si la cola está llena para esa prioridad
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Prioridad desconocida: {priority}")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            pending = self._count(QUEUED)
+            limit = self.max_pending
+            if priority != "interactive":
+                limit -= self.reserved_interactive
+            if pending >= limit:
+                self._rejected[tenant] += 1
+                raise QueueFullError(
+                    f"Cola llena ({pending} trabajos en espera para prioridad {priority})"
+                )
+            self._db.execute(
+                "INSERT INTO jobs (id, priority, status, payload, tenant, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, PRIORITIES[priority], QUEUED, json.dumps(payload), tenant, time.time()),
+            )
+            self._wakeup.notify()
+        return self.get(job_id)
+
+    def get(self, job_id: str, tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Retorna el estado de un trabajo o None si no existe.
+
+        Los trabajos en espera incluyen su posición en la cola (0 = siguiente).
+
+        Args:
+            job_id: Id del trabajo
+            tenant: Si se indica, los trabajos de otros tenants se tratan como inexistentes
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None or (tenant is not None and row["tenant"] != tenant):
+                return None
+            job = self._row_to_dict(row)
+            if row["status"] == QUEUED:
+                job["position"] = self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND (priority < ? OR (priority = ? AND seq < ?))",
+                    (QUEUED, row["priority"], row["priority"], row["seq"]),
+                ).fetchone()[0]
+        return job
+
+    def cancel(self, job_id: str, tenant: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cancela un trabajo en espera.
+
+        Los trabajos en ejecución o terminados no cambian: el hilo trabajador
+        no puede interrumpir una generación en curso.
+
+        Args:
+            job_id: Id del trabajo
+            tenant: Si se indica, solo cancela trabajos de ese tenant
+
+        Returns:
+            Estado del trabajo (status cancelled si se canceló) o None si no existe
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?"
+                " AND tenant = COALESCE(?, tenant)",
+                (CANCELLED, time.time(), job_id, QUEUED, tenant),
+            )
+        return self.get(job_id, tenant)
+
+    @property
+    def rejected(self) -> int:
+        """Total de trabajos rechazados por cola llena."""
+        return sum(self._rejected.values())
+
+    def stats(self, tenant: Optional[str] = None) -> Dict[str, int]:
+        """
+        Número de trabajos por estado y rechazos por cola llena.
+
+        Args:
+            tenant: Si se indica, solo cuenta los trabajos de ese tenant
+                (workers y max_pending siguen siendo los de la cola)
+        """
+        with self._lock:
+            counts = dict(
+                self._db.execute(
+                    "SELECT status, COUNT(*) FROM jobs WHERE tenant = COALESCE(?, tenant)"
+                    " GROUP BY status",
+                    (tenant,),
+                ).fetchall()
+            )
+            rejected = self.rejected if tenant is None else self._rejected[tenant]
+        return {
+            **{
+                status: counts.get(status, 0)
+                for status in (QUEUED, RUNNING, DONE, FAILED, CANCELLED)
+            },
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "rejected": rejected,
+        }
+
+    # ==================== Internos ====================
+
+    def _count(self, status: str) -> int:
+        """Cuenta los trabajos en un estado (requiere el lock)."""
+        return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def _prune(self) -> None:
+        """Borra los trabajos terminados hace más de result_ttl (requiere el lock o el init)."""
+        self._db.execute(
+            "DELETE FROM jobs WHERE finished_at < ?", (time.time() - self.result_ttl,)
+        )
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        """Toma el siguiente trabajo en espera (requiere el lock)."""
+        row = self._db.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY priority, seq LIMIT 1", (QUEUED,)
+        ).fetchone()
+        if row is not None:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (RUNNING, time.time(), row["id"]),
+            )
+        return row
+
+    def _work(self) -> None:
+        """Bucle de un hilo trabajador."""
+        while True:
+            with self._lock:
+                row = None
+                while not self._stopping:
+                    row = self._claim()
+                    if row is not None:
+                        break
+                    self._wakeup.wait()
+                if row is None:
+                    return
+
+            try:
+                result = self.runner(json.loads(row["payload"]))
+                update = (DONE, json.dumps(result, ensure_ascii=False), None)
+            except Exception as e:
+                update = (FAILED, None, str(e))
+
+            with self._lock:
+                self._db.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                    (*update, time.time(), row["id"]),
+                )
+                self._prune()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        """Convierte una fila en el estado público del trabajo."""
+        priority = {value: name for name, value in PRIORITIES.items()}[row["priority"]]
+        return {
+            "job_id": row["id"],
+            "tenant": row["tenant"],
+            "status": row["status"],
+            "priority": priority,
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+        }
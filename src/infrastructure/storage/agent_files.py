@@ -0,0 +1,64 @@
+"""
+Guardado de los agentes generados.
+
+Punto único de escritura para la API, la cola de trabajos y la CLI: nombra
+el archivo a partir del plan, registra la versión en el historial y lo
+guarda en el almacenamiento del tenant. Quien necesite enterarse de los
+guardados (p. ej. los feeds de cambios de la API) se registra con
+``add_save_listener``.
+"""
+
+import hashlib
+from typing import Callable, List, Tuple
+
+from src.application.services.meta_agent import AgentPlan
+from src.infrastructure.storage.agent_store import DEFAULT_TENANT, get_agent_store
+from src.infrastructure.storage.agent_versions import get_agent_versions
+
+# Funciones (tenant, filename) llamadas después de cada guardado
+_save_listeners: List[Callable[[str, str], None]] = []
+
+
+def add_save_listener(listener: Callable[[str, str], None]) -> None:
+    """Registra una función ``(tenant, filename)`` que se llama tras cada guardado."""
+    if listener not in _save_listeners:
+        _save_listeners.append(listener)
+
+
+def generate_filename(plan: AgentPlan, output_format: str = "python") -> str:
+    """
+    Genera el nombre de archivo basado en el plan.
+
+    Lleva un hash corto del nombre original: planes distintos que se
+    normalizan igual ("Mi Agente" y "mi-agente") no comparten archivo, y
+    regenerar el mismo plan reemplaza el suyo.
+    """
+    safe_name = plan.nombre.lower().replace(" ", "_").replace("-", "_")
+    # Remover caracteres especiales
+    safe_name = "".join(c for c in safe_name if c.isalnum() or c == "_")[:80]
+    digest = hashlib.sha256(plan.nombre.strip().encode("utf-8")).hexdigest()[:8]
+    extension = "json" if output_format == "spec" else "py"
+    return f"{safe_name}_{digest}_agent.{extension}".lstrip("_")
+
+
+def save_agent_file(
+    plan: AgentPlan, code: str, output_format: str = "python", tenant: str = DEFAULT_TENANT
+) -> Tuple[str, str]:
+    """
+    Guarda el código (o la spec JSON) del agente en el almacenamiento del tenant.
+
+    El contenido anterior se conserva en el historial de versiones.
+
+    Returns:
+        Tupla (filename, filepath)
+    """
+    store = get_agent_store()
+    filename = generate_filename(plan, output_format)
+    data = code.encode("utf-8")
+    # La versión se registra antes de reemplazar el archivo actual
+    get_agent_versions().record(tenant, filename, data)
+    store.put(tenant, filename, data)
+
+    for listener in list(_save_listeners):
+        listener(tenant, filename)
+    return filename, store.location(tenant, filename)
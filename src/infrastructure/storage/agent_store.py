@@ -0,0 +1,480 @@
+"""
+Almacenamiento de los agentes generados.
+
+Los archivos se guardan por tenant y repartidos en subdirectorios según el
+hash del nombre, de modo que ningún directorio crece sin límite:
+
+    <tenant>/<shard>/<archivo>     p. ej. default/3f/buscador_1a2b3c4d_agent.py
+
+Backends:
+- LocalAgentStore: sistema de archivos local (por defecto ``generated/agents``)
+- S3AgentStore: bucket compatible con S3 (AWS, MinIO, etc.) a través de un
+  cliente con la interfaz de boto3
+
+``get_agent_store`` elige el backend según ``AGENT_STORAGE``.
+"""
+
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+try:
+    import boto3
+except ImportError:  # pragma: no cover - dependencia opcional
+    boto3 = None
+
+# Tenant usado cuando la solicitud no indica ninguno
+DEFAULT_TENANT = "default"
+
+# Sufijos de archivo reconocidos como agentes generados
+AGENT_SUFFIXES = ("_agent.py", "_agent.json")
+
+# Nombres de tenant válidos (también son nombres de directorio y prefijos S3)
+TENANT_PATTERN = re.compile(r"^[a-z0-9][a-z0-9_-]{0,63}$")
+
+# Caracteres hexadecimales del hash usados como subdirectorio (256 shards)
+SHARD_WIDTH = 2
+
+
+def normalize_tenant(tenant: Optional[str]) -> str:
+    """
+    Valida el identificador de tenant.
+
+    Returns:
+        Tenant en minúsculas (DEFAULT_TENANT si viene vacío)
+
+    Raises:
+        ValueError: Si contiene caracteres no permitidos
+    """
+    tenant = (tenant or "").strip().lower() or DEFAULT_TENANT
+    if not TENANT_PATTERN.match(tenant):
+        raise ValueError(f"Tenant inválido: {tenant!r}")
+    return tenant
+
+
+def check_filename(filename: str) -> str:
+    """
+    Valida que el nombre sea el de un agente generado, sin directorios.
+
+    Raises:
+        ValueError: Si el nombre no es válido
+    """
+    if (
+        not filename
+        or Path(filename).name != filename
+        or "\\" in filename
+        or not filename.endswith(AGENT_SUFFIXES)
+    ):
+        raise ValueError(f"Nombre de agente inválido: {filename!r}")
+    return filename
+
+
+def shard_for(filename: str) -> str:
+    """Subdirectorio del archivo según el hash de su nombre."""
+    return hashlib.sha256(filename.encode("utf-8")).hexdigest()[:SHARD_WIDTH]
+
+
+def object_key(tenant: str, filename: str) -> str:
+    """Clave del archivo dentro del almacenamiento: ``tenant/shard/archivo``."""
+    return f"{tenant}/{shard_for(filename)}/{filename}"
+
+
+@dataclass(frozen=True)
+class StoredAgent:
+    """Archivo de agente guardado."""
+
+    tenant: str
+    filename: str
+    key: str
+    size: int
+    mtime_ns: int
+    version: str
+
+    @property
+    def modified(self) -> float:
+        """Fecha de modificación en segundos (epoch)."""
+        return self.mtime_ns / 1e9
+
+
+class AgentStore(ABC):
+    """
+    Interfaz común de los backends.
+
+    Todas las operaciones reciben el tenant ya normalizado y el nombre del
+    archivo validado con ``check_filename``.
+    """
+
+    backend = ""
+
+    @abstractmethod
+    def put(self, tenant: str, filename: str, data: bytes) -> StoredAgent:
+        """Guarda (o reemplaza) el archivo y retorna sus metadatos."""
+
+    @abstractmethod
+    def stat(self, tenant: str, filename: str) -> Optional[StoredAgent]:
+        """Metadatos del archivo o None si no existe."""
+
+    @abstractmethod
+    def list(self, tenant: str) -> List[StoredAgent]:
+        """Archivos del tenant, los más recientes primero."""
+
+    @abstractmethod
+    def open(self, tenant: str, filename: str) -> IO[bytes]:
+        """
+        Abre el archivo para leerlo en binario.
+
+        Raises:
+            FileNotFoundError: Si no existe
+        """
+
+    @abstractmethod
+    def delete(self, tenant: str, filename: str) -> bool:
+        """Elimina el archivo; retorna False si no existía."""
+
+    @abstractmethod
+    def local_path(self, tenant: str, filename: str) -> Optional[Path]:
+        """Ruta local legible del archivo (o None si no existe)."""
+
+    @abstractmethod
+    def location(self, tenant: str, filename: str) -> str:
+        """Ubicación del archivo para mostrar al usuario."""
+
+    @abstractmethod
+    def tenant_location(self, tenant: str) -> str:
+        """Ubicación de los archivos del tenant para mostrar al usuario."""
+
+    def read(self, tenant: str, filename: str) -> bytes:
+        """Contenido completo del archivo."""
+        with self.open(tenant, filename) as source:
+            return source.read()
+
+    @abstractmethod
+    def put_blob(self, key: str, data: bytes) -> None:
+        """Guarda un objeto interno (p. ej. el historial de versiones) bajo ``key``."""
+
+    @abstractmethod
+    def get_blob(self, key: str) -> Optional[bytes]:
+        """Contenido de un objeto interno o None si no existe."""
+
+
+# ==================== Sistema de archivos local ====================
+
+
+class LocalAgentStore(AgentStore):
+    """
+    Backend en el sistema de archivos local.
+
+    Los archivos sueltos en la raíz (guardados antes de existir los tenants,
+    o por la CLI) pertenecen al tenant por defecto; al volver a guardarlos
+    pasan a su shard.
+    """
+
+    backend = "local"
+
+    def __init__(self, root: Path):
+        """
+        Inicializa el backend.
+
+        Args:
+            root: Directorio raíz (contiene un directorio por tenant)
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, tenant: str, filename: str) -> Path:
+        return self.root / object_key(tenant, filename)
+
+    def _legacy_path(self, tenant: str, filename: str) -> Optional[Path]:
+        if tenant != DEFAULT_TENANT:
+            return None
+        return self.root / filename
+
+    def _existing(self, tenant: str, filename: str) -> Optional[Path]:
+        for path in (self._path(tenant, filename), self._legacy_path(tenant, filename)):
+            if path is not None and path.is_file():
+                return path
+        return None
+
+    def _entry(self, tenant: str, path: Path, stat: os.stat_result) -> StoredAgent:
+        return StoredAgent(
+            tenant=tenant,
+            filename=path.name,
+            key=path.relative_to(self.root).as_posix(),
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            version=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+        )
+
+    def _write(self, path: Path, data: bytes) -> None:
+        """Escritura atómica: los lectores nunca ven un archivo a medias."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def put(self, tenant: str, filename: str, data: bytes) -> StoredAgent:
+        path = self._path(tenant, filename)
+        self._write(path, data)
+
+        legacy = self._legacy_path(tenant, filename)
+        if legacy is not None:
+            legacy.unlink(missing_ok=True)
+        return self._entry(tenant, path, path.stat())
+
+    def stat(self, tenant: str, filename: str) -> Optional[StoredAgent]:
+        path = self._existing(tenant, filename)
+        if path is None:
+            return None
+        try:
+            return self._entry(tenant, path, path.stat())
+        except FileNotFoundError:
+            return None
+
+    def list(self, tenant: str) -> List[StoredAgent]:
+        entries: Dict[str, StoredAgent] = {}
+        tenant_dir = self.root / tenant
+        patterns = [(tenant_dir, f"*/*{suffix}") for suffix in AGENT_SUFFIXES]
+        if tenant == DEFAULT_TENANT:
+            patterns += [(self.root, f"*{suffix}") for suffix in AGENT_SUFFIXES]
+
+        for directory, pattern in patterns:
+            for path in directory.glob(pattern):
+                try:
+                    entry = self._entry(tenant, path, path.stat())
+                except FileNotFoundError:
+                    continue
+                # El archivo en su shard tiene prioridad sobre uno suelto
+                entries.setdefault(entry.filename, entry)
+
+        return sorted(entries.values(), key=lambda entry: entry.mtime_ns, reverse=True)
+
+    def open(self, tenant: str, filename: str) -> IO[bytes]:
+        path = self._existing(tenant, filename)
+        if path is None:
+            raise FileNotFoundError(filename)
+        return open(path, "rb")
+
+    def delete(self, tenant: str, filename: str) -> bool:
+        deleted = False
+        for path in (self._path(tenant, filename), self._legacy_path(tenant, filename)):
+            if path is not None and path.is_file():
+                path.unlink(missing_ok=True)
+                deleted = True
+        return deleted
+
+    def local_path(self, tenant: str, filename: str) -> Optional[Path]:
+        return self._existing(tenant, filename)
+
+    def location(self, tenant: str, filename: str) -> str:
+        return str(self._existing(tenant, filename) or self._path(tenant, filename))
+
+    def tenant_location(self, tenant: str) -> str:
+        return str(self.root / tenant)
+
+    def put_blob(self, key: str, data: bytes) -> None:
+        self._write(self.root / key, data)
+
+    def get_blob(self, key: str) -> Optional[bytes]:
+        try:
+            return (self.root / key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+
+# ==================== S3 ====================
+
+
+def _error_code(error: Exception) -> str:
+    """Código de error de una excepción de boto3 (ClientError)."""
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code", ""))
+
+
+class S3AgentStore(AgentStore):
+    """
+    Backend en un bucket compatible con S3.
+
+    Para ejecutar agentes en el host se descargan a un caché local, que se
+    renueva cuando cambia el ETag del objeto.
+    """
+
+    backend = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "agents",
+        client: Any = None,
+        cache_dir: Optional[Path] = None,
+    ):
+        """
+        Inicializa el backend.
+
+        Args:
+            bucket: Nombre del bucket
+            prefix: Prefijo de las claves dentro del bucket
+            client: Cliente con la interfaz de boto3 (por defecto uno nuevo,
+                con ``S3_ENDPOINT_URL`` si está definido)
+            cache_dir: Directorio del caché local para el host
+        """
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("El backend S3 requiere el paquete boto3")
+            client = boto3.client("s3", endpoint_url=os.getenv("S3_ENDPOINT_URL") or None)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cache_dir = Path(cache_dir or Path(tempfile.gettempdir()) / "agent-store-cache")
+        self._cached: Dict[str, str] = {}
+        self._cache_lock = threading.Lock()
+
+    def _tenant_prefix(self, tenant: str) -> str:
+        return f"{self.prefix}/{tenant}/" if self.prefix else f"{tenant}/"
+
+    def _key(self, tenant: str, filename: str) -> str:
+        return f"{self._tenant_prefix(tenant)}{shard_for(filename)}/{filename}"
+
+    def _entry(self, tenant: str, key: str, size: int, modified, etag: str) -> StoredAgent:
+        filename = key.rsplit("/", 1)[-1]
+        return StoredAgent(
+            tenant=tenant,
+            filename=filename,
+            key=key,
+            size=int(size),
+            mtime_ns=int(modified.timestamp() * 1e9),
+            version=etag.strip('"'),
+        )
+
+    def put(self, tenant: str, filename: str, data: bytes) -> StoredAgent:
+        key = self._key(tenant, filename)
+        content_type = "application/json" if filename.endswith(".json") else "text/x-python"
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+        stored = self.stat(tenant, filename)
+        if stored is None:
+            raise FileNotFoundError(key)
+        return stored
+
+    def stat(self, tenant: str, filename: str) -> Optional[StoredAgent]:
+        key = self._key(tenant, filename)
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            if _error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return self._entry(tenant, key, head["ContentLength"], head["LastModified"], head["ETag"])
+
+    def list(self, tenant: str) -> List[StoredAgent]:
+        prefix = self._tenant_prefix(tenant)
+        entries = []
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = self.client.list_objects_v2(**kwargs)
+            for item in page.get("Contents", []):
+                if item["Key"].endswith(AGENT_SUFFIXES):
+                    entries.append(
+                        self._entry(
+                            tenant, item["Key"], item["Size"], item["LastModified"], item["ETag"]
+                        )
+                    )
+            if not page.get("IsTruncated"):
+                break
+            token = page.get("NextContinuationToken")
+        return sorted(entries, key=lambda entry: entry.mtime_ns, reverse=True)
+
+    def open(self, tenant: str, filename: str) -> IO[bytes]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(tenant, filename))
+        except Exception as e:
+            if _error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(filename) from e
+            raise
+        return response["Body"]
+
+    def delete(self, tenant: str, filename: str) -> bool:
+        if self.stat(tenant, filename) is None:
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(tenant, filename))
+        return True
+
+    def local_path(self, tenant: str, filename: str) -> Optional[Path]:
+        stored = self.stat(tenant, filename)
+        if stored is None:
+            return None
+        path = self.cache_dir / stored.key
+        with self._cache_lock:
+            if self._cached.get(stored.key) != stored.version or not path.is_file():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(self.read(tenant, filename))
+                # La fecha del caché sigue la del objeto (el pool la usa para recargar)
+                os.utime(path, ns=(stored.mtime_ns, stored.mtime_ns))
+                self._cached[stored.key] = stored.version
+        return path
+
+    def location(self, tenant: str, filename: str) -> str:
+        return f"s3://{self.bucket}/{self._key(tenant, filename)}"
+
+    def tenant_location(self, tenant: str) -> str:
+        return f"s3://{self.bucket}/{self._tenant_prefix(tenant)}"
+
+    def put_blob(self, key: str, data: bytes) -> None:
+        key = f"{self.prefix}/{key}" if self.prefix else key
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data)
+
+    def get_blob(self, key: str) -> Optional[bytes]:
+        key = f"{self.prefix}/{key}" if self.prefix else key
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            if _error_code(e) in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return response["Body"].read()
+
+
+# ==================== Backend del proceso ====================
+
+_store: Optional[AgentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_agent_store() -> AgentStore:
+    """
+    Retorna el backend del proceso, creándolo si no existe.
+
+    Configurable con AGENT_STORAGE (local o s3), GENERATED_AGENTS_DIR,
+    S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL y AGENT_STORE_CACHE_DIR.
+    """
+    global _store
+    with _store_lock:
+        if os.getenv("AGENT_STORAGE", "local").lower() == "s3":
+            if not isinstance(_store, S3AgentStore):
+                _store = S3AgentStore(
+                    bucket=os.environ["S3_BUCKET"],
+                    prefix=os.getenv("S3_PREFIX", "agents"),
+                    cache_dir=os.getenv("AGENT_STORE_CACHE_DIR") or None,
+                )
+        else:
+            root = Path(
+                os.getenv("GENERATED_AGENTS_DIR")
+                or Path(os.getcwd()) / "generated" / "agents"
+            )
+            # Sin directorio configurado se sigue el directorio de trabajo actual
+            if not isinstance(_store, LocalAgentStore) or _store.root != root:
+                _store = LocalAgentStore(root)
+        return _store
@@ -0,0 +1,221 @@
+"""
+Historial de versiones de los agentes generados.
+
+Cada vez que se guarda un agente se agrega una versión. Como las
+regeneraciones de un mismo plan cambian pocas líneas, cada versión se
+guarda como un delta comprimido contra la anterior; cada
+``keyframe_interval`` versiones se guarda el contenido completo para acotar
+el costo de reconstruir una versión.
+
+En el almacenamiento:
+
+    .versions/<tenant>/<shard>/<archivo>/index.json    metadatos de las versiones
+    .versions/<tenant>/<shard>/<archivo>/000001.z      contenido o delta (zlib)
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import threading
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.infrastructure.storage.agent_store import AgentStore, get_agent_store, object_key
+
+# Prefijo de los objetos del historial dentro del almacenamiento
+VERSIONS_PREFIX = ".versions"
+
+
+def make_delta(old: bytes, new: bytes) -> List:
+    """
+    Delta por líneas que transforma ``old`` en ``new``.
+
+    Returns:
+        Lista de operaciones: ``[inicio, fin]`` copia líneas de ``old`` y
+        una cadena inserta texto nuevo
+    """
+    old_lines = old.decode("utf-8").splitlines(keepends=True)
+    new_lines = new.decode("utf-8").splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+
+    ops: List = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append("".join(new_lines[j1:j2]))
+    return ops
+
+
+def apply_delta(old: bytes, ops: List) -> bytes:
+    """Aplica un delta de ``make_delta`` sobre ``old``."""
+    old_lines = old.decode("utf-8").splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        else:
+            parts.extend(old_lines[op[0] : op[1]])
+    return "".join(parts).encode("utf-8")
+
+
+class AgentVersions:
+    """Historial de versiones de los agentes de un almacenamiento."""
+
+    def __init__(self, store: AgentStore, keyframe_interval: int = 20):
+        """
+        Inicializa el historial.
+
+        Args:
+            store: Almacenamiento donde se guardan los agentes y su historial
+            keyframe_interval: Cada cuántas versiones se guarda el contenido completo
+        """
+        self.store = store
+        self.keyframe_interval = max(keyframe_interval, 1)
+        # Un lock por agente (en el proceso) para numerar versiones sin carreras
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def _prefix(self, tenant: str, filename: str) -> str:
+        return f"{VERSIONS_PREFIX}/{object_key(tenant, filename)}"
+
+    def _lock(self, tenant: str, filename: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault((tenant, filename), threading.Lock())
+
+    def list(self, tenant: str, filename: str) -> List[Dict]:
+        """Metadatos de las versiones del agente, de la más antigua a la más reciente."""
+        index = self.store.get_blob(f"{self._prefix(tenant, filename)}/index.json")
+        return json.loads(index) if index else []
+
+    def record(self, tenant: str, filename: str, data: bytes) -> Optional[Dict]:
+        """
+        Agrega ``data`` como nueva versión del agente.
+
+        Si el agente existía sin historial (guardado antes de versionar), su
+        contenido actual se registra primero como versión 1.
+
+        Returns:
+            Metadatos de la versión, o None si el contenido es igual al de
+            la última versión
+        """
+        with self._lock(tenant, filename):
+            versions = self.list(tenant, filename)
+            try:
+                current: Optional[bytes] = self.store.read(tenant, filename)
+            except FileNotFoundError:
+                current = None
+            if not versions and current is not None and current != data:
+                self._append(tenant, filename, versions, current, None)
+
+            if versions and versions[-1]["sha256"] == hashlib.sha256(data).hexdigest():
+                return None
+
+            base = None
+            if versions:
+                # El archivo actual suele ser la última versión: evita reconstruirla
+                latest = versions[-1]["sha256"]
+                if current is not None and hashlib.sha256(current).hexdigest() == latest:
+                    base = current
+                else:
+                    base = self._content(tenant, filename, versions, len(versions))
+            return self._append(tenant, filename, versions, data, base)
+
+    def _append(
+        self,
+        tenant: str,
+        filename: str,
+        versions: List[Dict],
+        data: bytes,
+        base: Optional[bytes],
+    ) -> Dict:
+        """Guarda la versión siguiente (delta contra ``base`` o completa) y el índice."""
+        number = len(versions) + 1
+        if base is None or (number - 1) % self.keyframe_interval == 0:
+            kind, payload = "full", data
+        else:
+            kind = "delta"
+            payload = json.dumps(make_delta(base, data), separators=(",", ":")).encode("utf-8")
+        blob = zlib.compress(payload, 9)
+
+        record = {
+            "version": number,
+            "kind": kind,
+            "size_bytes": len(data),
+            "stored_bytes": len(blob),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "created_at": datetime.now().isoformat(),
+        }
+        prefix = self._prefix(tenant, filename)
+        self.store.put_blob(f"{prefix}/{number:06d}.z", blob)
+        versions.append(record)
+        self.store.put_blob(f"{prefix}/index.json", json.dumps(versions).encode("utf-8"))
+        return record
+
+    def get(self, tenant: str, filename: str, version: int) -> bytes:
+        """
+        Contenido de una versión del agente.
+
+        Raises:
+            KeyError: Si la versión no existe
+        """
+        versions = self.list(tenant, filename)
+        if not 1 <= version <= len(versions):
+            raise KeyError(version)
+        return self._content(tenant, filename, versions, version)
+
+    def _content(self, tenant: str, filename: str, versions: List[Dict], version: int) -> bytes:
+        """Reconstruye una versión desde el último contenido completo anterior."""
+        start = version
+        while versions[start - 1]["kind"] != "full":
+            start -= 1
+
+        prefix = self._prefix(tenant, filename)
+        content = b""
+        for number in range(start, version + 1):
+            blob = self.store.get_blob(f"{prefix}/{number:06d}.z")
+            if blob is None:
+                raise KeyError(number)
+            payload = zlib.decompress(blob)
+            if versions[number - 1]["kind"] == "full":
+                content = payload
+            else:
+                content = apply_delta(content, json.loads(payload))
+        return content
+
+    def diff(self, tenant: str, filename: str, old: int, new: int) -> str:
+        """
+        Diff unificado entre dos versiones del agente.
+
+        Raises:
+            KeyError: Si alguna versión no existe
+        """
+        old_lines = self.get(tenant, filename, old).decode("utf-8").splitlines(keepends=True)
+        new_lines = self.get(tenant, filename, new).decode("utf-8").splitlines(keepends=True)
+        return "".join(
+            difflib.unified_diff(
+                old_lines, new_lines, f"{filename}@{old}", f"{filename}@{new}"
+            )
+        )
+
+
+# ==================== Historial del proceso ====================
+
+_versions: Optional[AgentVersions] = None
+
+
+def get_agent_versions() -> AgentVersions:
+    """
+    Retorna el historial del almacenamiento del proceso.
+
+    Configurable con AGENT_VERSION_KEYFRAME_INTERVAL.
+    """
+    global _versions
+    store = get_agent_store()
+    if _versions is None or _versions.store is not store:
+        _versions = AgentVersions(
+            store, keyframe_interval=int(os.getenv("AGENT_VERSION_KEYFRAME_INTERVAL", "20"))
+        )
+    return _versions
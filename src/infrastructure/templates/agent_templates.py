@@ -5,7 +5,8 @@ Este módulo contiene las plantillas que generan código Python funcional
 para diferentes tipos de agentes usando el framework Agno.
 """
 
-from typing import Dict, List, Tuple
+import json
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class AgentTemplate:
@@ -18,6 +19,63 @@ class AgentTemplate:
     - Equipos de agentes colaborativos
     """
 
+    # Alias aceptados en AgentPlan.herramientas -> id canónico de herramienta
+    TOOL_ALIASES: Dict[str, str] = {
+        "duckduckgo": "duckduckgo",
+        "web": "duckduckgo",
+        "search": "duckduckgo",
+        "serper": "serper",
+        "yfinance": "yfinance",
+        "finance": "yfinance",
+        "stock": "yfinance",
+        "reasoning": "reasoning",
+        "python": "python",
+        "file": "file",
+    }
+
+    # Miembros usados cuando un plan de equipo no define miembros_equipo
+    DEFAULT_TEAM_MEMBERS: List[Dict] = [
+        {
+            "nombre": "Researcher",
+            "rol": "Buscar información",
+            "herramientas": ["duckduckgo"],
+        },
+        {
+            "nombre": "Analyzer",
+            "rol": "Analizar datos",
+            "herramientas": ["reasoning"],
+        },
+        {
+            "nombre": "Writer",
+            "rol": "Escribir respuestas",
+            "herramientas": [],
+        },
+    ]
+
+    # Pasos por defecto de un workflow (Nivel 5) sin pasos_workflow
+    DEFAULT_WORKFLOW_STEPS: List[Dict] = [
+        {
+            "nombre": "investigar",
+            "rol": "Buscar información",
+            "herramientas": ["duckduckgo"],
+        },
+        {
+            "nombre": "analizar",
+            "rol": "Analizar la información encontrada",
+            "herramientas": ["reasoning"],
+            "depende_de": ["investigar"],
+        },
+        {
+            "nombre": "redactar",
+            "rol": "Redactar la respuesta final",
+            "herramientas": [],
+            "depende_de": ["analizar"],
+        },
+    ]
+
+    # Versión del formato de especificación compacta (generate_agent_spec)
+    SPEC_VERSION = 1
+
     @staticmethod
     def _get_model_import(modelo: str) -> str:
         """
@@ -44,32 +102,46 @@ class AgentTemplate:
             return "from agno.models.anthropic import Claude"
 
     @staticmethod
-    def _get_model_init(modelo: str) -> str:
+    def _resolve_model(modelo: str) -> Tuple[str, str]:
         """
-        Retorna el código de inicialización del modelo.
+        Resuelve la clase de Agno y el id del modelo especificado.
 
         Args:
             modelo: Nombre del modelo
 
         Returns:
-            String con la inicialización del modelo
+            Tupla con (clase_modelo, model_id)
         """
         modelo_lower = modelo.lower()
 
         if "deepseek" in modelo_lower:
             model_id = modelo if "deepseek" in modelo_lower else "deepseek-chat"
-            return f'DeepSeek(id="{model_id}")'
+            return "DeepSeek", model_id
         elif "claude" in modelo_lower or "sonnet" in modelo_lower:
             model_id = modelo if "claude-" in modelo else "claude-sonnet-4-20250514"
-            return f'Claude(id="{model_id}")'
+            return "Claude", model_id
         elif "gpt" in modelo_lower or "openai" in modelo_lower:
             model_id = modelo if "gpt-" in modelo else "gpt-4o"
-            return f'OpenAIChat(id="{model_id}")'
+            return "OpenAIChat", model_id
         elif "gemini" in modelo_lower or "google" in modelo_lower:
             model_id = modelo if "gemini-" in modelo else "gemini-2.0-flash-exp"
-            return f'Gemini(id="{model_id}")'
+            return "Gemini", model_id
         else:
-            return 'DeepSeek(id="deepseek-chat")'
+            return "DeepSeek", "deepseek-chat"
+
+    @staticmethod
+    def _get_model_init(modelo: str) -> str:
+        """
+        Retorna el código de inicialización del modelo.
+
+        Args:
+            modelo: Nombre del modelo
+
+        Returns:
+            String con la inicialización del modelo
+        """
+        model_class, model_id = AgentTemplate._resolve_model(modelo)
+        return f'{model_class}(id="{model_id}")'
 
     @staticmethod
     def _get_tool_import(tool_name: str) -> str:
@@ -89,14 +161,10 @@ class AgentTemplate:
             "reasoning": "from agno.tools.reasoning import ReasoningTools",
             "python": "from agno.tools.python import PythonTools",
             "file": "from agno.tools.file import FileTools",
-            "web": "from agno.tools.duckduckgo import DuckDuckGoTools",
-            "search": "from agno.tools.duckduckgo import DuckDuckGoTools",
-            "finance": "from agno.tools.yfinance import YFinanceTools",
-            "stock": "from agno.tools.yfinance import YFinanceTools",
         }
 
-        tool_lower = tool_name.lower()
-        return tool_map.get(tool_lower, f"# Tool '{tool_name}' not found")
+        tool_id = AgentTemplate.TOOL_ALIASES.get(tool_name.lower())
+        return tool_map.get(tool_id, f"# Tool '{tool_name}' not found")
 
     @staticmethod
     def _generate_tools_init(tool_name: str) -> str:
@@ -128,6 +196,56 @@ class AgentTemplate:
         else:
             return f"# Initialize {tool_name} here"
 
+    @staticmethod
+    def _resolve_tool_ids(herramientas: List[str]) -> Tuple[List[str], List[str]]:
+        """
+        Resuelve los ids canónicos de una lista de herramientas.
+
+        Añade SerperTools como respaldo cuando se pide búsqueda web sin Serper.
+
+        Args:
+            herramientas: Lista de nombres de herramientas (admite alias)
+
+        Returns:
+            Tupla con (ids_canonicos, herramientas_desconocidas)
+        """
+        tool_ids: List[str] = []
+        unknown: List[str] = []
+
+        for tool in herramientas:
+            tool_id = AgentTemplate.TOOL_ALIASES.get(tool.lower())
+            if tool_id is None:
+                if tool not in unknown:
+                    unknown.append(tool)
+            elif tool_id not in tool_ids:
+                # Alias de la misma herramienta: una sola instancia
+                tool_ids.append(tool_id)
+
+        if "duckduckgo" in tool_ids and "serper" not in tool_ids:
+            tool_ids.append("serper")
+
+        return tool_ids, unknown
+
+    @staticmethod
+    def _resolve_tools(herramientas: List[str]) -> Tuple[List[str], List[str], List[str]]:
+        """
+        Resuelve imports e inicializaciones de una lista de herramientas.
+
+        Args:
+            herramientas: Lista de nombres de herramientas
+
+        Returns:
+            Tupla con (imports_ordenados, inicializaciones, comentarios_placeholder)
+        """
+        tool_ids, unknown = AgentTemplate._resolve_tool_ids(herramientas)
+
+        imports = sorted({AgentTemplate._get_tool_import(tool_id) for tool_id in tool_ids})
+        tools_init = [AgentTemplate._generate_tools_init(tool_id) for tool_id in tool_ids]
+        # Mantener placeholders en lista de herramientas
+        placeholders = [AgentTemplate._generate_tools_init(tool) for tool in unknown]
+
+        return imports, tools_init, placeholders
+
     @staticmethod
     def _build_tools_code(herramientas: List[str]) -> Tuple[str, str, List[str]]:
         """
@@ -142,46 +260,1088 @@ class AgentTemplate:
         if not herramientas:
             return "", "[]", []
 
-        imports = set()
-        tools_init = []
-        has_valid_tools = False
-        placeholders: List[str] = []
+        imports, tools_init, placeholders = AgentTemplate._resolve_tools(herramientas)
 
-        needs_serper_fallback = False
-        serper_requested = False
+        imports_str = "\n".join(imports)
 
-        for tool in herramientas:
-            import_line = AgentTemplate._get_tool_import(tool)
-            tool_init = AgentTemplate._generate_tools_init(tool)
+        if tools_init:
+            tools_str = "[" + ", ".join(tools_init) + "]"
+        else:
+            tools_str = "[]"
 
-            if import_line.startswith("#"):
-                # Mantener placeholder en lista de herramientas
-                placeholders.append(tool_init)
+        return imports_str, tools_str, placeholders
+
+    @staticmethod
+    def _tool_var_name(tool_init: str) -> str:
+        """
+        Retorna el nombre de variable para una instancia de herramienta compartida.
+
+        Args:
+            tool_init: Código de inicialización (ej: "DuckDuckGoTools()")
+
+        Returns:
+            Nombre de variable (ej: "herramienta_duckduckgo")
+        """
+        class_name = tool_init.split("(", 1)[0]
+        base = class_name.removesuffix("Tools").lower() or "tool"
+        return f"herramienta_{base}"
+
+    @staticmethod
+    def _share_instances(
+        member: Dict,
+        shared_models: Dict[str, str],
+        shared_tools: Dict[str, str],
+        model_imports: set,
+        extra_imports: set,
+    ) -> Tuple[str, List[str], List[str]]:
+        """
+        Registra el modelo y las herramientas de un miembro como instancias compartidas.
+
+        Args:
+            member: Miembro de equipo o paso de workflow ("herramientas" y "modelo" opcional)
+            shared_models: Inicialización de modelo -> variable (se actualiza)
+            shared_tools: Inicialización de herramienta -> variable (se actualiza)
+            model_imports: Imports de modelos (se actualiza)
+            extra_imports: Imports de herramientas (se actualiza)
+
+        Returns:
+            Tupla con (variable_modelo, variables_herramientas, comentarios_placeholder)
+        """
+        tool_imports, tool_inits, placeholders = AgentTemplate._resolve_tools(
+            member.get("herramientas", [])
+        )
+        extra_imports.update(tool_imports)
+
+        tool_vars: List[str] = []
+        for tool_init in tool_inits:
+            if tool_init not in shared_tools:
+                tool_var = AgentTemplate._tool_var_name(tool_init)
+                if tool_var in shared_tools.values():
+                    tool_var = f"{tool_var}_{len(shared_tools)}"
+                shared_tools[tool_init] = tool_var
+            tool_vars.append(shared_tools[tool_init])
+
+        # Override opcional del modelo por miembro
+        model_var = "modelo"
+        if member.get("modelo"):
+            model_init = AgentTemplate._get_model_init(member["modelo"])
+            if model_init not in shared_models:
+                shared_models[model_init] = f"modelo_{len(shared_models)}"
+                model_imports.add(AgentTemplate._get_model_import(member["modelo"]))
+            model_var = shared_models[model_init]
+
+        return model_var, tool_vars, placeholders
+
+    @staticmethod
+    def _build_execution_code(spec: Dict) -> Dict[str, Any]:
+        """
+        Construye las piezas que dependen del modo de ejecución (sync/async).
+
+        Args:
+            spec: Especificación del agente (usa modo_async)
+
+        Returns:
+            Diccionario con:
+                - imports: módulos adicionales de la librería estándar
+                - helpers: funciones auxiliares a nivel de módulo
+                - main_def: definición de la función principal
+                - run_prefix: prefijo para llamadas de ejecución ("await " o "")
+                - print_method: método para imprimir respuestas
+                - entry: llamada del punto de entrada
+        """
+        if not spec.get("modo_async", False):
+            return {
+                "imports": [],
+                "helpers": "",
+                "main_def": "def main():",
+                "run_prefix": "",
+                "print_method": "print_response",
+                "entry": "main()",
+            }
+
+        helpers = '''async def ejecutar_concurrente(ejecutor, prompts, max_concurrencia=MAX_CONCURRENCIA):
+    """
+    Ejecuta varios prompts en paralelo con concurrencia acotada.
+
+    Args:
+        ejecutor: Agente o equipo con método arun
+        prompts: Lista de prompts a procesar
+        max_concurrencia: Máximo de ejecuciones simultáneas
+
+    Returns:
+        Lista de respuestas en el mismo orden que los prompts
+    """
+    semaforo = asyncio.Semaphore(max_concurrencia)
+
+    async def ejecutar(prompt):
+        async with semaforo:
+            respuesta = await ejecutor.arun(prompt)
+            return respuesta.content
+
+    return await asyncio.gather(*(ejecutar(prompt) for prompt in prompts))
+
+
+'''
+
+        return {
+            "imports": ["asyncio"],
+            "helpers": helpers,
+            "main_def": "async def main():",
+            "run_prefix": "await ",
+            "print_method": "aprint_response",
+            "entry": "asyncio.run(main())",
+        }
+
+    @staticmethod
+    def _build_tool_cache_code(spec: Dict) -> Dict[str, Any]:
+        """
+        Construye el cache TTL de resultados de herramientas (memoria + SQLite).
+
+        El cache se conecta a los agentes generados mediante ``tool_hooks``,
+        con claves derivadas del nombre de la herramienta y el hash de sus
+        argumentos, por lo que se comparte entre ejecuciones y miembros.
+
+        Args:
+            spec: Especificación del agente (usa cache_herramientas,
+                cache_ttl_segundos y modo_async)
+
+        Returns:
+            Diccionario con:
+                - imports: módulos adicionales de la librería estándar
+                - classes: constantes y clase de cache, sin instanciar
+                - helpers: classes más la instancia a nivel de módulo
+                - tool_hooks: línea ``tool_hooks=[...]`` para cada Agent
+        """
+        if not spec.get("cache_herramientas", False):
+            return {"imports": [], "classes": "", "helpers": "", "tool_hooks": ""}
+
+        ttl = max(int(spec.get("cache_ttl_segundos", 3600) or 0), 0)
+
+        if spec.get("modo_async", False):
+            hook_def = "async def hook(self, function_name, function_call, arguments):"
+            hook_call = "await function_call(**arguments)"
+        else:
+            hook_def = "def hook(self, function_name, function_call, arguments):"
+            hook_call = "function_call(**arguments)"
+
+        helpers = f'''# Cache de resultados de herramientas
+CACHE_TTL_SEGUNDOS = {ttl}
+CACHE_DB_FILE = "tools_cache.sqlite"
+
+# TTL específico por función de herramienta (ej: {{"get_current_stock_price": 60}})
+CACHE_TTL_POR_HERRAMIENTA = {{}}
+
+
+class CacheHerramientas:
+    """Cache TTL de resultados de herramientas en memoria y SQLite."""
+
+    def __init__(self, db_file=CACHE_DB_FILE, ttl=CACHE_TTL_SEGUNDOS):
+        self.ttl = ttl
+        self.memoria = {{}}
+        self.aciertos = 0
+        self.fallos = 0
+        self.lock = threading.Lock()
+        self.conexion = sqlite3.connect(db_file, check_same_thread=False)
+        self.conexion.execute(
+            "CREATE TABLE IF NOT EXISTS tool_cache "
+            "(clave TEXT PRIMARY KEY, resultado TEXT NOT NULL, expira REAL NOT NULL)"
+        )
+        self.conexion.commit()
+
+    @staticmethod
+    def clave(function_name, arguments):
+        """Genera la clave a partir de la herramienta y el hash de sus argumentos."""
+        payload = json.dumps(arguments, sort_keys=True, default=str)
+        digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+        return f"{{function_name}}:{{digest}}"
+
+    def obtener(self, clave):
+        """Retorna (encontrado, resultado) si la entrada sigue vigente."""
+        ahora = time.time()
+        with self.lock:
+            entrada = self.memoria.get(clave)
+            if entrada is None:
+                fila = self.conexion.execute(
+                    "SELECT resultado, expira FROM tool_cache WHERE clave = ?", (clave,)
+                ).fetchone()
+                if fila is not None:
+                    entrada = (json.loads(fila[0]), fila[1])
+                    self.memoria[clave] = entrada
+
+            if entrada is not None and entrada[1] > ahora:
+                self.aciertos += 1
+                return True, entrada[0]
+
+            self.fallos += 1
+            return False, None
+
+    def guardar(self, function_name, clave, resultado):
+        """Guarda el resultado en memoria y, si es serializable, en SQLite."""
+        ttl = CACHE_TTL_POR_HERRAMIENTA.get(function_name, self.ttl)
+        expira = time.time() + ttl
+        with self.lock:
+            self.memoria[clave] = (resultado, expira)
+            try:
+                serializado = json.dumps(resultado)
+            except TypeError:
+                return
+            self.conexion.execute(
+                "INSERT OR REPLACE INTO tool_cache (clave, resultado, expira) VALUES (?, ?, ?)",
+                (clave, serializado, expira),
+            )
+            self.conexion.commit()
+
+    {hook_def}
+        """Tool hook de Agno: retorna el resultado cacheado o ejecuta la herramienta."""
+        clave = self.clave(function_name, arguments)
+        encontrado, resultado = self.obtener(clave)
+        if encontrado:
+            return resultado
+
+        resultado = {hook_call}
+        self.guardar(function_name, clave, resultado)
+        return resultado
+
+    def imprimir_estadisticas(self):
+        """Imprime las estadísticas de uso del cache."""
+        total = self.aciertos + self.fallos
+        ratio = (self.aciertos / total * 100) if total else 0.0
+        print(
+            f"\\n🗄️  Cache de herramientas: {{self.aciertos}} aciertos, "
+            f"{{self.fallos}} fallos ({{ratio:.1f}}% acierto)",
+            file=sys.stderr,
+        )
+
+    def cerrar(self):
+        """Cierra la conexión SQLite y retira las estadísticas de atexit."""
+        atexit.unregister(self.imprimir_estadisticas)
+        with self.lock:
+            self.conexion.close()
+
+
+'''
+        instance = """cache_herramientas = CacheHerramientas()
+atexit.register(cache_herramientas.imprimir_estadisticas)
+
+
+"""
+
+        return {
+            "imports": ["atexit", "hashlib", "json", "sqlite3", "sys", "threading", "time"],
+            "classes": helpers,
+            "helpers": helpers + instance,
+            "tool_hooks": "\n        tool_hooks=[cache_herramientas.hook],",
+            "close": "cache_herramientas.cerrar()",
+        }
+
+    @staticmethod
+    def _build_batch_code(spec: Dict, target: str) -> Dict[str, Any]:
+        """
+        Construye el modo batch: prompts desde JSONL/stdin y resultados en JSONL.
+
+        Args:
+            spec: Especificación del agente (usa modo_batch y modo_async)
+            target: Variable del agente generado ("agent", "team" o "workflow")
+
+        Returns:
+            Diccionario con:
+                - imports: módulos adicionales de la librería estándar
+                - helpers: lectura de prompts, runner batch y parser de argumentos
+                - block: bloque de main() que activa el modo batch
+        """
+        if not spec.get("modo_batch", False):
+            return {"imports": [], "helpers": "", "block": ""}
+
+        nombre = spec.get("nombre", "Mi Agente")
+
+        helpers = '''def leer_prompts(origen):
+    """
+    Lee prompts desde un archivo JSONL o desde stdin ("-").
+
+    Cada línea puede ser un string JSON o un objeto con "prompt" (e "id" opcional).
+    Las líneas inválidas se retornan con "error" en lugar de "prompt", para
+    reportarlas sin detener el batch.
+    """
+    archivo = sys.stdin if origen == "-" else open(origen, "r", encoding="utf-8")
+    try:
+        for numero, linea in enumerate(archivo, start=1):
+            linea = linea.strip()
+            if not linea:
                 continue
+            try:
+                registro = json.loads(linea)
+            except json.JSONDecodeError as error:
+                yield {"id": numero, "error": f"JSON inválido: {error}"}
+                continue
+            if isinstance(registro, str):
+                yield {"id": numero, "prompt": registro}
+            elif isinstance(registro, dict) and isinstance(registro.get("prompt"), str):
+                yield {"id": registro.get("id", numero), "prompt": registro["prompt"]}
+            else:
+                identificador = registro.get("id", numero) if isinstance(registro, dict) else numero
+                yield {"id": identificador, "error": 'El registro no tiene un "prompt" de texto'}
+    finally:
+        if archivo is not sys.stdin:
+            archivo.close()
 
-            imports.add(import_line)
-            tools_init.append(tool_init)
-            has_valid_tools = True
 
-            tool_lower = tool.lower()
-            if any(keyword in tool_lower for keyword in ("duckduckgo", "web", "search")):
-                needs_serper_fallback = True
-            if "serper" in tool_lower:
-                serper_requested = True
+def escribir_resultado(salida, resultado):
+    """Escribe un resultado como línea JSONL y la vuelca inmediatamente."""
+    salida.write(json.dumps(resultado, ensure_ascii=False) + "\\n")
+    salida.flush()
 
-        if needs_serper_fallback and not serper_requested:
-            imports.add("from agno.tools.serper import SerperTools")
-            tools_init.append('SerperTools(api_key=os.getenv("SERPER_API_KEY"))')
-            has_valid_tools = True
 
-        imports_str = "\n".join(sorted(imports))
+'''
 
-        if has_valid_tools:
-            tools_str = "[" + ", ".join(tools_init) + "]"
+        if spec.get("modo_async", False):
+            helpers += '''async def ejecutar_batch(ejecutor, origen, destino, max_concurrencia=MAX_CONCURRENCIA):
+    """
+    Procesa prompts en batch con concurrencia acotada y escribe resultados JSONL.
+
+    Los resultados se escriben a medida que terminan, con su tiempo en ms.
+    """
+    semaforo = asyncio.Semaphore(max_concurrencia)
+    salida = sys.stdout if destino == "-" else open(destino, "w", encoding="utf-8")
+
+    async def procesar(registro):
+        async with semaforo:
+            inicio = time.perf_counter()
+            resultado = {"id": registro["id"], "prompt": registro["prompt"]}
+            try:
+                respuesta = await ejecutor.arun(registro["prompt"])
+                resultado["respuesta"] = respuesta.content
+            except Exception as error:
+                resultado["error"] = str(error)
+            resultado["duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+            return resultado
+
+    pendientes = set()
+    try:
+        for registro in leer_prompts(origen):
+            if "error" in registro:
+                escribir_resultado(salida, registro)
+                continue
+            if len(pendientes) >= max_concurrencia * 2:
+                completadas, pendientes = await asyncio.wait(
+                    pendientes, return_when=asyncio.FIRST_COMPLETED
+                )
+                for tarea in completadas:
+                    escribir_resultado(salida, tarea.result())
+            pendientes.add(asyncio.create_task(procesar(registro)))
+
+        for tarea in asyncio.as_completed(pendientes):
+            escribir_resultado(salida, await tarea)
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+
+'''
+            imports = ["argparse", "asyncio", "json", "sys", "time"]
         else:
-            tools_str = "[]"
+            helpers += '''def ejecutar_batch(ejecutor, origen, destino, max_concurrencia=MAX_CONCURRENCIA):
+    """
+    Procesa prompts en batch con concurrencia acotada y escribe resultados JSONL.
 
-        return imports_str, tools_str, placeholders
+    Los resultados se escriben a medida que terminan, con su tiempo en ms.
+    """
+    salida = sys.stdout if destino == "-" else open(destino, "w", encoding="utf-8")
+
+    def procesar(registro):
+        inicio = time.perf_counter()
+        resultado = {"id": registro["id"], "prompt": registro["prompt"]}
+        try:
+            respuesta = ejecutor.run(registro["prompt"])
+            resultado["respuesta"] = respuesta.content
+        except Exception as error:
+            resultado["error"] = str(error)
+        resultado["duracion_ms"] = round((time.perf_counter() - inicio) * 1000, 2)
+        return resultado
+
+    pendientes = set()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrencia) as pool:
+            for registro in leer_prompts(origen):
+                if "error" in registro:
+                    escribir_resultado(salida, registro)
+                    continue
+                if len(pendientes) >= max_concurrencia * 2:
+                    completadas, pendientes = concurrent.futures.wait(
+                        pendientes, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for futuro in completadas:
+                        escribir_resultado(salida, futuro.result())
+                pendientes.add(pool.submit(procesar, registro))
+
+            for futuro in concurrent.futures.as_completed(pendientes):
+                escribir_resultado(salida, futuro.result())
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+
+'''
+            imports = ["argparse", "concurrent.futures", "json", "sys", "time"]
+
+        helpers += f'''def entero_positivo(valor):
+    """Tipo de argparse para enteros mayores o iguales a 1."""
+    numero = int(valor)
+    if numero < 1:
+        raise argparse.ArgumentTypeError("debe ser un entero mayor o igual a 1")
+    return numero
+
+
+def parsear_argumentos():
+    """Parsea los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description="{nombre}")
+    parser.add_argument(
+        "--batch",
+        metavar="ENTRADA",
+        help="Archivo JSONL con prompts a procesar ('-' para stdin)",
+    )
+    parser.add_argument(
+        "--salida",
+        default="-",
+        help="Archivo JSONL de resultados ('-' para stdout)",
+    )
+    parser.add_argument(
+        "--concurrencia",
+        type=entero_positivo,
+        default=MAX_CONCURRENCIA,
+        help="Máximo de prompts procesados en paralelo",
+    )
+    return parser.parse_args()
+
+
+'''
+
+        run_prefix = "await " if spec.get("modo_async", False) else ""
+        block = f'''
+    # Modo batch: procesar prompts desde JSONL/stdin
+    args = parsear_argumentos()
+    if args.batch:
+        {run_prefix}ejecutar_batch({target}, args.batch, args.salida, args.concurrencia)
+        return
+'''
+
+        return {"imports": imports, "helpers": helpers, "block": block}
+
+    @staticmethod
+    def _build_memory_code(spec: Dict) -> Dict[str, Any]:
+        """
+        Construye el mantenimiento de memoria del agente con memoria (Nivel 3).
+
+        Permite usar un modelo más económico para extraer memorias y resumir
+        la sesión, y ejecutar ese trabajo en segundo plano cada N turnos
+        mediante un post-hook, en lugar de en cada respuesta.
+
+        Args:
+            spec: Especificación del agente (usa modelo_memoria,
+                memoria_segundo_plano y memoria_cada_n_turnos)
+
+        Returns:
+            Diccionario con:
+                - imports: módulos adicionales de la librería estándar
+                - agno_imports: imports adicionales de Agno
+                - helpers: clase de mantenimiento e instancia a nivel de módulo
+                - agent_kwargs: argumentos de memoria para el Agent
+        """
+        modelo_memoria = spec.get("modelo_memoria") or ""
+        segundo_plano = spec.get("memoria_segundo_plano", False)
+        cada_n_turnos = max(int(spec.get("memoria_cada_n_turnos", 1) or 1), 1)
+        manual = segundo_plano or cada_n_turnos > 1
+
+        if not modelo_memoria and not manual:
+            return {
+                "imports": [],
+                "agno_imports": "",
+                "helpers": "",
+                "agent_kwargs": """
+        enable_user_memories=True,
+        enable_session_summary=True,""",
+            }
+
+        memory_model = modelo_memoria or spec.get("modelo", "deepseek-chat")
+        memory_model_init = AgentTemplate._get_model_init(memory_model)
+        agno_imports = {
+            "from agno.memory import MemoryManager",
+            "from agno.session import SessionSummaryManager",
+        }
+        memory_import = AgentTemplate._get_model_import(memory_model)
+        if memory_import != AgentTemplate._get_model_import(spec.get("modelo", "deepseek-chat")):
+            agno_imports.add(memory_import)
+
+        managers = f"""
+        memory_manager=MemoryManager(model={memory_model_init}, db=db),
+        session_summary_manager=SessionSummaryManager(model={memory_model_init}),"""
+
+        if not manual:
+            return {
+                "imports": [],
+                "agno_imports": "\n".join(sorted(agno_imports)),
+                "helpers": "",
+                "agent_kwargs": managers
+                + """
+        enable_user_memories=True,
+        enable_session_summary=True,""",
+            }
+
+        helpers = f'''# Mantenimiento de memoria: cada cuántos turnos y si corre en segundo plano
+MEMORIA_CADA_N_TURNOS = {cada_n_turnos}
+MEMORIA_EN_SEGUNDO_PLANO = {segundo_plano}
+
+
+class MantenimientoMemoria:
+    """Actualiza memorias y resumen de sesión fuera del camino de la respuesta."""
+
+    def __init__(self, cada_n_turnos=MEMORIA_CADA_N_TURNOS, en_segundo_plano=MEMORIA_EN_SEGUNDO_PLANO):
+        self.cada_n_turnos = max(cada_n_turnos, 1)
+        self.en_segundo_plano = en_segundo_plano
+        self.turnos = {{}}
+        self.mensajes = {{}}
+        self.lock = threading.Lock()
+        # Un único worker serializa las actualizaciones de memoria
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        atexit.register(self.executor.shutdown, wait=True)
+
+    def hook(self, run_output, agent):
+        """Post-hook de Agno: acumula el turno y programa el mantenimiento."""
+        session_id = run_output.session_id
+        with self.lock:
+            pendientes = self.mensajes.setdefault(session_id, [])
+            pendientes.extend(
+                mensaje
+                for mensaje in (run_output.messages or [])
+                if mensaje.role in ("user", "assistant")
+            )
+            self.turnos[session_id] = self.turnos.get(session_id, 0) + 1
+            if self.turnos[session_id] % self.cada_n_turnos:
+                return
+            mensajes = self.mensajes.pop(session_id)
+
+        if self.en_segundo_plano:
+            self.executor.submit(self.actualizar, agent, session_id, run_output.user_id, mensajes)
+        else:
+            self.actualizar(agent, session_id, run_output.user_id, mensajes)
+
+    @staticmethod
+    def actualizar(agent, session_id, user_id, mensajes):
+        """Extrae memorias de los turnos acumulados y regenera el resumen."""
+        try:
+            agent.memory_manager.create_user_memories(
+                messages=mensajes, user_id=user_id, agent_id=agent.id
+            )
+            sesion = agent.get_session(session_id=session_id)
+            if sesion is not None:
+                agent.session_summary_manager.create_session_summary(session=sesion)
+                agent.save_session(sesion)
+        except Exception as error:
+            print(f"⚠️  Error en mantenimiento de memoria: {{error}}", file=sys.stderr)
+
+    def cerrar(self):
+        """Espera las actualizaciones pendientes y detiene el worker."""
+        atexit.unregister(self.executor.shutdown)
+        self.executor.shutdown(wait=True)
+
+
+mantenimiento_memoria = MantenimientoMemoria()
+
+
+'''
+
+        return {
+            "imports": ["atexit", "concurrent.futures", "sys", "threading"],
+            "agno_imports": "\n".join(sorted(agno_imports)),
+            "helpers": helpers,
+            "close": "mantenimiento_memoria.cerrar()",
+            "agent_kwargs": managers
+            + """
+        enable_user_memories=False,
+        enable_session_summary=False,
+        add_memories_to_context=True,
+        add_session_summary_to_context=True,
+        post_hooks=[mantenimiento_memoria.hook],""",
+        }
+
+    @staticmethod
+    def _build_knowledge_code(spec: Dict) -> Dict[str, Any]:
+        """
+        Construye el índice vectorial local del agente con conocimiento (Nivel 2).
+
+        Los embeddings se guardan en un array NumPy mapeado en memoria y la
+        búsqueda top-k por coseno se hace por bloques, de modo que el índice
+        escala a millones de fragmentos sin cargarlos en RAM. El embedding por
+        defecto es local (hashing de términos) y funciona sin red.
+
+        Args:
+            spec: Especificación del agente (usa directorio_conocimiento)
+
+        Returns:
+            Diccionario con:
+                - imports: módulos adicionales de la librería estándar
+                - helpers: embedding, índice, herramienta de búsqueda e instancia
+        """
+        directorio = spec.get("directorio_conocimiento") or "conocimiento"
+
+        constants = f"""# Base de conocimiento local: documentos, índice y parámetros de ingesta/búsqueda
+DIRECTORIO_DOCUMENTOS = {json.dumps(directorio)}
+DIRECTORIO_INDICE = {json.dumps(directorio + "_indice")}
+EXTENSIONES_DOCUMENTOS = (".txt", ".md")
+DIMENSION_EMBEDDING = 384
+TAMANO_CHUNK = 800
+TAMANO_LOTE = 256
+BLOQUE_BUSQUEDA = 65536
+TOP_K = 5
+
+
+"""
+
+        helpers = r'''def embeber(textos):
+    """
+    Embedding local sin red (hashing de palabras y bigramas).
+
+    Puede reemplazarse por un modelo de embeddings real con la misma firma:
+    lista de textos -> matriz float32 (n, DIMENSION_EMBEDDING) normalizada.
+    """
+    filas, columnas, signos = [], [], []
+    for fila, texto in enumerate(textos):
+        palabras = re.findall(r"\w+", texto.lower())
+        for termino in palabras + [f"{a} {b}" for a, b in zip(palabras, palabras[1:])]:
+            valor = zlib.crc32(termino.encode("utf-8"))
+            filas.append(fila)
+            columnas.append(valor % DIMENSION_EMBEDDING)
+            signos.append(1.0 if valor & 0x80000000 else -1.0)
+
+    matriz = np.zeros((len(textos), DIMENSION_EMBEDDING), dtype=np.float32)
+    np.add.at(matriz, (filas, columnas), signos)
+    normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+    return matriz / np.maximum(normas, 1e-12)
+
+
+def dividir_en_chunks(texto, tamano=TAMANO_CHUNK):
+    """Divide un texto en fragmentos de hasta `tamano` caracteres respetando párrafos."""
+    chunks, actual = [], ""
+    for parrafo in re.split(r"\n\s*\n", texto):
+        parrafo = " ".join(parrafo.split())
+        if not parrafo:
+            continue
+        if actual and len(actual) + len(parrafo) + 1 > tamano:
+            chunks.append(actual)
+            actual = ""
+        actual = f"{actual} {parrafo}".strip()
+        while len(actual) > tamano:
+            corte = actual.rfind(" ", 0, tamano)
+            corte = corte if corte > 0 else tamano
+            chunks.append(actual[:corte])
+            actual = actual[corte:].strip()
+    if actual:
+        chunks.append(actual)
+    return chunks
+
+
+class IndiceVectorial:
+    """
+    Índice vectorial local en disco.
+
+    Los embeddings viven en un array float32 mapeado en memoria
+    (vectores.f32) y los textos en un JSONL indexado por offsets
+    (offsets.i64), así una búsqueda solo lee los fragmentos que devuelve.
+    Agregar documentos escribe al final de los archivos sin reconstruir.
+    """
+
+    def __init__(self, directorio=DIRECTORIO_INDICE, dimension=DIMENSION_EMBEDDING):
+        self.directorio = pathlib.Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.dimension = dimension
+        self.ruta_vectores = self.directorio / "vectores.f32"
+        self.ruta_offsets = self.directorio / "offsets.i64"
+        self.ruta_textos = self.directorio / "textos.jsonl"
+        self.ruta_meta = self.directorio / "meta.json"
+        self.lock = threading.Lock()
+        self.lock_ingesta = threading.Lock()
+        self._vectores = None
+        self._offsets = None
+
+        self.meta = {"dimension": dimension, "total": 0, "fuentes": {}}
+        if self.ruta_meta.exists():
+            self.meta = json.loads(self.ruta_meta.read_text(encoding="utf-8"))
+            if self.meta["dimension"] != dimension:
+                raise ValueError(f"El índice usa dimensión {self.meta['dimension']}, no {dimension}")
+
+        # Descartar escrituras parciales de una ingesta interrumpida
+        for ruta, tamano in (
+            (self.ruta_vectores, self.total * dimension * 4),
+            (self.ruta_offsets, self.total * 8),
+        ):
+            if ruta.exists() and ruta.stat().st_size > tamano:
+                os.truncate(ruta, tamano)
+
+    @property
+    def total(self):
+        """Número de fragmentos indexados."""
+        return self.meta["total"]
+
+    def _guardar_meta(self):
+        temporal = self.ruta_meta.with_suffix(".tmp")
+        temporal.write_text(json.dumps(self.meta, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporal, self.ruta_meta)
+
+    def _abrir(self):
+        """Mapea en memoria vectores y offsets (solo lectura)."""
+        with self.lock:
+            if self._vectores is None and self.total:
+                self._vectores = np.memmap(
+                    self.ruta_vectores, dtype=np.float32, mode="r", shape=(self.total, self.dimension)
+                )
+                self._offsets = np.memmap(
+                    self.ruta_offsets, dtype=np.int64, mode="r", shape=(self.total,)
+                )
+            return self._vectores, self._offsets
+
+    def agregar(self, textos, fuentes, documentos=(), tamano_lote=TAMANO_LOTE):
+        """
+        Agrega fragmentos al final del índice, embebiéndolos por lotes.
+
+        ``total`` y ``fuentes`` se guardan juntos en meta.json una sola vez,
+        al terminar: si la ingesta se interrumpe, los fragmentos escritos a
+        medias se descartan al reabrir el índice y el documento se vuelve a
+        ingestar completo (sin duplicados).
+
+        Args:
+            textos: Fragmentos a indexar
+            fuentes: Fuente de cada fragmento
+            documentos: Documentos completamente ingestados con estos fragmentos
+            tamano_lote: Fragmentos embebidos y escritos por lote
+        """
+        with self.lock_ingesta:
+            for desde in range(0, len(textos), max(tamano_lote, 1)):
+                lote = textos[desde : desde + tamano_lote]
+                vectores = embeber(lote)
+                lineas = [
+                    (json.dumps({"texto": texto, "fuente": fuente}, ensure_ascii=False) + "\n").encode("utf-8")
+                    for texto, fuente in zip(lote, fuentes[desde : desde + tamano_lote])
+                ]
+                with self.lock:
+                    with open(self.ruta_textos, "ab") as archivo:
+                        inicio = archivo.tell()
+                        archivo.write(b"".join(lineas))
+                    offsets = inicio + np.cumsum([0] + [len(linea) for linea in lineas[:-1]], dtype=np.int64)
+                    with open(self.ruta_offsets, "ab") as archivo:
+                        archivo.write(offsets.tobytes())
+                    with open(self.ruta_vectores, "ab") as archivo:
+                        archivo.write(vectores.astype(np.float32).tobytes())
+
+            with self.lock:
+                self.meta["total"] += len(textos)
+                self.meta["fuentes"].update(documentos)
+                self._guardar_meta()
+                self._vectores = self._offsets = None
+
+    def ingestar_directorio(self, directorio=DIRECTORIO_DOCUMENTOS, tamano_lote=TAMANO_LOTE):
+        """
+        Ingesta los documentos nuevos de un directorio.
+
+        Los documentos ya ingestados se omiten; para reindexar documentos
+        modificados borra el directorio del índice.
+
+        Returns:
+            Número de fragmentos agregados
+        """
+        agregados = 0
+        for ruta in sorted(pathlib.Path(directorio).rglob("*")):
+            fuente = str(ruta)
+            if (
+                ruta.suffix.lower() not in EXTENSIONES_DOCUMENTOS
+                or not ruta.is_file()
+                or fuente in self.meta["fuentes"]
+            ):
+                continue
+            textos = dividir_en_chunks(ruta.read_text(encoding="utf-8", errors="ignore"))
+            # Los fragmentos del documento y su registro se confirman juntos
+            self.agregar(textos, [fuente] * len(textos), {fuente: ruta.stat().st_mtime}, tamano_lote)
+            agregados += len(textos)
+        return agregados
+
+    def buscar(self, consulta, k=TOP_K):
+        """Retorna los k fragmentos más similares (coseno) a la consulta."""
+        vectores, offsets = self._abrir()
+        if vectores is None or k <= 0:
+            return []
+
+        vector_consulta = embeber([consulta])[0]
+        mejores_idx = np.empty(0, dtype=np.int64)
+        mejores_score = np.empty(0, dtype=np.float32)
+        for inicio in range(0, len(vectores), BLOQUE_BUSQUEDA):
+            scores = vectores[inicio : inicio + BLOQUE_BUSQUEDA] @ vector_consulta
+            top = np.argpartition(scores, -k)[-k:] if len(scores) > k else np.arange(len(scores))
+            mejores_idx = np.concatenate([mejores_idx, top + inicio])
+            mejores_score = np.concatenate([mejores_score, scores[top]])
+            if len(mejores_idx) > k:
+                top = np.argpartition(mejores_score, -k)[-k:]
+                mejores_idx, mejores_score = mejores_idx[top], mejores_score[top]
+
+        resultados = []
+        with open(self.ruta_textos, "rb") as archivo:
+            for posicion in np.argsort(-mejores_score):
+                archivo.seek(int(offsets[mejores_idx[posicion]]))
+                fragmento = json.loads(archivo.readline())
+                fragmento["score"] = round(float(mejores_score[posicion]), 4)
+                resultados.append(fragmento)
+        return resultados
+
+
+indice_conocimiento = IndiceVectorial()
+
+
+def buscar_conocimiento(consulta: str) -> str:
+    """
+    Busca en la base de conocimiento local los fragmentos más relevantes.
+
+    Args:
+        consulta: Pregunta o términos a buscar
+
+    Returns:
+        JSON con los fragmentos encontrados, su fuente y su similitud
+    """
+    return json.dumps(indice_conocimiento.buscar(consulta), ensure_ascii=False)
+
+
+'''
+
+        return {
+            "imports": ["json", "pathlib", "re", "threading", "zlib"],
+            "helpers": constants + helpers,
+        }
+
+    @staticmethod
+    def _build_workflow_code(spec: Dict) -> Dict[str, Any]:
+        """
+        Construye el ejecutor DAG del workflow (Nivel 5).
+
+        Args:
+            spec: Especificación del workflow (usa max_pasos_paralelos)
+
+        Returns:
+            Diccionario con:
+                - imports: módulos adicionales de la librería estándar
+                - helpers: constantes y clase WorkflowDAG
+        """
+        max_paralelos = max(int(spec.get("max_pasos_paralelos", 4) or 1), 1)
+
+        constants = f"""# Workflow: pasos simultáneos y directorio de resultados por paso (reanudación)
+MAX_PASOS_PARALELOS = {max_paralelos}
+DIRECTORIO_ESTADO = "workflow_estado"
+
+
+"""
+
+        helpers = r'''class WorkflowDAG:
+    """
+    Ejecuta los pasos del workflow como un grafo de dependencias.
+
+    Cada paso arranca en cuanto terminan sus dependencias, con hasta
+    MAX_PASOS_PARALELOS pasos simultáneos. El resultado de cada paso se guarda
+    en DIRECTORIO_ESTADO bajo un hash de su definición, la entrada y los
+    resultados de sus dependencias: repetir una ejecución interrumpida
+    reutiliza los pasos completados y solo ejecuta los pendientes.
+    """
+
+    def __init__(self, pasos, agentes, directorio=DIRECTORIO_ESTADO, max_paralelos=MAX_PASOS_PARALELOS):
+        self.pasos = {paso["nombre"]: paso for paso in pasos}
+        if len(self.pasos) != len(pasos):
+            raise ValueError("Los nombres de los pasos deben ser únicos")
+        for paso in pasos:
+            faltantes = set(paso["depende_de"]) - self.pasos.keys()
+            if faltantes:
+                raise ValueError(
+                    f"El paso {paso['nombre']} depende de pasos inexistentes: {sorted(faltantes)}"
+                )
+        self._validar_aciclico()
+
+        self.agentes = agentes
+        self.directorio = pathlib.Path(directorio)
+        self.max_paralelos = max(max_paralelos, 1)
+        # Pasos finales: ningún otro paso depende de ellos
+        dependencias = {dep for paso in pasos for dep in paso["depende_de"]}
+        self.finales = [nombre for nombre in self.pasos if nombre not in dependencias]
+
+    def _validar_aciclico(self):
+        """Falla si las dependencias forman un ciclo."""
+        pendientes = {nombre: set(paso["depende_de"]) for nombre, paso in self.pasos.items()}
+        completados = set()
+        while pendientes:
+            listos = [nombre for nombre, deps in pendientes.items() if deps <= completados]
+            if not listos:
+                raise ValueError(f"Dependencias circulares entre pasos: {sorted(pendientes)}")
+            for nombre in listos:
+                completados.add(nombre)
+                del pendientes[nombre]
+
+    @staticmethod
+    def construir_prompt(paso, entrada, dependencias):
+        """Combina la tarea del paso, la entrada y los resultados previos."""
+        partes = [f"Tarea: {paso['tarea']}", f"Entrada del workflow: {entrada}"]
+        for nombre, resultado in dependencias.items():
+            partes.append(f"Resultado del paso {nombre}:\n{resultado}")
+        return "\n\n".join(partes)
+
+    def ejecutar_paso(self, paso, entrada, dependencias, informar=False):
+        """Ejecuta un paso o reutiliza su resultado guardado."""
+        clave = hashlib.sha256(
+            json.dumps([paso, entrada, dependencias], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        ruta = self.directorio / f"{clave}.json"
+        if ruta.exists():
+            if informar:
+                print(f"  ♻️  {paso['nombre']} (reutilizado)")
+            return json.loads(ruta.read_text(encoding="utf-8"))["resultado"]
+
+        if informar:
+            print(f"  ▶️  {paso['nombre']}")
+        inicio = time.perf_counter()
+        respuesta = self.agentes[paso["nombre"]].run(self.construir_prompt(paso, entrada, dependencias))
+        resultado = str(respuesta.content or "")
+
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        temporal = ruta.with_suffix(".tmp")
+        temporal.write_text(
+            json.dumps({"paso": paso["nombre"], "resultado": resultado}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(temporal, ruta)
+        if informar:
+            print(f"  ✅ {paso['nombre']} ({time.perf_counter() - inicio:.1f}s)")
+        return resultado
+
+    def ejecutar(self, entrada, informar=False):
+        """
+        Ejecuta todos los pasos respetando sus dependencias.
+
+        Returns:
+            Diccionario nombre del paso -> resultado
+        """
+        resultados = {}
+        pendientes = {nombre: set(paso["depende_de"]) for nombre, paso in self.pasos.items()}
+        en_curso = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_paralelos) as executor:
+            while pendientes or en_curso:
+                listos = [nombre for nombre, deps in pendientes.items() if deps <= resultados.keys()]
+                for nombre in listos:
+                    del pendientes[nombre]
+                    paso = self.pasos[nombre]
+                    dependencias = {dep: resultados[dep] for dep in paso["depende_de"]}
+                    futuro = executor.submit(self.ejecutar_paso, paso, entrada, dependencias, informar)
+                    en_curso[futuro] = nombre
+
+                terminados, _ = concurrent.futures.wait(
+                    en_curso, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for futuro in terminados:
+                    resultados[en_curso.pop(futuro)] = futuro.result()
+        return resultados
+
+    def combinar(self, resultados):
+        """Respuesta final: el resultado de los pasos finales."""
+        if len(self.finales) == 1:
+            return resultados[self.finales[0]]
+        return "\n\n".join(f"## {nombre}\n\n{resultados[nombre]}" for nombre in self.finales)
+
+    def run(self, entrada, **kwargs):
+        """Ejecuta el workflow con la interfaz de Agent.run (respuesta con .content)."""
+        resultados = self.ejecutar(entrada)
+        return types.SimpleNamespace(content=self.combinar(resultados), pasos=resultados)
+
+    def arun(self, entrada, stream=False, **kwargs):
+        """Versión asíncrona de run; con stream=True retorna un iterador de eventos."""
+        if stream:
+            return self._arun_stream(entrada)
+        return asyncio.to_thread(self.run, entrada)
+
+    async def _arun_stream(self, entrada):
+        yield await asyncio.to_thread(self.run, entrada)
+
+    def print_response(self, entrada, stream=True, **kwargs):
+        """Ejecuta el workflow mostrando el progreso de cada paso."""
+        resultados = self.ejecutar(entrada, informar=True)
+        print(f"\n{self.combinar(resultados)}")
+
+    async def aprint_response(self, entrada, stream=True, **kwargs):
+        """Versión asíncrona de print_response."""
+        await asyncio.to_thread(self.print_response, entrada)
+
+
+'''
+
+        return {
+            "imports": ["asyncio", "concurrent.futures", "hashlib", "json", "pathlib", "time", "types"],
+            "helpers": constants + helpers,
+        }
+
+    @staticmethod
+    def _build_runtime_code(
+        spec: Dict, target: str = "agent", sections: Optional[List[Dict]] = None
+    ) -> Dict[str, str]:
+        """
+        Combina las secciones opcionales del código generado.
+
+        Args:
+            spec: Especificación del agente
+            target: Variable del agente generado ("agent", "team" o "workflow")
+            sections: Secciones adicionales propias de una plantilla
+                (diccionarios con "imports" y "helpers")
+
+        Returns:
+            Diccionario con imports de la librería estándar, helpers de módulo
+            (incluye cerrar_agente() si alguna sección abre recursos),
+            tool_hooks, bloque batch y las piezas de ejecución (main_def,
+            run_prefix, print_method, entry)
+        """
+        cache = AgentTemplate._build_tool_cache_code(spec)
+        execution = AgentTemplate._build_execution_code(spec)
+        batch = AgentTemplate._build_batch_code(spec, target)
+
+        sections = sections or []
+
+        modules = {"os", *cache["imports"], *execution["imports"], *batch["imports"]}
+        for section in sections:
+            modules.update(section["imports"])
+        imports = "\n".join(f"import {module}" for module in sorted(modules))
+
+        constants = ""
+        if spec.get("modo_async", False) or spec.get("modo_batch", False):
+            max_concurrencia = max(int(spec.get("max_concurrencia", 4) or 1), 1)
+            constants = (
+                "# Máximo de prompts procesados en paralelo\n"
+                f"MAX_CONCURRENCIA = {max_concurrencia}\n\n\n"
+            )
+
+        # Recursos de módulo que el host de agentes libera al descargar el agente
+        closes = [part["close"] for part in (cache, *sections) if part.get("close")]
+        close_helper = ""
+        if closes:
+            close_lines = "\n".join(f"    {close}" for close in closes)
+            close_helper = f'''def cerrar_agente():
+    """Libera los recursos del módulo (usado por el host de agentes al descargarlo)."""
+{close_lines}
+
+
+'''
+
+        return {
+            "imports": imports,
+            "helpers": cache["helpers"]
+            + "".join(section["helpers"] for section in sections)
+            + close_helper
+            + constants
+            + execution["helpers"]
+            + batch["helpers"],
+            "tool_hooks": cache["tool_hooks"],
+            "batch": batch["block"],
+            "main_def": execution["main_def"],
+            "run_prefix": execution["run_prefix"],
+            "print_method": execution["print_method"],
+            "entry": execution["entry"],
+        }
 
     @staticmethod
     def generate_basic_agent(spec: Dict) -> str:
@@ -213,6 +1373,7 @@ class AgentTemplate:
         tools_imports, tools_init, tools_placeholders = AgentTemplate._build_tools_code(
             herramientas
         )
+        runtime = AgentTemplate._build_runtime_code(spec)
 
         # Construir lista de instrucciones
         if not instrucciones:
@@ -239,7 +1400,7 @@ Rol: {rol}
 Herramientas: {', '.join(herramientas) if herramientas else 'Ninguna'}
 """
 
-import os
+{runtime["imports"]}
 from dotenv import load_dotenv
 from agno.agent import Agent
 {model_import}
@@ -249,34 +1410,154 @@ from agno.agent import Agent
 load_dotenv()
 
 
-def main():
+{runtime["helpers"]}def crear_agente():
+    """Crea el agente (usado por main() y por el host de agentes)."""
+    return Agent(
+        name="{nombre}",
+        role="{rol}",
+        model={model_init},
+        tools={tools_init},{tools_placeholder_comment}{runtime["tool_hooks"]}
+        instructions=[
+        {instrucciones_str}
+        ],
+        markdown=True,
+    )
+
+
+{runtime["main_def"]}
     """Función principal para ejecutar el agente."""
 
     # Crear el agente
-    agent = Agent(
+    agent = crear_agente()
+{runtime["batch"]}
+    # Ejemplo de uso
+    print("\\n🤖 {nombre} está listo\\n")
+    print("Ejemplo de pregunta: {ejemplo}\\n")
+
+    # Ejecutar con el ejemplo
+    {runtime["run_prefix"]}agent.{runtime["print_method"]}("{ejemplo}", stream=True)
+
+    print("\\n")
+    print("Para usar interactivamente, modifica este archivo y usa agent.{runtime["print_method"]}(tu_pregunta)")
+
+
+if __name__ == "__main__":
+    {runtime["entry"]}
+'''
+
+        return code
+
+    @staticmethod
+    def generate_knowledge_agent(spec: Dict) -> str:
+        """
+        Genera un agente con conocimiento (Nivel 2).
+
+        El agente consulta un índice vectorial local construido a partir de
+        los documentos de ``directorio_conocimiento`` mediante la herramienta
+        ``buscar_conocimiento``.
+
+        Args:
+            spec: Especificación del agente (mismos campos que generate_basic_agent
+                más directorio_conocimiento)
+
+        Returns:
+            Código Python completo como string
+        """
+        nombre = spec.get("nombre", "Mi Agente")
+        rol = spec.get("rol", "Asistente general")
+        modelo = spec.get("modelo", "deepseek-chat")
+        herramientas = spec.get("herramientas", [])
+        instrucciones = spec.get("instrucciones", [])
+        ejemplo = spec.get("ejemplo_uso", "¿Cómo puedes ayudarme?")
+        directorio = spec.get("directorio_conocimiento") or "conocimiento"
+
+        # Construir imports de modelo y herramientas
+        model_import = AgentTemplate._get_model_import(modelo)
+        model_init = AgentTemplate._get_model_init(modelo)
+        tools_imports, tools_init, tools_placeholders = AgentTemplate._build_tools_code(
+            herramientas
+        )
+        knowledge = AgentTemplate._build_knowledge_code(spec)
+        runtime = AgentTemplate._build_runtime_code(spec, sections=[knowledge])
+
+        # La búsqueda en el índice local va siempre primero
+        tools_init = "[buscar_conocimiento" + (", " + tools_init[1:] if tools_init != "[]" else "]")
+
+        # Instrucciones
+        if not instrucciones:
+            instrucciones = [
+                f"Eres un {rol}",
+                "Busca en la base de conocimiento antes de responder",
+                "Cita la fuente de la información",
+            ]
+
+        instrucciones_str = ",\n        ".join(
+            [f'"{instr}"' for instr in instrucciones]
+        )
+
+        tools_placeholder_comment = ""
+        if tools_placeholders:
+            placeholder_lines = "\n        ".join(tools_placeholders)
+            tools_placeholder_comment = f"\n        {placeholder_lines}"
+
+        # Generar código
+        code = f'''"""
+{nombre} - Agente AI con base de conocimiento local.
+
+Rol: {rol}
+Herramientas: {', '.join(herramientas) if herramientas else 'Ninguna'}
+Conocimiento: Índice vectorial local (documentos en {directorio}/)
+"""
+
+{runtime["imports"]}
+import numpy as np
+from dotenv import load_dotenv
+from agno.agent import Agent
+{model_import}
+{tools_imports}
+
+# Cargar variables de entorno
+load_dotenv()
+
+
+{runtime["helpers"]}def crear_agente():
+    """Crea el agente con conocimiento (usado por main() y por el host de agentes)."""
+
+    # Ingesta incremental: solo procesa documentos nuevos
+    indice_conocimiento.ingestar_directorio()
+
+    return Agent(
         name="{nombre}",
         role="{rol}",
         model={model_init},
-        tools={tools_init},{tools_placeholder_comment}
+        tools={tools_init},{tools_placeholder_comment}{runtime["tool_hooks"]}
         instructions=[
         {instrucciones_str}
         ],
         markdown=True,
     )
 
+
+{runtime["main_def"]}
+    """Función principal para ejecutar el agente."""
+
+    # Crear el agente
+    agent = crear_agente()
+{runtime["batch"]}
     # Ejemplo de uso
     print("\\n🤖 {nombre} está listo\\n")
+    print(f"Fragmentos indexados: {{indice_conocimiento.total}}")
     print("Ejemplo de pregunta: {ejemplo}\\n")
 
     # Ejecutar con el ejemplo
-    agent.print_response("{ejemplo}", stream=True)
+    {runtime["run_prefix"]}agent.{runtime["print_method"]}("{ejemplo}", stream=True)
 
     print("\\n")
-    print("Para usar interactivamente, modifica este archivo y usa agent.print_response(tu_pregunta)")
+    print("Agrega documentos .txt o .md en {directorio}/ y se indexarán al iniciar")
 
 
 if __name__ == "__main__":
-    main()
+    {runtime["entry"]}
 '''
 
         return code
@@ -305,6 +1586,11 @@ if __name__ == "__main__":
         tools_imports, tools_init, tools_placeholders = AgentTemplate._build_tools_code(
             herramientas
         )
+        memory = AgentTemplate._build_memory_code(spec)
+        runtime = AgentTemplate._build_runtime_code(spec, sections=[memory])
+        agno_imports = "\n".join(
+            line for line in (model_import, memory["agno_imports"]) if line
+        )
 
         # Instrucciones
         if not instrucciones:
@@ -332,44 +1618,48 @@ Herramientas: {', '.join(herramientas) if herramientas else 'Ninguna'}
 Memoria: Activada (SQLite)
 """
 
-import os
+{runtime["imports"]}
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.db.sqlite import SqliteDb
-{model_import}
+{agno_imports}
 {tools_imports}
 
 # Cargar variables de entorno
 load_dotenv()
 
 
-def main():
-    """Función principal para ejecutar el agente con memoria."""
+{runtime["helpers"]}def crear_agente():
+    """Crea el agente con memoria (usado por main() y por el host de agentes)."""
 
     # Configurar storage
     db = SqliteDb(db_file="agents_memory.sqlite")
 
-    # Crear el agente
-    agent = Agent(
+    return Agent(
         name="{nombre}",
         role="{rol}",
         model={model_init},
-        tools={tools_init},{tools_placeholder_comment}
+        tools={tools_init},{tools_placeholder_comment}{runtime["tool_hooks"]}
         instructions=[
         {instrucciones_str}
         ],
         db=db,
-        markdown=True,
-        enable_user_memories=True,
-        enable_session_summary=True,
+        markdown=True,{memory["agent_kwargs"]}
     )
 
+
+{runtime["main_def"]}
+    """Función principal para ejecutar el agente con memoria."""
+
+    # Crear el agente
+    agent = crear_agente()
+{runtime["batch"]}
     # Ejemplo de uso
     print("\\n🤖 {nombre} está listo (con memoria)\\n")
     print("Ejemplo de pregunta: {ejemplo}\\n")
 
     # Ejecutar con el ejemplo
-    agent.print_response("{ejemplo}", stream=True)
+    {runtime["run_prefix"]}agent.{runtime["print_method"]}("{ejemplo}", stream=True)
 
     print("\\n")
     print("💾 Las conversaciones se guardan en: agents_memory.sqlite")
@@ -377,7 +1667,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    {runtime["entry"]}
 '''
 
         return code
@@ -395,47 +1685,57 @@ if __name__ == "__main__":
 
         model_import = AgentTemplate._get_model_import(modelo)
         model_init = AgentTemplate._get_model_init(modelo)
+        runtime = AgentTemplate._build_runtime_code(spec, target="team")
 
         if not miembros:
-            miembros = [
-                {
-                    "nombre": "Researcher",
-                    "rol": "Buscar información",
-                    "herramientas": ["duckduckgo"],
-                },
-                {
-                    "nombre": "Analyzer",
-                    "rol": "Analizar datos",
-                    "herramientas": ["reasoning"],
-                },
-                {
-                    "nombre": "Writer",
-                    "rol": "Escribir respuestas",
-                    "herramientas": [],
-                },
-            ]
+            miembros = AgentTemplate.DEFAULT_TEAM_MEMBERS
+
+        compacto = spec.get("equipo_compacto", False)
 
         extra_imports: set[str] = set()
+        model_imports: set[str] = {model_import}
+        # Instancias compartidas: código de inicialización -> variable
+        shared_models: Dict[str, str] = {model_init: "modelo"}
+        shared_tools: Dict[str, str] = {}
         member_blocks: List[str] = []
         member_vars: List[str] = []
         member_info_pairs: List[Tuple[str, str]] = []
+        member_rows: List[str] = []
+        compact_placeholders: List[str] = []
 
         for idx, member in enumerate(miembros):
             member_name = member.get("nombre", f"Member{idx + 1}")
             member_role = member.get("rol", "Miembro del equipo")
-            member_tools = member.get("herramientas", [])
-
-            imports_line, tools_init, placeholders = AgentTemplate._build_tools_code(
-                member_tools
+            member_model_var, tool_vars, placeholders = AgentTemplate._share_instances(
+                member, shared_models, shared_tools, model_imports, extra_imports
             )
 
-            if imports_line:
-                extra_imports.update(line for line in imports_line.split("\n") if line)
+            member_instructions = member.get("instrucciones", [])
+            member_info_pairs.append((member_name, member_role))
+
+            if compacto:
+                # Una fila por miembro: [nombre, rol, modelo, herramientas, instrucciones]
+                member_rows.append(
+                    json.dumps(
+                        [member_name, member_role, member_model_var, tool_vars, member_instructions],
+                        ensure_ascii=False,
+                    )
+                )
+                for placeholder in placeholders:
+                    if placeholder not in compact_placeholders:
+                        compact_placeholders.append(placeholder)
+                continue
 
             placeholder_comment = ""
             if placeholders:
                 placeholder_comment = "\n        " + "\n        ".join(placeholders)
 
+            tools_code = "[" + ", ".join(tool_vars) + "]"
+            instructions_line = ""
+            if member_instructions:
+                instructions_line = (
+                    f"\n        instructions={json.dumps(member_instructions, ensure_ascii=False)},"
+                )
             member_var = f"miembro_{idx}"
             member_vars.append(member_var)
             member_blocks.append(
@@ -444,26 +1744,30 @@ if __name__ == "__main__":
     {member_var} = Agent(
         name="{member_name}",
         role="{member_role}",
-        model={model_init},
-        tools={tools_init},{placeholder_comment}
+        model={member_model_var},
+        tools={tools_code},{placeholder_comment}{runtime["tool_hooks"]}{instructions_line}
     )"""
             )
-            member_info_pairs.append((member_name, member_role))
 
-        if not member_blocks:
+        if not member_blocks and not member_rows:
             member_blocks.append(
                 """
     # Miembro: Miembro Defecto
     miembro_0 = Agent(
         name="Miembro Defecto",
         role="Rol indefinido",
-        model={model_init},
+        model=modelo,
         tools=[],
     )"""
             )
             member_vars = ["miembro_0"]
             member_info_pairs = [("Miembro Defecto", "Rol indefinido")]
 
+        shared_lines = [f"    {var} = {init}" for init, var in shared_models.items()]
+        shared_lines += [f"    {var} = {init}" for init, var in shared_tools.items()]
+        shared_lines += [f"    {placeholder}" for placeholder in compact_placeholders]
+        shared_code = "\n".join(shared_lines)
+
         instructions_list = instrucciones or [
             "Colaboren efectivamente",
             "Dividan el trabajo según especialidades",
@@ -471,15 +1775,47 @@ if __name__ == "__main__":
         ]
         instructions_code = ",\n        ".join(f'"{item}"' for item in instructions_list)
 
+        model_imports_code = "\n".join(sorted(model_imports))
         imports_code = "\n".join(sorted(extra_imports))
-        members_code = "\n".join(member_blocks)
-        member_vars_code = ", ".join(member_vars)
-        member_info_code = ",\n        ".join(
-            [
-                f'("{name.replace("\"", "\\\"")}", "{role.replace("\"", "\\\"")}")'
-                for name, role in member_info_pairs
-            ]
+
+        if compacto:
+            members_table = (
+                "# Miembros del equipo: [nombre, rol, modelo, herramientas, instrucciones]\n"
+                "MIEMBROS = [\n    " + ",\n    ".join(member_rows) + ",\n]\n\n\n"
+            )
+            models_map = ", ".join(f'"{var}": {var}' for var in shared_models.values())
+            tools_map = ", ".join(f'"{var}": {var}' for var in shared_tools.values())
+            compact_hooks = runtime["tool_hooks"].replace("\n        ", "\n            ")
+            members_section = f"""    # Crear miembros del equipo desde la tabla MIEMBROS
+    modelos = {{{models_map}}}
+    herramientas = {{{tools_map}}}
+    miembros = [
+        Agent(
+            name=nombre_miembro,
+            role=rol_miembro,
+            model=modelos[modelo_miembro],
+            tools=[herramientas[herramienta] for herramienta in herramientas_miembro],{compact_hooks}
+            instructions=instrucciones_miembro or None,
         )
+        for nombre_miembro, rol_miembro, modelo_miembro, herramientas_miembro, instrucciones_miembro in MIEMBROS
+    ]"""
+            member_info_section = "    member_info = [(fila[0], fila[1]) for fila in MIEMBROS]"
+            team_members_code = "miembros"
+        else:
+            members_table = ""
+            members_code = "\n".join(member_blocks)
+            member_info_code = ",\n        ".join(
+                [
+                    f'("{name.replace("\"", "\\\"")}", "{role.replace("\"", "\\\"")}")'
+                    for name, role in member_info_pairs
+                ]
+            )
+            members_section = f"""    # Crear miembros del equipo
+{members_code}"""
+            member_info_section = f"""    member_info = [
+        {member_info_code}
+    ]"""
+            team_members_code = "[" + ", ".join(member_vars) + "]"
 
         code = f'''"""
 {nombre} - Equipo de Agentes AI colaborativos.
@@ -488,37 +1824,44 @@ Rol: {rol}
 Miembros: {len(member_info_pairs)}
 """
 
-import os
+{runtime["imports"]}
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.team import Team
-{model_import}
+{model_imports_code}
 {imports_code}
 
 # Cargar variables de entorno
 load_dotenv()
 
 
-def main():
-    """Función principal para ejecutar el equipo de agentes."""
+{members_table}{runtime["helpers"]}def crear_agente():
+    """Crea el equipo (usado por main() y por el host de agentes)."""
 
-    # Crear miembros del equipo
-{members_code}
+    # Modelo y herramientas compartidos por todos los miembros
+{shared_code}
 
-    member_info = [
-        {member_info_code}
-    ]
+{members_section}
 
-    team = Team(
+    return Team(
         name="{nombre}",
-        members=[{member_vars_code}],
-        model={model_init},
+        members={team_members_code},
+        model=modelo,
         instructions=[
         {instructions_code}
         ],
         markdown=True,
     )
 
+
+{runtime["main_def"]}
+    """Función principal para ejecutar el equipo de agentes."""
+
+    # Crear el equipo
+    team = crear_agente()
+
+{member_info_section}
+{runtime["batch"]}
     print("\\n🤖 {nombre} está listo\\n")
     print("Miembros del equipo:")
     for display_name, display_role in member_info:
@@ -526,14 +1869,264 @@ def main():
 
     print("\\nEjemplo de tarea: {ejemplo}\\n")
 
-    team.print_response("{ejemplo}", stream=True)
+    {runtime["run_prefix"]}team.{runtime["print_method"]}("{ejemplo}", stream=True)
 
     print("\\n")
     print("El equipo colabora automáticamente para completar tareas complejas.")
 
 
 if __name__ == "__main__":
-    main()
+    {runtime["entry"]}
+'''
+
+        return code
+
+    @staticmethod
+    def _workflow_steps(spec: Dict) -> List[Dict]:
+        """
+        Normaliza los pasos del workflow completando los campos opcionales.
+
+        Args:
+            spec: Especificación del workflow (usa pasos_workflow)
+
+        Returns:
+            Lista de pasos con nombre, rol, tarea, depende_de, herramientas y modelo
+        """
+        pasos = []
+        for idx, paso in enumerate(spec.get("pasos_workflow") or AgentTemplate.DEFAULT_WORKFLOW_STEPS):
+            rol = paso.get("rol", "Ejecutar el paso")
+            pasos.append(
+                {
+                    "nombre": paso.get("nombre", f"paso_{idx + 1}"),
+                    "rol": rol,
+                    "tarea": paso.get("tarea") or rol,
+                    "depende_de": list(paso.get("depende_de", [])),
+                    "herramientas": paso.get("herramientas", []),
+                    "modelo": paso.get("modelo"),
+                }
+            )
+        return pasos
+
+    @staticmethod
+    def generate_workflow(spec: Dict) -> str:
+        """
+        Genera un workflow de agentes (Nivel 5).
+
+        Cada paso es un agente; los pasos independientes se ejecutan en
+        paralelo y sus resultados se guardan para reanudar ejecuciones.
+
+        Args:
+            spec: Especificación del workflow con campos de generate_basic_agent más:
+                - pasos_workflow: List[Dict] con nombre, rol, tarea, depende_de,
+                  herramientas y modelo opcional
+                - max_pasos_paralelos: int
+
+        Returns:
+            Código Python completo como string
+        """
+        nombre = spec.get("nombre", "Mi Workflow")
+        rol = spec.get("rol", "Workflow de agentes")
+        modelo = spec.get("modelo", "deepseek-chat")
+        instrucciones = spec.get("instrucciones", [])
+        ejemplo = spec.get("ejemplo_uso", "¿Qué puede hacer este workflow?")
+
+        model_import = AgentTemplate._get_model_import(modelo)
+        model_init = AgentTemplate._get_model_init(modelo)
+        workflow = AgentTemplate._build_workflow_code(spec)
+        runtime = AgentTemplate._build_runtime_code(spec, target="workflow", sections=[workflow])
+
+        extra_imports: set[str] = set()
+        model_imports: set[str] = {model_import}
+        # Instancias compartidas: código de inicialización -> variable
+        shared_models: Dict[str, str] = {model_init: "modelo"}
+        shared_tools: Dict[str, str] = {}
+        step_rows: List[str] = []
+        placeholders: List[str] = []
+
+        pasos = AgentTemplate._workflow_steps(spec)
+        for paso in pasos:
+            model_var, tool_vars, step_placeholders = AgentTemplate._share_instances(
+                paso, shared_models, shared_tools, model_imports, extra_imports
+            )
+            step_rows.append(
+                json.dumps({**paso, "modelo": model_var, "herramientas": tool_vars}, ensure_ascii=False)
+            )
+            for placeholder in step_placeholders:
+                if placeholder not in placeholders:
+                    placeholders.append(placeholder)
+
+        shared_lines = [f"    {var} = {init}" for init, var in shared_models.items()]
+        shared_lines += [f"    {var} = {init}" for init, var in shared_tools.items()]
+        shared_lines += [f"    {placeholder}" for placeholder in placeholders]
+        shared_code = "\n".join(shared_lines)
+
+        instructions_list = instrucciones or [
+            "Completa solo la tarea de tu paso",
+            "Apóyate en los resultados de los pasos previos",
+        ]
+        instructions_code = ",\n            ".join(f'"{item}"' for item in instructions_list)
+
+        model_imports_code = "\n".join(sorted(model_imports))
+        imports_code = "\n".join(sorted(extra_imports))
+        steps_table = "[\n    " + ",\n    ".join(step_rows) + ",\n]"
+        models_map = ", ".join(f'"{var}": {var}' for var in shared_models.values())
+        tools_map = ", ".join(f'"{var}": {var}' for var in shared_tools.values())
+        step_hooks = runtime["tool_hooks"].replace("\n        ", "\n            ")
+
+        code = f'''"""
+{nombre} - Workflow de agentes AI.
+
+Rol: {rol}
+Pasos: {len(pasos)}
+"""
+
+{runtime["imports"]}
+from dotenv import load_dotenv
+from agno.agent import Agent
+{model_imports_code}
+{imports_code}
+
+# Cargar variables de entorno
+load_dotenv()
+
+
+# Pasos del workflow: nombre, rol, tarea, dependencias, modelo y herramientas
+PASOS = {steps_table}
+
+
+{runtime["helpers"]}def crear_agente():
+    """Crea el workflow (usado por main() y por el host de agentes)."""
+
+    # Modelo y herramientas compartidos por todos los pasos
+{shared_code}
+
+    # Un agente por paso desde la tabla PASOS
+    modelos = {{{models_map}}}
+    herramientas = {{{tools_map}}}
+    agentes = {{
+        paso["nombre"]: Agent(
+            name=paso["nombre"],
+            role=paso["rol"],
+            model=modelos[paso["modelo"]],
+            tools=[herramientas[herramienta] for herramienta in paso["herramientas"]],{step_hooks}
+            instructions=[
+            {instructions_code}
+            ],
+            markdown=True,
+        )
+        for paso in PASOS
+    }}
+
+    return WorkflowDAG(PASOS, agentes)
+
+
+{runtime["main_def"]}
+    """Función principal para ejecutar el workflow."""
+
+    # Crear el workflow
+    workflow = crear_agente()
+{runtime["batch"]}
+    print("\\n🤖 {nombre} está listo\\n")
+    print("Pasos del workflow:")
+    for paso in PASOS:
+        dependencias = ", ".join(paso["depende_de"]) or "inicio"
+        print(f"  - {{paso['nombre']}} (después de: {{dependencias}})")
+
+    print("\\nEjemplo de tarea: {ejemplo}\\n")
+
+    {runtime["run_prefix"]}workflow.{runtime["print_method"]}("{ejemplo}", stream=True)
+
+    print("\\n")
+    print("Los pasos completados se guardan en workflow_estado/ y se reutilizan al repetir la tarea.")
+
+
+if __name__ == "__main__":
+    {runtime["entry"]}
 '''
 
         return code
+
+    @staticmethod
+    def get_agent_kind(spec: Dict) -> str:
+        """
+        Determina el tipo de agente a generar según la especificación.
+
+        Args:
+            spec: Especificación del agente
+
+        Returns:
+            "team", "workflow", "memory", "knowledge" o "basic"
+        """
+        if spec.get("es_equipo", False):
+            return "team"
+        if spec.get("pasos_workflow") or spec.get("nivel", 1) == 5:
+            return "workflow"
+        if spec.get("necesita_memoria", False) or spec.get("nivel", 1) >= 3:
+            return "memory"
+        if spec.get("nivel", 1) == 2:
+            return "knowledge"
+        return "basic"
+
+    @staticmethod
+    def generate_agent_spec(spec: Dict) -> str:
+        """
+        Genera la especificación compacta (JSON) de un agente.
+
+        En lugar de código Python, serializa el plan junto con el modelo y las
+        herramientas ya resueltos. El runtime compartido
+        (``src.infrastructure.runtime.agent_runtime``) construye el agente a
+        partir de este archivo.
+
+        Args:
+            spec: Especificación del agente (mismos campos que generate_basic_agent)
+
+        Returns:
+            JSON compacto como string
+        """
+        kind = AgentTemplate.get_agent_kind(spec)
+        model_class, model_id = AgentTemplate._resolve_model(spec.get("modelo", "deepseek-chat"))
+        tool_ids, _ = AgentTemplate._resolve_tool_ids(spec.get("herramientas", []))
+
+        resolved: Dict[str, Any] = {
+            "spec_version": AgentTemplate.SPEC_VERSION,
+            "tipo": kind,
+            "plan": spec,
+            "modelo": {"clase": model_class, "id": model_id},
+            "herramientas": tool_ids,
+        }
+
+        if kind == "team":
+            miembros = []
+            for idx, member in enumerate(
+                spec.get("miembros_equipo") or AgentTemplate.DEFAULT_TEAM_MEMBERS
+            ):
+                member_tool_ids, _ = AgentTemplate._resolve_tool_ids(
+                    member.get("herramientas", [])
+                )
+                member_model = None
+                if member.get("modelo"):
+                    member_class, member_id = AgentTemplate._resolve_model(member["modelo"])
+                    member_model = {"clase": member_class, "id": member_id}
+                miembros.append(
+                    {
+                        "nombre": member.get("nombre", f"Member{idx + 1}"),
+                        "rol": member.get("rol", "Miembro del equipo"),
+                        "modelo": member_model,
+                        "herramientas": member_tool_ids,
+                        "instrucciones": member.get("instrucciones", []),
+                    }
+                )
+            resolved["miembros"] = miembros
+
+        if kind == "workflow":
+            pasos = []
+            for paso in AgentTemplate._workflow_steps(spec):
+                paso_tool_ids, _ = AgentTemplate._resolve_tool_ids(paso["herramientas"])
+                paso_model = None
+                if paso["modelo"]:
+                    paso_class, paso_id = AgentTemplate._resolve_model(paso["modelo"])
+                    paso_model = {"clase": paso_class, "id": paso_id}
+                pasos.append({**paso, "modelo": paso_model, "herramientas": paso_tool_ids})
+            resolved["pasos"] = pasos
+
+        return json.dumps(resolved, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,55 @@
+"""Fixtures compartidas por los tests de las rutas de la API."""
+
+import json
+from pathlib import Path
+from typing import Callable, List
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+
+def _parse_sse(response) -> List[dict]:
+    """Retorna los payloads JSON de las líneas ``data:`` de una respuesta SSE."""
+    return [
+        json.loads(line[len("data: "):])
+        for line in response.text.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.fixture
+def sse_events() -> Callable[..., List[dict]]:
+    """Parser de los eventos de una respuesta SSE."""
+    return _parse_sse
+
+
+@pytest.fixture
+def local_storage(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Usa el almacenamiento local de agentes en un directorio temporal."""
+    agents_dir = tmp_path / "agents"
+    monkeypatch.setenv("AGENT_STORAGE", "local")
+    monkeypatch.setenv("GENERATED_AGENTS_DIR", str(agents_dir))
+    return agents_dir
+
+
+@pytest.fixture
+def make_client():
+    """
+    Fábrica de TestClient para un router montado en ``prefix``.
+
+    Los clientes creados se cierran al terminar el test.
+    """
+    clients: List[TestClient] = []
+
+    def factory(router: APIRouter, prefix: str) -> TestClient:
+        app = FastAPI()
+        app.include_router(router, prefix=prefix)
+        client = TestClient(app)
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield factory
+    for client in reversed(clients):
+        client.__exit__(None, None, None)
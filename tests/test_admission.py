@@ -0,0 +1,153 @@
+"""Tests unitarios para el control de admisión."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from src.infrastructure.api.admission import (
+    AdmissionControlMiddleware,
+    AdmissionRejected,
+    RouteLimit,
+)
+
+
+def _app(release: asyncio.Event):
+    async def app(scope, receive, send):
+        if scope["path"] == "/slow":
+            await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    return app
+
+
+def test_limits_concurrency_queues_and_rejects() -> None:
+    async def scenario():
+        release = asyncio.Event()
+        limit = RouteLimit("llm", r"/slow", max_concurrency=1, max_queue=1, queue_timeout=5)
+        app = AdmissionControlMiddleware(_app(release), [limit])
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/slow"))
+            second = asyncio.create_task(client.post("/slow"))
+            await asyncio.sleep(0.05)
+            assert (limit.active, limit.waiting) == (1, 1)
+
+            rejected = await client.post("/slow")
+            # Las rutas fuera del grupo y los GET no se limitan
+            cheap = await client.get("/slow/other")
+            health = await client.post("/health")
+
+            release.set()
+            responses = await asyncio.gather(first, second)
+        return limit, rejected, cheap, health, responses
+
+    limit, rejected, cheap, health, responses = asyncio.run(scenario())
+
+    assert rejected.status_code == 429
+    assert int(rejected.headers["retry-after"]) >= 1
+    assert cheap.status_code == 200
+    assert health.status_code == 200
+    assert [response.status_code for response in responses] == [200, 200]
+    assert limit.stats()["admitted"] == 2
+    assert limit.stats()["rejected"] == 1
+    assert limit.active == 0
+
+
+def test_queue_timeout_rejects_waiting_request() -> None:
+    async def scenario():
+        release = asyncio.Event()
+        limit = RouteLimit("llm", r"/slow", max_concurrency=1, max_queue=4, queue_timeout=0.05)
+        app = AdmissionControlMiddleware(_app(release), [limit])
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.post("/slow"))
+            await asyncio.sleep(0.01)
+            timed_out = await client.post("/slow")
+            release.set()
+            await first
+        return limit, timed_out
+
+    limit, timed_out = asyncio.run(scenario())
+
+    assert timed_out.status_code == 429
+    assert limit.waiting == 0
+
+
+def test_websocket_connections_count_and_are_rejected() -> None:
+    async def scenario(extensions):
+        release = asyncio.Event()
+        limit = RouteLimit("llm", r"/ws", max_concurrency=1, max_queue=0)
+
+        async def ws_app(scope, receive, send):
+            await receive()
+            await send({"type": "websocket.accept"})
+            await release.wait()
+
+        app = AdmissionControlMiddleware(ws_app, [limit])
+        scope = {"type": "websocket", "path": "/ws", "extensions": extensions}
+
+        async def receive():
+            return {"type": "websocket.connect"}
+
+        first_sent, rejected_sent = [], []
+
+        async def first_send(message):
+            first_sent.append(message)
+
+        async def rejected_send(message):
+            rejected_sent.append(message)
+
+        first = asyncio.create_task(app(scope, receive, first_send))
+        await asyncio.sleep(0.01)
+        active = limit.active
+        await app(scope, receive, rejected_send)
+        release.set()
+        await first
+        return limit, active, first_sent, rejected_sent
+
+    limit, active, first_sent, closed = asyncio.run(scenario({}))
+
+    assert active == 1
+    assert first_sent == [{"type": "websocket.accept"}]
+    assert closed == [{"type": "websocket.close", "code": 1013}]
+    assert (limit.active, limit.stats()["rejected"]) == (0, 1)
+
+    _, _, _, responded = asyncio.run(scenario({"websocket.http.response": {}}))
+
+    assert responded[0]["type"] == "websocket.http.response.start"
+    assert responded[0]["status"] == 429
+    assert dict(responded[0]["headers"])[b"retry-after"] == b"1"
+    assert responded[1]["type"] == "websocket.http.response.body"
+
+
+def test_default_llm_group_excludes_session_websocket(monkeypatch: pytest.MonkeyPatch) -> None:
+    from src.infrastructure.api import admission
+
+    monkeypatch.setattr(admission, "_route_limits", [])
+    llm = admission.default_route_limits()[0]
+
+    assert llm.matches("POST", "/api/meta-agent/plan")
+    assert llm.matches("POST", "/api/meta-agent/sessions/abc/messages")
+    assert not llm.matches("POST", "/api/meta-agent/planX")
+    assert not llm.matches("WEBSOCKET", "/api/meta-agent/sessions/ws")
+    assert admission.route_limit("llm") is llm
+
+
+def test_hold_takes_a_slot_or_rejects() -> None:
+    limit = RouteLimit("llm", r"/", max_concurrency=1, max_queue=0)
+
+    async def scenario():
+        async with limit.hold():
+            active = limit.active
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with limit.hold():
+                    pass
+        return active, rejected.value
+
+    active, rejected = asyncio.run(scenario())
+
+    assert active == 1
+    assert rejected.retry_after >= 1
+    assert (limit.active, limit.stats()["rejected"]) == (0, 1)
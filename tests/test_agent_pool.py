@@ -0,0 +1,150 @@
+"""Tests unitarios para `AgentPool`."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.runtime import agent_runtime
+from src.infrastructure.runtime.agent_pool import AgentPool
+
+
+def _write_agent(directory: Path, name: str, value: str) -> Path:
+    path = directory / f"{name}_agent.py"
+    path.write_text(
+        f"def crear_agente():\n    return {{'name': {name!r}, 'value': {value!r}}}\n",
+        encoding="utf-8",
+    )
+    return path
+
+
+class TestAgentPool:
+    def test_discover_lists_python_and_spec_agents(self, tmp_path: Path) -> None:
+        _write_agent(tmp_path, "uno", "a")
+        (tmp_path / "dos_agent.json").write_text("{}", encoding="utf-8")
+        (tmp_path / "otro.py").write_text("", encoding="utf-8")
+
+        agents = AgentPool(tmp_path).discover()
+
+        assert sorted(agents) == ["dos", "uno"]
+
+    def test_get_reuses_instance_and_evicts_lru(self, tmp_path: Path) -> None:
+        for name in ("a", "b", "c"):
+            _write_agent(tmp_path, name, name)
+        pool = AgentPool(tmp_path, max_size=2)
+
+        first = pool.get("a")
+        assert pool.get("a") is first
+        pool.get("b")
+        pool.get("c")
+
+        assert pool.loaded() == ["b", "c"]
+        assert pool.stats()["hits"] == 1
+        assert pool.stats()["evictions"] == 1
+
+    def test_get_reloads_when_file_changes(self, tmp_path: Path) -> None:
+        path = _write_agent(tmp_path, "a", "v1")
+        pool = AgentPool(tmp_path)
+        assert pool.get("a")["value"] == "v1"
+
+        _write_agent(tmp_path, "a", "v2")
+        stat = path.stat()
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+        assert pool.get("a")["value"] == "v2"
+
+    def test_get_unknown_agent_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(KeyError):
+            AgentPool(tmp_path).get("inexistente")
+
+    def test_get_without_factory_raises(self, tmp_path: Path) -> None:
+        (tmp_path / "viejo_agent.py").write_text("x = 1\n", encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            AgentPool(tmp_path).get("viejo")
+
+    def test_evicted_and_reloaded_agents_are_closed(self, tmp_path: Path) -> None:
+        closed = tmp_path / "cerrados.txt"
+        for name in ("a", "b"):
+            path = _write_agent(tmp_path, name, "v1")
+            with open(path, "a", encoding="utf-8") as archivo:
+                archivo.write(
+                    "\n\ndef cerrar_agente():\n"
+                    f"    with open({str(closed)!r}, 'a') as log:\n"
+                    f"        log.write({name!r})\n"
+                )
+        pool = AgentPool(tmp_path, max_size=1)
+
+        pool.get("a")
+        pool.get("b")
+        assert closed.read_text() == "a"
+
+        stat = (tmp_path / "b_agent.py").stat()
+        os.utime(tmp_path / "b_agent.py", (stat.st_atime, stat.st_mtime + 10))
+        pool.get("b")
+        assert closed.read_text() == "ab"
+
+    def test_spec_agents_release_runtime_resources(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        closed = []
+
+        def fake_load_agent(path, closers):
+            closers.append(lambda: closed.append(path.name))
+            return object()
+
+        monkeypatch.setattr(agent_runtime, "load_agent", fake_load_agent)
+        for name in ("a", "b"):
+            (tmp_path / f"{name}_agent.json").write_text("{}", encoding="utf-8")
+        pool = AgentPool(tmp_path, max_size=1)
+
+        pool.get("a")
+        pool.get("b")
+
+        assert closed == ["a_agent.json"]
+
+    def test_running_agents_are_closed_after_release(self, tmp_path: Path) -> None:
+        closed = []
+        pool = AgentPool(tmp_path, max_size=1)
+        pool._load = lambda path: ({"name": path.name}, lambda: closed.append(path.name))
+        for name in ("a", "b"):
+            _write_agent(tmp_path, name, "v1")
+
+        running = pool.acquire("a")
+        pool.get("b")
+
+        assert pool.loaded() == ["b"]
+        assert closed == []
+        pool.release(running)
+        assert closed == ["a_agent.py"]
+
+    def test_concurrent_misses_load_once(self, tmp_path: Path) -> None:
+        import threading
+        import time
+
+        loads = []
+        closed = []
+
+        def slow_load(path):
+            loads.append(path.name)
+            time.sleep(0.05)
+            return object(), lambda: closed.append(path.name)
+
+        _write_agent(tmp_path, "a", "v1")
+        pool = AgentPool(tmp_path)
+        pool._load = slow_load
+        agents = []
+        threads = [
+            threading.Thread(target=lambda: agents.append(pool.acquire("a"))) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for agent in agents:
+            pool.release(agent)
+
+        assert loads == ["a_agent.py"]
+        assert len({id(agent) for agent in agents}) == 1
+        assert closed == []
+        assert (pool.stats()["misses"], pool.stats()["hits"]) == (1, 3)
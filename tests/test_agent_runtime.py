@@ -0,0 +1,217 @@
+"""Tests unitarios para el runtime de agentes en formato spec."""
+
+import atexit
+import json
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.runtime import agent_runtime
+from src.infrastructure.templates.agent_templates import AgentTemplate
+
+
+class FakeComponent:
+    """Stub genérico para clases de Agno (modelos, herramientas, Agent, Team)."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+
+@pytest.fixture
+def fake_agno(monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Sustituye los imports diferidos de Agno por clases stub."""
+    created: dict = {}
+
+    def fake_import_attr(module_name: str, attr: str):
+        if attr not in created:
+            created[attr] = type(attr, (FakeComponent,), {})
+        return created[attr]
+
+    monkeypatch.setattr(agent_runtime, "_import_attr", fake_import_attr)
+    return created
+
+
+def _write_spec(tmp_path: Path, **plan) -> Path:
+    path = tmp_path / "demo_agent.json"
+    path.write_text(AgentTemplate.generate_agent_spec(plan), encoding="utf-8")
+    return path
+
+
+class TestAgentSpec:
+    def test_spec_resolves_model_and_tools(self) -> None:
+        spec = json.loads(
+            AgentTemplate.generate_agent_spec(
+                {"nombre": "Demo", "modelo": "gpt-4o", "herramientas": ["web", "stock", "foo"]}
+            )
+        )
+
+        assert spec["spec_version"] == AgentTemplate.SPEC_VERSION
+        assert spec["tipo"] == "basic"
+        assert spec["modelo"] == {"clase": "OpenAIChat", "id": "gpt-4o"}
+        assert spec["herramientas"] == ["duckduckgo", "yfinance", "serper"]
+
+    def test_load_spec_rejects_unknown_version(self, tmp_path: Path) -> None:
+        path = tmp_path / "old_agent.json"
+        path.write_text(json.dumps({"spec_version": 999}), encoding="utf-8")
+
+        with pytest.raises(ValueError):
+            agent_runtime.load_spec(path)
+
+
+class TestBuildAgent:
+    def test_build_basic_agent(self, tmp_path: Path, fake_agno: dict) -> None:
+        path = _write_spec(tmp_path, nombre="Demo", rol="Investigador", herramientas=["web"])
+
+        agent = agent_runtime.load_agent(path)
+
+        assert isinstance(agent, fake_agno["Agent"])
+        assert agent.kwargs["name"] == "Demo"
+        assert agent.kwargs["model"].kwargs == {"id": "deepseek-chat"}
+        assert [type(t).__name__ for t in agent.kwargs["tools"]] == [
+            "DuckDuckGoTools",
+            "SerperTools",
+        ]
+        assert agent.kwargs["instructions"][0] == "Eres un Investigador"
+
+    def test_build_team_shares_model_and_tools(
+        self, tmp_path: Path, fake_agno: dict
+    ) -> None:
+        path = _write_spec(
+            tmp_path,
+            nombre="Equipo",
+            es_equipo=True,
+            miembros_equipo=[
+                {"nombre": "A", "rol": "a", "herramientas": ["reasoning"]},
+                {"nombre": "B", "rol": "b", "herramientas": ["reasoning"], "modelo": "gpt-4o"},
+            ],
+        )
+
+        team = agent_runtime.load_agent(path)
+        first, second = team.kwargs["members"]
+
+        assert isinstance(team, fake_agno["Team"])
+        assert first.kwargs["model"] is team.kwargs["model"]
+        assert second.kwargs["model"].kwargs == {"id": "gpt-4o"}
+        assert first.kwargs["tools"][0] is second.kwargs["tools"][0]
+
+    def test_build_knowledge_agent_indexes_documents(
+        self, tmp_path: Path, fake_agno: dict, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "cobre.md").write_text("El precio del cobre subió en Chile.", encoding="utf-8")
+        path = _write_spec(tmp_path, nombre="Sabio", nivel=2, directorio_conocimiento="docs")
+
+        agent = agent_runtime.load_agent(path)
+        buscar = agent.kwargs["tools"][0]
+
+        assert buscar.__name__ == "buscar_conocimiento"
+        assert json.loads(buscar("cobre"))[0]["fuente"] == str(Path("docs") / "cobre.md")
+        assert agent.kwargs["instructions"][1].startswith("Busca en la base")
+
+    def test_build_workflow_shares_instances(
+        self, tmp_path: Path, fake_agno: dict
+    ) -> None:
+        path = _write_spec(
+            tmp_path,
+            nombre="Pipeline",
+            nivel=5,
+            pasos_workflow=[
+                {"nombre": "buscar", "rol": "Buscar", "herramientas": ["reasoning"]},
+                {"nombre": "resumir", "rol": "Resumir", "herramientas": ["reasoning"],
+                 "depende_de": ["buscar"], "modelo": "gpt-4o"},
+            ],
+        )
+
+        workflow = agent_runtime.load_agent(path)
+        buscar, resumir = workflow.agentes["buscar"], workflow.agentes["resumir"]
+
+        assert type(workflow).__name__ == "WorkflowDAG"
+        assert workflow.finales == ["resumir"]
+        assert resumir.kwargs["model"].kwargs == {"id": "gpt-4o"}
+        assert buscar.kwargs["tools"][0] is resumir.kwargs["tools"][0]
+
+    def test_build_agent_applies_tool_cache(
+        self, tmp_path: Path, fake_agno: dict, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        (tmp_path / "work").mkdir()
+        monkeypatch.chdir(tmp_path / "work")
+        path = _write_spec(
+            tmp_path,
+            nombre="Equipo",
+            es_equipo=True,
+            cache_herramientas=True,
+            miembros_equipo=[
+                {"nombre": "A", "rol": "a", "herramientas": ["web"]},
+                {"nombre": "B", "rol": "b", "herramientas": ["reasoning"]},
+            ],
+        )
+
+        registered: list = []
+        monkeypatch.setattr(atexit, "register", registered.append)
+        closers: list = []
+        team = agent_runtime.load_agent(path, closers)
+        first, second = team.kwargs["members"]
+        hook = first.kwargs["tool_hooks"][0]
+        calls = []
+
+        def herramienta(**arguments):
+            calls.append(arguments)
+            return "ok"
+
+        assert second.kwargs["tool_hooks"] == [hook]
+        assert hook("buscar", herramienta, {"q": "cobre"}) == "ok"
+        assert hook("buscar", herramienta, {"q": "cobre"}) == "ok"
+        assert len(calls) == 1
+        assert closers == [hook.__self__.cerrar]
+        for close in closers:
+            close()
+        # El cache persiste junto al spec y no en el directorio actual
+        assert agent_runtime.tool_cache_file(path).exists()
+        assert not (tmp_path / "work" / "tools_cache.sqlite").exists()
+        assert registered == []
+
+    def test_build_memory_agent_defers_maintenance(
+        self, tmp_path: Path, fake_agno: dict, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        path = _write_spec(
+            tmp_path,
+            nombre="Mem",
+            necesita_memoria=True,
+            memoria_segundo_plano=True,
+            memoria_cada_n_turnos=3,
+        )
+
+        agent = agent_runtime.load_agent(path)
+        hook = agent.kwargs["post_hooks"][0]
+
+        assert agent.kwargs["enable_user_memories"] is False
+        assert agent.kwargs["add_memories_to_context"] is True
+        assert agent.kwargs["memory_manager"].kwargs["model"] is agent.kwargs["model"]
+        assert hook.__self__.cada_n_turnos == 3
+        assert hook.__self__.en_segundo_plano is True
+
+    def test_batch_runner_writes_jsonl(self, tmp_path: Path) -> None:
+        class Eco:
+            def run(self, prompt):
+                return type("Respuesta", (), {"content": prompt.upper()})()
+
+        entrada = tmp_path / "prompts.jsonl"
+        entrada.write_text('"hola"\n{"id": "x", "prompt": "chao"}\n', encoding="utf-8")
+        salida = tmp_path / "resultados.jsonl"
+
+        agent_runtime.build_batch_runner({"max_concurrencia": 2})(Eco(), str(entrada), str(salida))
+
+        lineas = salida.read_text(encoding="utf-8").splitlines()
+        respuestas = {str(r["id"]): r["respuesta"] for r in map(json.loads, lineas)}
+        assert respuestas == {"1": "HOLA", "x": "CHAO"}
+
+    def test_cli_rejects_zero_concurrency(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(
+            "sys.argv", ["agent_runtime", "demo_agent.json", "--batch", "-", "--concurrencia", "0"]
+        )
+
+        with pytest.raises(SystemExit):
+            agent_runtime.main()
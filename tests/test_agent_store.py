@@ -0,0 +1,213 @@
+"""Tests unitarios para el almacenamiento de agentes generados."""
+
+import hashlib
+import io
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+from src.application.services.meta_agent import AgentPlan
+from src.infrastructure.runtime.agent_pool import StoreAgentPool
+from src.infrastructure.storage import agent_files
+from src.infrastructure.storage.agent_files import generate_filename, save_agent_file
+from src.infrastructure.storage.agent_store import (
+    DEFAULT_TENANT,
+    AgentStore,
+    LocalAgentStore,
+    S3AgentStore,
+    check_filename,
+    normalize_tenant,
+    shard_for,
+)
+
+AGENT_CODE = b"def crear_agente():\n    return {'name': 'uno'}\n"
+
+
+class FakeClientError(Exception):
+    """Error con la forma de botocore.exceptions.ClientError."""
+
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3:
+    """Bucket S3 en memoria con la interfaz de boto3 usada por S3AgentStore."""
+
+    def __init__(self, page_size: int = 1000):
+        self.objects: Dict[Tuple[str, str], Tuple[bytes, datetime]] = {}
+        self.page_size = page_size
+        self._clock = 0
+
+    def put_object(self, Bucket, Key, Body, ContentType=None):
+        self._clock += 1
+        modified = datetime.fromtimestamp(1_700_000_000 + self._clock, timezone.utc)
+        self.objects[(Bucket, Key)] = (Body, modified)
+
+    def _get(self, bucket, key):
+        try:
+            return self.objects[(bucket, key)]
+        except KeyError:
+            raise FakeClientError("404")
+
+    def head_object(self, Bucket, Key):
+        body, modified = self._get(Bucket, Key)
+        return {
+            "ContentLength": len(body),
+            "LastModified": modified,
+            "ETag": f'"{hashlib.md5(body).hexdigest()}"',
+        }
+
+    def get_object(self, Bucket, Key):
+        body, _ = self._get(Bucket, Key)
+        return {"Body": io.BytesIO(body)}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        keys = sorted(
+            key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix)
+        )
+        start = int(ContinuationToken or 0)
+        page = keys[start : start + self.page_size]
+        contents = []
+        for key in page:
+            head = self.head_object(Bucket, key)
+            contents.append({
+                "Key": key,
+                "Size": head["ContentLength"],
+                "LastModified": head["LastModified"],
+                "ETag": head["ETag"],
+            })
+        truncated = start + self.page_size < len(keys)
+        return {
+            "Contents": contents,
+            "IsTruncated": truncated,
+            "NextContinuationToken": str(start + self.page_size) if truncated else None,
+        }
+
+
+@pytest.fixture(params=["local", "s3"])
+def store(request, tmp_path: Path):
+    if request.param == "local":
+        return LocalAgentStore(tmp_path / "agents")
+    return S3AgentStore("bucket", client=FakeS3(page_size=2), cache_dir=tmp_path / "cache")
+
+
+def test_tenant_and_filename_validation() -> None:
+    assert normalize_tenant(None) == DEFAULT_TENANT
+    assert normalize_tenant(" Acme-1 ") == "acme-1"
+    for tenant in ("../x", "a/b", "a" * 65, "_x"):
+        with pytest.raises(ValueError):
+            normalize_tenant(tenant)
+
+    assert check_filename("uno_agent.py") == "uno_agent.py"
+    for filename in ("../uno_agent.py", "a/uno_agent.py", "uno.py", ""):
+        with pytest.raises(ValueError):
+            check_filename(filename)
+
+
+def test_store_roundtrip_and_tenant_isolation(store) -> None:
+    stored = store.put("acme", "uno_agent.py", AGENT_CODE)
+
+    assert stored.key.endswith(f"acme/{shard_for('uno_agent.py')}/uno_agent.py")
+    assert stored.size == len(AGENT_CODE)
+    assert store.read("acme", "uno_agent.py") == AGENT_CODE
+    assert store.stat("otro", "uno_agent.py") is None
+    assert store.list("otro") == []
+    assert store.local_path("acme", "uno_agent.py").read_bytes() == AGENT_CODE
+
+    updated = store.put("acme", "uno_agent.py", AGENT_CODE + b"# v2\n")
+    assert updated.version != stored.version
+    assert [entry.filename for entry in store.list("acme")] == ["uno_agent.py"]
+
+    assert store.delete("acme", "uno_agent.py")
+    assert not store.delete("acme", "uno_agent.py")
+    with pytest.raises(FileNotFoundError):
+        store.open("acme", "uno_agent.py")
+
+
+def test_store_lists_newest_first_across_shards(store) -> None:
+    names = [f"agente_{index}_agent.py" for index in range(5)]
+    for name in names:
+        store.put(DEFAULT_TENANT, name, name.encode())
+
+    listed = store.list(DEFAULT_TENANT)
+
+    assert len({shard_for(name) for name in names}) > 1
+    assert sorted(entry.filename for entry in listed) == sorted(names)
+    mtimes = [entry.mtime_ns for entry in listed]
+    assert mtimes == sorted(mtimes, reverse=True)
+
+
+def test_local_store_keeps_legacy_files_in_default_tenant(tmp_path: Path) -> None:
+    store = LocalAgentStore(tmp_path)
+    (tmp_path / "viejo_agent.py").write_bytes(b"x = 1\n")
+
+    assert [entry.filename for entry in store.list(DEFAULT_TENANT)] == ["viejo_agent.py"]
+    assert store.list("acme") == []
+    assert store.read(DEFAULT_TENANT, "viejo_agent.py") == b"x = 1\n"
+
+    # Al volver a guardarlo pasa a su shard
+    store.put(DEFAULT_TENANT, "viejo_agent.py", b"x = 2\n")
+    assert not (tmp_path / "viejo_agent.py").exists()
+    assert [entry.key for entry in store.list(DEFAULT_TENANT)] == [
+        f"{DEFAULT_TENANT}/{shard_for('viejo_agent.py')}/viejo_agent.py"
+    ]
+
+
+def test_generate_filename_is_collision_free() -> None:
+    def plan(nombre: str) -> AgentPlan:
+        return AgentPlan(
+            nombre=nombre, rol="r", objetivo="o", instrucciones=[], herramientas=[], modelo="m"
+        )
+
+    first = generate_filename(plan("Mi Agente"))
+    assert first.startswith("mi_agente_") and first.endswith("_agent.py")
+    assert first == generate_filename(plan("Mi Agente"))
+    assert first != generate_filename(plan("mi-agente"))
+    assert generate_filename(plan("Mi Agente"), "spec").endswith("_agent.json")
+    assert check_filename(generate_filename(plan("¿?")))
+
+
+def test_store_agent_pool_serves_tenant_agents(store) -> None:
+    store.put("acme", "uno_agent.py", AGENT_CODE)
+    pool = StoreAgentPool(store, "acme")
+
+    assert list(pool.discover()) == ["uno"]
+    assert pool.get("uno") == {"name": "uno"}
+    assert pool.get("uno") is pool.get("uno")
+    assert pool.resolve("../uno") is None
+    with pytest.raises(KeyError):
+        StoreAgentPool(store, "otro").get("uno")
+
+
+def test_save_agent_file_versions_and_notifies(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("AGENT_STORAGE", "local")
+    monkeypatch.setenv("GENERATED_AGENTS_DIR", str(tmp_path))
+    monkeypatch.setattr(agent_files, "_save_listeners", [])
+    saved = []
+    agent_files.add_save_listener(lambda tenant, filename: saved.append((tenant, filename)))
+    plan = AgentPlan(nombre="Cobre", rol="Analista")
+
+    filename, filepath = save_agent_file(plan, "print(1)\n", tenant="acme")
+    save_agent_file(plan, "print(2)\n", tenant="acme")
+
+    assert filename == generate_filename(plan)
+    assert Path(filepath).read_text(encoding="utf-8") == "print(2)\n"
+    assert saved == [("acme", filename), ("acme", filename)]
+    assert len(agent_files.get_agent_versions().list("acme", filename)) == 2
+
+
+def test_incomplete_backend_fails_on_instantiation() -> None:
+    class SinBlobs(AgentStore):
+        def put(self, tenant, filename, data):
+            return None
+
+    with pytest.raises(TypeError):
+        SinBlobs()
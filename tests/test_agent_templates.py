@@ -0,0 +1,616 @@
+"""Tests unitarios para `AgentTemplate`."""
+
+import asyncio
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from src.infrastructure.templates.agent_templates import AgentTemplate
+
+GENERATORS = [
+    AgentTemplate.generate_basic_agent,
+    AgentTemplate.generate_agent_with_memory,
+    AgentTemplate.generate_agent_team,
+]
+
+
+def _build_spec(**overrides) -> dict:
+    base = {
+        "nombre": "Agente Demo",
+        "rol": "Asistente de prueba",
+        "modelo": "deepseek-chat",
+        "herramientas": ["duckduckgo"],
+        "instrucciones": ["Sé útil"],
+        "ejemplo_uso": "¿Cuál es el estado?",
+    }
+    base.update(overrides)
+    return base
+
+
+class TestAsyncMode:
+    @pytest.mark.parametrize("generator", GENERATORS)
+    def test_default_generates_sync_code(self, generator) -> None:
+        code = generator(_build_spec())
+
+        compile(code, "<generated>", "exec")
+        assert "def main():" in code
+        assert "async def" not in code
+        assert "import asyncio" not in code
+        assert ".print_response(" in code
+
+    @pytest.mark.parametrize("generator", GENERATORS)
+    def test_async_generates_concurrent_runner(self, generator) -> None:
+        code = generator(_build_spec(modo_async=True, max_concurrencia=8))
+
+        compile(code, "<generated>", "exec")
+        assert "import asyncio" in code
+        assert "async def main():" in code
+        assert "MAX_CONCURRENCIA = 8" in code
+        assert "asyncio.Semaphore(max_concurrencia)" in code
+        assert "await ejecutor.arun(prompt)" in code
+        assert '.aprint_response("¿Cuál es el estado?", stream=True)' in code
+        assert "asyncio.run(main())" in code
+
+
+class TestToolCache:
+    def test_cache_disabled_by_default(self) -> None:
+        code = AgentTemplate.generate_basic_agent(_build_spec())
+
+        assert "tool_hooks" not in code
+        assert "CacheHerramientas" not in code
+
+    @pytest.mark.parametrize("generator", GENERATORS)
+    def test_cache_wires_tool_hooks(self, generator) -> None:
+        code = generator(_build_spec(cache_herramientas=True, cache_ttl_segundos=120))
+
+        compile(code, "<generated>", "exec")
+        assert "CACHE_TTL_SEGUNDOS = 120" in code
+        assert "tool_hooks=[cache_herramientas.hook]," in code
+        assert "atexit.register(cache_herramientas.imprimir_estadisticas)" in code
+
+    def test_generated_cache_hits_memory_and_sqlite(
+        self, tmp_path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr("atexit.register", lambda *args, **kwargs: None)
+        cache = AgentTemplate._build_tool_cache_code({"cache_herramientas": True})
+        namespace: dict = {}
+        exec(
+            "\n".join(f"import {module}" for module in cache["imports"])
+            + "\n"
+            + cache["helpers"],
+            namespace,
+        )
+
+        calls = []
+
+        def search(query):
+            calls.append(query)
+            return f"resultado {query}"
+
+        first = namespace["cache_herramientas"]
+        assert first.hook("search", search, {"query": "agno"}) == "resultado agno"
+        assert first.hook("search", search, {"query": "agno"}) == "resultado agno"
+        assert calls == ["agno"]
+        assert (first.aciertos, first.fallos) == (1, 1)
+
+        # Una nueva instancia recupera el resultado desde SQLite
+        second = namespace["CacheHerramientas"]()
+        assert second.hook("search", search, {"query": "agno"}) == "resultado agno"
+        assert calls == ["agno"]
+
+        second.cerrar()
+        with pytest.raises(sqlite3.ProgrammingError):
+            second.conexion.execute("SELECT 1")
+
+
+class TestToolResolution:
+    def test_tool_aliases_register_one_instance(self) -> None:
+        code = AgentTemplate.generate_basic_agent(
+            _build_spec(herramientas=["web", "duckduckgo", "serper", "foo", "foo"])
+        )
+
+        assert code.count("DuckDuckGoTools()") == 1
+        assert code.count("SerperTools(") == 1
+        assert code.count("# Initialize foo here") == 1
+
+
+class TestBatchMode:
+    @pytest.mark.parametrize("generator", GENERATORS)
+    @pytest.mark.parametrize("modo_async", [False, True])
+    def test_batch_generates_runner(self, generator, modo_async: bool) -> None:
+        code = generator(
+            _build_spec(modo_batch=True, modo_async=modo_async, max_concurrencia=3)
+        )
+
+        compile(code, "<generated>", "exec")
+        assert "MAX_CONCURRENCIA = 3" in code
+        assert "def parsear_argumentos():" in code
+        assert "if args.batch:" in code
+
+    @pytest.mark.parametrize("modo_async", [False, True])
+    def test_generated_batch_runner_writes_jsonl(
+        self, tmp_path, modo_async: bool
+    ) -> None:
+        runtime = AgentTemplate._build_runtime_code(
+            {"modo_batch": True, "modo_async": modo_async, "max_concurrencia": 2}
+        )
+        namespace: dict = {}
+        exec(runtime["imports"] + "\n" + runtime["helpers"], namespace)
+
+        class FakeExecutor:
+            def run(self, prompt):
+                if prompt == "falla":
+                    raise RuntimeError("boom")
+                return SimpleNamespace(content=prompt.upper())
+
+            async def arun(self, prompt):
+                return self.run(prompt)
+
+        entrada = tmp_path / "prompts.jsonl"
+        entrada.write_text(
+            "\n".join(
+                [json.dumps("hola"), json.dumps({"id": "x", "prompt": "falla"})]
+                + [json.dumps({"id": "sin"}), "{roto"]
+                + [json.dumps({"prompt": f"p{i}"}) for i in range(5)]
+            ),
+            encoding="utf-8",
+        )
+        salida = tmp_path / "resultados.jsonl"
+
+        result = namespace["ejecutar_batch"](
+            FakeExecutor(), str(entrada), str(salida), 2
+        )
+        if modo_async:
+            asyncio.run(result)
+
+        resultados = [
+            json.loads(line)
+            for line in salida.read_text(encoding="utf-8").splitlines()
+        ]
+        by_id = {item["id"]: item for item in resultados}
+        assert len(resultados) == 9
+        assert by_id[1]["respuesta"] == "HOLA"
+        assert by_id["x"]["error"] == "boom"
+        assert "prompt" in by_id["sin"]["error"]
+        assert by_id[4]["error"].startswith("JSON inválido")
+        assert all("duracion_ms" in item for item in resultados if "prompt" in item)
+
+    def test_generated_batch_rejects_zero_concurrency(self, monkeypatch) -> None:
+        runtime = AgentTemplate._build_runtime_code({"modo_batch": True})
+        namespace: dict = {}
+        exec(runtime["imports"] + "\n" + runtime["helpers"], namespace)
+        monkeypatch.setattr("sys.argv", ["agente.py", "--batch", "-", "--concurrencia", "0"])
+
+        with pytest.raises(SystemExit):
+            namespace["parsear_argumentos"]()
+
+
+class TestTeamSharedInstances:
+    def test_team_shares_model_and_tool_instances(self) -> None:
+        miembros = [
+            {"nombre": "A", "rol": "Buscar", "herramientas": ["duckduckgo", "reasoning"]},
+            {"nombre": "B", "rol": "Analizar", "herramientas": ["reasoning", "web"]},
+        ]
+        code = AgentTemplate.generate_agent_team(
+            _build_spec(modelo="deepseek-reasoner", miembros_equipo=miembros)
+        )
+
+        compile(code, "<generated>", "exec")
+        assert code.count('DeepSeek(id="deepseek-reasoner")') == 1
+        assert code.count("ReasoningTools(add_instructions=True)") == 1
+        assert code.count("DuckDuckGoTools()") == 1
+        assert code.count("model=modelo,") == 3
+        assert "tools=[herramienta_reasoning, herramienta_duckduckgo, herramienta_serper]" in code
+
+    def test_team_member_model_override(self) -> None:
+        miembros = [
+            {"nombre": "A", "rol": "Buscar", "herramientas": []},
+            {"nombre": "B", "rol": "Escribir", "herramientas": [], "modelo": "gpt-4o"},
+            {"nombre": "C", "rol": "Revisar", "herramientas": [], "modelo": "gpt-4o"},
+        ]
+        code = AgentTemplate.generate_agent_team(_build_spec(miembros_equipo=miembros))
+
+        compile(code, "<generated>", "exec")
+        assert "from agno.models.openai import OpenAIChat" in code
+        assert code.count('modelo_1 = OpenAIChat(id="gpt-4o")') == 1
+        assert code.count("model=modelo_1,") == 2
+
+    def test_team_member_instructions(self) -> None:
+        miembros = [
+            {"nombre": "A", "rol": "Buscar", "herramientas": [], "instrucciones": ['Cita "fuentes"']},
+            {"nombre": "B", "rol": "Escribir", "herramientas": []},
+        ]
+
+        for compacto in (False, True):
+            code = AgentTemplate.generate_agent_team(
+                _build_spec(miembros_equipo=miembros, equipo_compacto=compacto)
+            )
+            compile(code, "<generated>", "exec")
+            assert 'Cita \\"fuentes\\"' in code
+
+        code = AgentTemplate.generate_agent_team(_build_spec(miembros_equipo=miembros))
+        assert code.count("instructions=[\"Cita") == 1
+
+
+class TestCompactTeam:
+    def test_compact_team_renders_member_table(self) -> None:
+        miembros = [
+            {"nombre": f"Miembro {idx}", "rol": 'Rol "citado"', "herramientas": ["web"]}
+            for idx in range(300)
+        ]
+        code = AgentTemplate.generate_agent_team(
+            _build_spec(miembros_equipo=miembros, equipo_compacto=True)
+        )
+
+        namespace: dict = {}
+        exec(code.split("def main")[0].split("load_dotenv()")[1], namespace)
+        assert len(namespace["MIEMBROS"]) == 300
+        assert namespace["MIEMBROS"][0] == [
+            "Miembro 0",
+            'Rol "citado"',
+            "modelo",
+            ["herramienta_duckduckgo", "herramienta_serper"],
+            [],
+        ]
+        compile(code, "<generated>", "exec")
+        assert "members=miembros," in code
+        assert code.count("Agent(") == 1
+        assert code.count("\n") < 400
+
+
+class TestAgentFactory:
+    @pytest.mark.parametrize("generator", GENERATORS)
+    def test_generated_code_exposes_factory(self, generator) -> None:
+        code = generator(_build_spec(modo_batch=True))
+
+        assert "def crear_agente():" in code
+        assert code.index("def crear_agente():") < code.index("def main():")
+        assert " = crear_agente()" in code
+
+    def test_close_hook_releases_module_resources(self) -> None:
+        assert "cerrar_agente" not in AgentTemplate.generate_agent_with_memory(_build_spec())
+
+        code = AgentTemplate.generate_agent_with_memory(
+            _build_spec(cache_herramientas=True, memoria_segundo_plano=True)
+        )
+
+        compile(code, "<generated>", "exec")
+        assert (
+            "def cerrar_agente():\n"
+            '    """Libera los recursos del módulo (usado por el host de agentes al descargarlo)."""\n'
+            "    cache_herramientas.cerrar()\n"
+            "    mantenimiento_memoria.cerrar()\n"
+        ) in code
+
+
+class TestMemoryMaintenance:
+    def test_default_memory_agent_unchanged(self) -> None:
+        code = AgentTemplate.generate_agent_with_memory(_build_spec())
+
+        assert "enable_user_memories=True," in code
+        assert "MemoryManager" not in code
+        assert "post_hooks" not in code
+
+    def test_cheap_memory_model(self) -> None:
+        code = AgentTemplate.generate_agent_with_memory(
+            _build_spec(modelo="claude-sonnet-4", modelo_memoria="gpt-4o-mini")
+        )
+
+        compile(code, "<generated>", "exec")
+        assert "from agno.models.openai import OpenAIChat" in code
+        assert 'MemoryManager(model=OpenAIChat(id="gpt-4o-mini"), db=db)' in code
+        assert "enable_session_summary=True," in code
+        assert "post_hooks" not in code
+
+    def test_deferred_memory_uses_post_hook(self) -> None:
+        code = AgentTemplate.generate_agent_with_memory(
+            _build_spec(memoria_segundo_plano=True, memoria_cada_n_turnos=3)
+        )
+
+        compile(code, "<generated>", "exec")
+        assert "MEMORIA_CADA_N_TURNOS = 3" in code
+        assert "enable_user_memories=False," in code
+        assert "add_memories_to_context=True," in code
+        assert "post_hooks=[mantenimiento_memoria.hook]," in code
+
+    def test_generated_maintenance_runs_every_n_turns(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr("atexit.register", lambda *args, **kwargs: None)
+        memory = AgentTemplate._build_memory_code({"memoria_cada_n_turnos": 2})
+        namespace: dict = {}
+        exec(
+            "\n".join(f"import {module}" for module in memory["imports"])
+            + "\n"
+            + memory["helpers"],
+            namespace,
+        )
+
+        extracted = []
+        summarized = []
+        agent = SimpleNamespace(
+            id="agente",
+            memory_manager=SimpleNamespace(
+                create_user_memories=lambda **kwargs: extracted.append(kwargs)
+            ),
+            session_summary_manager=SimpleNamespace(
+                create_session_summary=lambda session: summarized.append(session)
+            ),
+            get_session=lambda session_id: session_id,
+            save_session=lambda session: None,
+        )
+
+        def run_output(texto):
+            return SimpleNamespace(
+                session_id="s1",
+                user_id="u1",
+                messages=[
+                    SimpleNamespace(role="system", content="sistema"),
+                    SimpleNamespace(role="user", content=texto),
+                    SimpleNamespace(role="assistant", content="ok"),
+                ],
+            )
+
+        hook = namespace["mantenimiento_memoria"].hook
+        hook(run_output("uno"), agent)
+        assert extracted == []
+
+        hook(run_output("dos"), agent)
+        assert len(extracted) == 1
+        assert [m.content for m in extracted[0]["messages"]] == ["uno", "ok", "dos", "ok"]
+        assert extracted[0]["user_id"] == "u1"
+        assert summarized == ["s1"]
+
+
+class TestKnowledgeAgent:
+    @staticmethod
+    def _load_helpers(tmp_path, **spec) -> dict:
+        knowledge = AgentTemplate._build_knowledge_code(
+            {"directorio_conocimiento": str(tmp_path / "docs"), **spec}
+        )
+        namespace: dict = {}
+        exec(
+            "import numpy as np\n"
+            + "\n".join(f"import {module}" for module in ["os", *knowledge["imports"]])
+            + "\n"
+            + knowledge["helpers"],
+            namespace,
+        )
+        return namespace
+
+    def test_level_two_generates_knowledge_agent(self) -> None:
+        spec = _build_spec(nivel=2, directorio_conocimiento="manuales")
+
+        assert AgentTemplate.get_agent_kind(spec) == "knowledge"
+        code = AgentTemplate.generate_knowledge_agent(spec)
+
+        compile(code, "<generated>", "exec")
+        assert "import numpy as np" in code
+        assert 'DIRECTORIO_DOCUMENTOS = "manuales"' in code
+        assert "tools=[buscar_conocimiento, DuckDuckGoTools(), SerperTools(" in code
+        assert "indice_conocimiento.ingestar_directorio()" in code
+
+    def test_index_ingests_in_batches_and_searches(self, tmp_path) -> None:
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        temas = ["cobre minería Chile", "recetas de cocina italiana", "fútbol y estadios"]
+        for idx, tema in enumerate(temas):
+            (docs / f"doc{idx}.txt").write_text(
+                "\n\n".join(f"{tema} párrafo {n}" for n in range(10)), encoding="utf-8"
+            )
+        (docs / "ignorado.csv").write_text("cobre", encoding="utf-8")
+        namespace = self._load_helpers(tmp_path)
+
+        indice = namespace["IndiceVectorial"](tmp_path / "indice")
+        assert indice.ingestar_directorio(docs, tamano_lote=4) == 3
+        assert indice.total == 3
+        assert indice.ingestar_directorio(docs, tamano_lote=4) == 0
+
+        resultados = indice.buscar("minería del cobre", k=2)
+        assert resultados[0]["fuente"] == str(docs / "doc0.txt")
+        assert resultados[0]["score"] >= resultados[1]["score"]
+
+    def test_index_appends_incrementally_and_reopens(self, tmp_path) -> None:
+        namespace = self._load_helpers(tmp_path)
+        IndiceVectorial = namespace["IndiceVectorial"]
+        indice = IndiceVectorial(tmp_path / "indice")
+
+        indice.agregar([f"fragmento {idx}" for idx in range(50)], ["a.txt"] * 50)
+        indice.agregar(["tormenta solar extrema"], ["b.txt"])
+
+        # Una escritura parcial posterior se descarta al reabrir
+        with open(tmp_path / "indice" / "vectores.f32", "ab") as archivo:
+            archivo.write(b"\0" * 10)
+        reabierto = IndiceVectorial(tmp_path / "indice")
+
+        assert reabierto.total == 51
+        assert reabierto.buscar("tormenta solar", k=1)[0]["texto"] == "tormenta solar extrema"
+        assert len(reabierto.buscar("fragmento", k=100)) == 51
+
+    def test_interrupted_ingest_does_not_duplicate(self, tmp_path) -> None:
+        docs = tmp_path / "docs"
+        docs.mkdir()
+        (docs / "largo.txt").write_text(
+            "\n\n".join(f"párrafo {n} " + "x" * 790 for n in range(6)), encoding="utf-8"
+        )
+        namespace = self._load_helpers(tmp_path)
+        embeber = namespace["embeber"]
+        llamadas = []
+
+        def embeber_falla(textos):
+            llamadas.append(len(textos))
+            if len(llamadas) == 2:
+                raise KeyboardInterrupt
+            return embeber(textos)
+
+        namespace["embeber"] = embeber_falla
+        with pytest.raises(KeyboardInterrupt):
+            namespace["IndiceVectorial"](tmp_path / "indice").ingestar_directorio(docs, tamano_lote=2)
+
+        namespace["embeber"] = embeber
+        indice = namespace["IndiceVectorial"](tmp_path / "indice")
+        assert indice.total == 0
+        assert indice.ingestar_directorio(docs, tamano_lote=2) == 6
+        assert indice.total == 6
+        assert len(indice.buscar("párrafo", k=100)) == 6
+
+    def test_search_blocks_match_full_scan(self, tmp_path) -> None:
+        namespace = self._load_helpers(tmp_path)
+        namespace["BLOQUE_BUSQUEDA"] = 7
+        indice = namespace["IndiceVectorial"](tmp_path / "indice")
+        textos = [f"documento {idx} tema {idx % 5}" for idx in range(40)]
+        indice.agregar(textos, ["x"] * 40)
+
+        consulta = "tema 3"
+        esperados = namespace["embeber"](textos) @ namespace["embeber"]([consulta])[0]
+        resultados = indice.buscar(consulta, k=5)
+
+        assert [r["score"] for r in resultados] == pytest.approx(
+            sorted(esperados, reverse=True)[:5], abs=1e-4
+        )
+
+
+class TestWorkflow:
+    PASOS = [
+        {"nombre": "noticias", "rol": "Buscar noticias", "herramientas": ["web"]},
+        {"nombre": "mercado", "rol": "Revisar mercado", "herramientas": ["yfinance"]},
+        {"nombre": "informe", "rol": "Redactar", "depende_de": ["noticias", "mercado"]},
+    ]
+
+    @staticmethod
+    def _load_workflow_class(**spec):
+        workflow = AgentTemplate._build_workflow_code(spec)
+        namespace: dict = {}
+        exec(
+            "\n".join(f"import {module}" for module in ["os", *workflow["imports"]])
+            + "\n"
+            + workflow["helpers"],
+            namespace,
+        )
+        return namespace["WorkflowDAG"]
+
+    @staticmethod
+    def _fake_agents(pasos, calls, fail=()):
+        import threading
+        import time
+
+        lock = threading.Lock()
+        activos = {"actual": 0, "max": 0}
+
+        class FakeAgent:
+            def __init__(self, nombre):
+                self.nombre = nombre
+
+            def run(self, prompt):
+                with lock:
+                    activos["actual"] += 1
+                    activos["max"] = max(activos["max"], activos["actual"])
+                time.sleep(0.05)
+                with lock:
+                    activos["actual"] -= 1
+                    calls.append(self.nombre)
+                if self.nombre in fail:
+                    raise RuntimeError(f"falla {self.nombre}")
+                return SimpleNamespace(content=f"{self.nombre}<{prompt.count('Resultado del paso')}>")
+
+        return {paso["nombre"]: FakeAgent(paso["nombre"]) for paso in pasos}, activos
+
+    def test_level_five_generates_workflow(self) -> None:
+        spec = _build_spec(nivel=5, pasos_workflow=self.PASOS, max_pasos_paralelos=2)
+
+        assert AgentTemplate.get_agent_kind(spec) == "workflow"
+        code = AgentTemplate.generate_workflow(spec)
+
+        compile(code, "<generated>", "exec")
+        assert "MAX_PASOS_PARALELOS = 2" in code
+        assert "return WorkflowDAG(PASOS, agentes)" in code
+        assert code.count("Agent(") == 1
+
+        namespace: dict = {}
+        exec(code.split("def crear_agente")[0].split("load_dotenv()")[1].split("# Workflow:")[0], namespace)
+        assert [paso["depende_de"] for paso in namespace["PASOS"]] == [[], [], ["noticias", "mercado"]]
+        assert namespace["PASOS"][1]["herramientas"] == ["herramienta_yfinance"]
+
+    @pytest.mark.parametrize("generator_opts", [{}, {"modo_async": True, "modo_batch": True}])
+    def test_default_steps_compile(self, generator_opts) -> None:
+        code = AgentTemplate.generate_workflow(_build_spec(nivel=5, **generator_opts))
+
+        compile(code, "<generated>", "exec")
+        assert '"depende_de": ["investigar"]' in code
+
+    def test_independent_steps_run_in_parallel(self, tmp_path) -> None:
+        WorkflowDAG = self._load_workflow_class()
+        pasos = AgentTemplate._workflow_steps({"pasos_workflow": self.PASOS})
+        calls: list = []
+        agentes, activos = self._fake_agents(pasos, calls)
+
+        respuesta = WorkflowDAG(pasos, agentes, tmp_path, max_paralelos=4).run("cobre")
+
+        assert activos["max"] == 2
+        assert calls[-1] == "informe"
+        assert respuesta.content == "informe<2>"
+        assert respuesta.pasos["noticias"] == "noticias<0>"
+
+    def test_parallelism_is_bounded(self, tmp_path) -> None:
+        WorkflowDAG = self._load_workflow_class()
+        pasos = AgentTemplate._workflow_steps(
+            {"pasos_workflow": [{"nombre": f"p{idx}", "rol": "x"} for idx in range(6)]}
+        )
+        agentes, activos = self._fake_agents(pasos, [])
+
+        respuesta = WorkflowDAG(pasos, agentes, tmp_path, max_paralelos=2).run("x")
+
+        assert activos["max"] == 2
+        assert respuesta.content.startswith("## p0")
+
+    def test_resumes_from_completed_steps(self, tmp_path) -> None:
+        WorkflowDAG = self._load_workflow_class()
+        pasos = AgentTemplate._workflow_steps({"pasos_workflow": self.PASOS})
+        calls: list = []
+        agentes, _ = self._fake_agents(pasos, calls, fail={"informe"})
+
+        with pytest.raises(RuntimeError):
+            WorkflowDAG(pasos, agentes, tmp_path).run("cobre")
+        assert sorted(calls) == ["informe", "mercado", "noticias"]
+
+        calls.clear()
+        agentes, _ = self._fake_agents(pasos, calls)
+        assert WorkflowDAG(pasos, agentes, tmp_path).run("cobre").content == "informe<2>"
+        assert calls == ["informe"]
+
+        # Otra entrada no reutiliza resultados
+        calls.clear()
+        WorkflowDAG(pasos, agentes, tmp_path).run("litio")
+        assert len(calls) == 3
+
+    def test_async_interface(self, tmp_path) -> None:
+        WorkflowDAG = self._load_workflow_class()
+        pasos = AgentTemplate._workflow_steps({"pasos_workflow": self.PASOS})
+        agentes, _ = self._fake_agents(pasos, [])
+        workflow = WorkflowDAG(pasos, agentes, tmp_path)
+
+        async def consumir():
+            eventos = [evento async for evento in workflow.arun("cobre", stream=True)]
+            respuesta = await workflow.arun("cobre")
+            return eventos, respuesta
+
+        eventos, respuesta = asyncio.run(consumir())
+        assert [evento.content for evento in eventos] == ["informe<2>"]
+        assert respuesta.content == "informe<2>"
+
+    @pytest.mark.parametrize(
+        "pasos",
+        [
+            [{"nombre": "a", "depende_de": ["b"]}, {"nombre": "b", "depende_de": ["a"]}],
+            [{"nombre": "a", "depende_de": ["zeta"]}],
+            [{"nombre": "a"}, {"nombre": "a"}],
+        ],
+    )
+    def test_invalid_graphs_are_rejected(self, pasos) -> None:
+        WorkflowDAG = self._load_workflow_class()
+
+        with pytest.raises(ValueError):
+            WorkflowDAG(AgentTemplate._workflow_steps({"pasos_workflow": pasos}), {})
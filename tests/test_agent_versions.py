@@ -0,0 +1,81 @@
+"""Tests unitarios para el historial de versiones de agentes."""
+
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.storage.agent_store import LocalAgentStore
+from src.infrastructure.storage.agent_versions import AgentVersions, apply_delta, make_delta
+
+
+def _code(version: int, lines: int = 200) -> bytes:
+    body = [f"linea_{index} = {index}\n" for index in range(lines)]
+    body[version % lines] = f"linea_{version % lines} = 'v{version}'\n"
+    return f'"""Agente v{version}"""\n{"".join(body)}'.encode()
+
+
+@pytest.fixture
+def versions(tmp_path: Path) -> AgentVersions:
+    return AgentVersions(LocalAgentStore(tmp_path), keyframe_interval=4)
+
+
+def _save(versions: AgentVersions, data: bytes):
+    record = versions.record("acme", "uno_agent.py", data)
+    versions.store.put("acme", "uno_agent.py", data)
+    return record
+
+
+def test_delta_roundtrip() -> None:
+    old = "a\nb\nc\r\nsin salto".encode()
+    new = "a\nB\nc\r\nd\nsin salto".encode()
+
+    assert apply_delta(old, make_delta(old, new)) == new
+    assert apply_delta(b"", make_delta(b"", new)) == new
+    assert apply_delta(new, make_delta(new, b"")) == b""
+
+
+def test_record_keeps_every_version_as_deltas(versions: AgentVersions) -> None:
+    contents = [_code(index) for index in range(1, 11)]
+    for data in contents:
+        _save(versions, data)
+
+    history = versions.list("acme", "uno_agent.py")
+    assert [item["version"] for item in history] == list(range(1, 11))
+    # Contenido completo cada 4 versiones, el resto deltas
+    kinds = [item["kind"] for item in history]
+    assert kinds[:6] == ["full", "delta", "delta", "delta", "full", "delta"]
+    for number, data in enumerate(contents, start=1):
+        assert versions.get("acme", "uno_agent.py", number) == data
+
+    deltas = [item for item in history if item["kind"] == "delta"]
+    assert max(item["stored_bytes"] for item in deltas) * 10 < len(contents[0])
+
+
+def test_record_skips_identical_content(versions: AgentVersions) -> None:
+    assert _save(versions, _code(1))["version"] == 1
+    assert _save(versions, _code(1)) is None
+    assert len(versions.list("acme", "uno_agent.py")) == 1
+
+
+def test_record_adopts_existing_file_and_reconstructs_base(versions: AgentVersions) -> None:
+    versions.store.put("acme", "uno_agent.py", _code(1))
+    _save(versions, _code(2))
+    assert [item["version"] for item in versions.list("acme", "uno_agent.py")] == [1, 2]
+    assert versions.get("acme", "uno_agent.py", 1) == _code(1)
+
+    # Escritura externa: el delta se calcula contra la última versión registrada
+    versions.store.put("acme", "uno_agent.py", b"editado a mano\n")
+    versions.record("acme", "uno_agent.py", _code(3))
+    assert versions.get("acme", "uno_agent.py", 3) == _code(3)
+
+
+def test_diff_and_missing_versions(versions: AgentVersions) -> None:
+    _save(versions, _code(1))
+    _save(versions, _code(2))
+
+    diff = versions.diff("acme", "uno_agent.py", 1, 2)
+    assert diff.startswith("--- uno_agent.py@1\n+++ uno_agent.py@2\n")
+    assert "-\"\"\"Agente v1\"\"\"" in diff and "+linea_2 = 'v2'" in diff
+    with pytest.raises(KeyError):
+        versions.get("acme", "uno_agent.py", 3)
+    assert versions.list("otro", "uno_agent.py") == []
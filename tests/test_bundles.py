@@ -0,0 +1,60 @@
+"""Tests unitarios para el empaquetado en streaming de agentes."""
+
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.infrastructure.api import bundles
+
+
+@pytest.fixture
+def agent_files(tmp_path: Path) -> List[Path]:
+    paths = []
+    for index, size in enumerate([0, 100, 513, 200_000]):
+        path = tmp_path / f"agente_{index}_agent.py"
+        path.write_bytes(bytes(i % 251 for i in range(size)))
+        paths.append(path)
+    return paths
+
+
+def test_iter_tar_roundtrip(agent_files: List[Path]) -> None:
+    data = b"".join(bundles.iter_tar(agent_files))
+
+    assert len(data) % tarfile.BLOCKSIZE == 0
+    with tarfile.open(fileobj=io.BytesIO(data)) as archive:
+        assert archive.getnames() == [path.name for path in agent_files]
+        for path in agent_files:
+            assert archive.extractfile(path.name).read() == path.read_bytes()
+
+
+def test_iter_zip_roundtrip(agent_files: List[Path]) -> None:
+    data = b"".join(bundles.iter_zip(agent_files))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [path.name for path in agent_files]
+        for path in agent_files:
+            assert archive.read(path.name) == path.read_bytes()
+
+
+def test_bundles_stream_in_blocks(agent_files: List[Path], monkeypatch) -> None:
+    monkeypatch.setattr(bundles, "BLOCK_SIZE", 4096)
+    big = agent_files[-1].stat().st_size
+
+    tar_chunks = list(bundles.iter_tar(agent_files))
+    zip_chunks = list(bundles.iter_zip(agent_files))
+
+    # Ningún fragmento contiene el archivo grande completo
+    assert max(len(chunk) for chunk in tar_chunks) <= 4096
+    assert max(len(chunk) for chunk in zip_chunks) < big
+
+
+def test_empty_bundles_are_valid() -> None:
+    with tarfile.open(fileobj=io.BytesIO(b"".join(bundles.iter_tar([])))) as archive:
+        assert archive.getnames() == []
+    with zipfile.ZipFile(io.BytesIO(b"".join(bundles.iter_zip([])))) as archive:
+        assert archive.namelist() == []
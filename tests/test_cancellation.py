@@ -0,0 +1,93 @@
+"""Tests unitarios para la cancelación por desconexión del cliente."""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.api import cancellation
+from src.infrastructure.api.cancellation import (
+    ClientDisconnected,
+    run_cancellable,
+    stream_cancellable,
+)
+
+
+class FakeRequest:
+    """Solicitud que se desconecta tras ``after`` comprobaciones."""
+
+    def __init__(self, after: int = 10**9):
+        self.after = after
+        self.checks = 0
+
+    async def is_disconnected(self) -> bool:
+        self.checks += 1
+        return self.checks > self.after
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(cancellation, "DISCONNECT_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(cancellation, "cancellation_stats", cancellation.CancellationStats())
+
+
+def test_run_cancellable_returns_result_when_connected() -> None:
+    async def work():
+        await asyncio.sleep(0.02)
+        return "plan"
+
+    assert asyncio.run(run_cancellable(FakeRequest(), "plan", work())) == "plan"
+    assert cancellation.cancellation_stats.stats() == {}
+
+
+def test_run_cancellable_cancels_work_on_disconnect() -> None:
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def scenario():
+        with pytest.raises(ClientDisconnected):
+            await run_cancellable(FakeRequest(after=2), "plan", work())
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert cancelled == [True]
+    assert cancellation.cancellation_stats.stats() == {"plan": 1}
+
+
+def test_stream_cancellable_stops_upstream_stream() -> None:
+    closed = []
+
+    async def events():
+        try:
+            for index in range(100):
+                await asyncio.sleep(0.01)
+                yield index
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        received = [item async for item in stream_cancellable(FakeRequest(after=3), "stream", events())]
+        await asyncio.sleep(0.01)
+        return received
+
+    received = asyncio.run(scenario())
+    assert 0 < len(received) < 100
+    assert closed == [True]
+    assert cancellation.cancellation_stats.stats() == {"stream": 1}
+
+
+def test_stream_cancellable_passes_through_complete_stream() -> None:
+    async def events():
+        for index in range(3):
+            yield index
+
+    async def scenario():
+        return [item async for item in stream_cancellable(FakeRequest(), "stream", events())]
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+    assert cancellation.cancellation_stats.stats() == {}
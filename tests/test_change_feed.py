@@ -0,0 +1,120 @@
+"""Tests unitarios para el feed de cambios de agentes generados."""
+
+import asyncio
+import os
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from src.infrastructure.api.change_feed import ChangeFeed
+from src.infrastructure.storage.agent_store import DEFAULT_TENANT, LocalAgentStore
+
+
+@pytest.fixture
+def feed(tmp_path: Path) -> ChangeFeed:
+    # Archivos sueltos en la raíz: tenant por defecto del almacenamiento local
+    store = LocalAgentStore(tmp_path)
+    return ChangeFeed(
+        list_entries=lambda: store.list(DEFAULT_TENANT),
+        stat_entry=lambda filename: store.stat(DEFAULT_TENANT, filename),
+        version_of=lambda entries: str(sorted((e.filename, e.version) for e in entries)),
+        poll_interval=0.01,
+        history_size=4,
+    )
+
+
+def _types(events: List[dict]) -> List[str]:
+    return [event["type"] for event in events]
+
+
+def test_scan_detects_created_updated_deleted(tmp_path: Path, feed: ChangeFeed) -> None:
+    agent = tmp_path / "uno_agent.py"
+    agent.write_text("a")
+    assert feed.scan() == []  # línea base
+
+    (tmp_path / "dos_agent.py").write_text("b")
+    agent.write_text("aa")
+    events = feed.scan()
+    assert sorted(_types(events)) == ["created", "updated"]
+    assert [event["seq"] for event in events] == [1, 2]
+    assert events[-1]["manifest_version"] == feed.stats()["manifest_version"]
+
+    agent.unlink()
+    (deleted,) = feed.scan()
+    assert deleted["type"] == "deleted" and deleted["filename"] == "uno_agent.py"
+    assert feed.scan() == []
+
+
+def test_notify_publishes_single_file(tmp_path: Path, feed: ChangeFeed) -> None:
+    agent = tmp_path / "uno_agent.py"
+    assert feed.notify(agent.name) == []  # sin suscriptores no hay línea base
+
+    feed.scan()
+    agent.write_text("codigo")
+    (created,) = feed.notify(agent.name)
+    assert created["type"] == "created" and created["size_bytes"] == 6
+    assert feed.notify(agent.name) == []  # sin cambios
+    # El escaneo siguiente ya conoce el archivo
+    assert feed.scan() == []
+    assert feed.stats()["scans"] == 2
+
+
+def test_subscribe_replays_and_resets(tmp_path: Path, feed: ChangeFeed) -> None:
+    feed.scan()
+    for index in range(3):
+        feed.notify(_write(tmp_path, f"a{index}_agent.py").name)
+
+    async def first(last_seq):
+        events = feed.subscribe(last_seq)
+        received = [await events.__anext__()]
+        while received[-1]["type"] not in ("manifest", "reset"):
+            received.append(await events.__anext__())
+        await events.aclose()
+        return received
+
+    assert _types(asyncio.run(first(None))) == ["manifest"]
+    assert _types(asyncio.run(first(1))) == ["created", "created", "manifest"]
+
+    for index in range(3, 8):
+        feed.notify(_write(tmp_path, f"a{index}_agent.py").name)
+    # El historial (4 eventos) ya no tiene lo posterior al evento 1
+    (reset,) = asyncio.run(first(1))
+    assert reset["type"] == "reset" and reset["total"] == 8
+
+
+def test_subscriber_receives_notified_and_watched_changes(tmp_path: Path, feed: ChangeFeed) -> None:
+    async def scenario():
+        events = feed.subscribe(heartbeat=5)
+        manifest = await events.__anext__()
+        await asyncio.to_thread(feed.notify, _write(tmp_path, "uno_agent.py").name)
+        created = await events.__anext__()
+        # Escritura externa: la detecta el observador
+        os.remove(tmp_path / "uno_agent.py")
+        deleted = await asyncio.wait_for(events.__anext__(), 2)
+        stats = feed.stats()
+        await events.aclose()
+        return manifest, created, deleted, stats
+
+    manifest, created, deleted, stats = asyncio.run(scenario())
+    assert (manifest["type"], created["type"], deleted["type"]) == ("manifest", "created", "deleted")
+    assert stats["subscribers"] == 1
+    assert feed.stats()["subscribers"] == 0
+
+
+def test_subscribe_heartbeat(feed: ChangeFeed) -> None:
+    async def scenario():
+        events = feed.subscribe(heartbeat=0.01)
+        received = [await events.__anext__(), await events.__anext__()]
+        await events.aclose()
+        return received
+
+    manifest, heartbeat = asyncio.run(scenario())
+    assert manifest["type"] == "manifest"
+    assert heartbeat is None
+
+
+def _write(directory: Path, name: str) -> Path:
+    path = directory / name
+    path.write_text(name)
+    return path
@@ -0,0 +1,70 @@
+"""Tests unitarios para las sesiones de aclaración."""
+
+from src.application.services.clarification import (
+    MAX_TURNS,
+    ClarificationSession,
+    SessionStore,
+)
+
+
+def test_session_accumulates_conversation_like_interactive_mode() -> None:
+    session = ClarificationSession()
+    session.add_user_message("Un agente de noticias")
+    session.record_analysis("¿Qué fuentes prefieres?")
+
+    assert not session.ready
+    assert session.to_dict()["status"] == "awaiting_answer"
+
+    session.add_user_message(" Hacker News ")
+    session.record_analysis("INFO_COMPLETA")
+
+    assert session.conversation == (
+        "Usuario: Un agente de noticias\n\n"
+        "Meta-Agente: ¿Qué fuentes prefieres?\n"
+        "Usuario: Hacker News"
+    )
+    assert session.last_message == "Hacker News"
+    assert session.ready
+    assert session.to_dict() == {
+        "session_id": session.id,
+        "status": "ready",
+        "question": "",
+        "turns": 2,
+        "plan": None,
+    }
+
+
+def test_session_is_ready_after_max_turns() -> None:
+    session = ClarificationSession()
+    for turn in range(MAX_TURNS):
+        session.add_user_message(f"respuesta {turn}")
+        session.record_analysis("¿Algo más?")
+
+    assert session.ready
+    assert session.turns == MAX_TURNS
+
+
+def test_store_evicts_least_recently_used() -> None:
+    store = SessionStore(max_sessions=2)
+    first = store.create()
+    second = store.create()
+
+    # Consultar la primera la marca como reciente
+    assert store.get(first.id) is first
+    store.create()
+
+    assert len(store) == 2
+    assert store.get(second.id) is None
+    assert store.get(first.id) is first
+
+
+def test_store_expires_idle_sessions_and_deletes() -> None:
+    store = SessionStore(ttl_seconds=60)
+    idle = store.create()
+    active = store.create()
+    idle.updated_at -= 120
+
+    assert store.get(idle.id) is None
+    assert store.get(active.id) is active
+    assert store.delete(active.id)
+    assert not store.delete(active.id)
@@ -0,0 +1,79 @@
+"""Tests unitarios para el middleware de compresión."""
+
+import asyncio
+import zlib
+
+import httpx
+
+from src.infrastructure.api import compression
+from src.infrastructure.api.compression import CompressionMiddleware, negotiate_encoding
+
+
+def _app(body: bytes, content_type: bytes = b"application/json", chunks: int = 1, extra=()):
+    async def app(scope, receive, send):
+        headers = [(b"content-type", content_type), (b"etag", b'"abc"'), *extra]
+        if chunks == 1:
+            headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        for index in range(chunks):
+            await send({"type": "http.response.body", "body": body, "more_body": index < chunks - 1})
+
+    return CompressionMiddleware(app, minimum_size=100)
+
+
+async def _get(app, accept_encoding: str) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        request = client.build_request("GET", "/", headers={"Accept-Encoding": accept_encoding})
+        response = await client.send(request, stream=True)
+        await response.aread()
+        return response
+
+
+def test_negotiate_encoding(monkeypatch) -> None:
+    monkeypatch.setattr(compression, "brotli", None)
+
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("br;q=1.0, gzip;q=0.5") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("*") == "gzip"
+    assert negotiate_encoding("") is None
+
+
+def test_compresses_large_json_and_tags_etag(monkeypatch) -> None:
+    monkeypatch.setattr(compression, "brotli", None)
+    body = b'{"code": "' + b"x" * 5000 + b'"}'
+
+    response = asyncio.run(_get(_app(body), "gzip"))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == '"abc-gzip"'
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(body)
+    assert response.content == body
+
+
+def test_streams_are_flushed_per_chunk(monkeypatch) -> None:
+    monkeypatch.setattr(compression, "brotli", None)
+    frame = b'data: {"type":"code_chunk"}\n\n'
+
+    response = asyncio.run(_get(_app(frame, b"text/event-stream", chunks=3), "gzip"))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == frame * 3
+
+    # Cada fragmento comprimido se puede descomprimir por sí solo (Z_SYNC_FLUSH)
+    compressor = compression._Compressor("gzip", 6, 4)
+    decompressor = zlib.decompressobj(31)
+    assert decompressor.decompress(compressor.compress(frame, flush=True)) == frame
+
+
+def test_skips_small_ranged_and_other_types() -> None:
+    small = asyncio.run(_get(_app(b"{}"), "gzip"))
+    ranged = asyncio.run(_get(_app(b"x" * 500, extra=[(b"accept-ranges", b"bytes")]), "gzip"))
+    python = asyncio.run(_get(_app(b"x" * 500, b"text/x-python"), "gzip"))
+    identity = asyncio.run(_get(_app(b"x" * 500), "identity"))
+
+    for response in (small, ranged, python, identity):
+        assert "content-encoding" not in response.headers
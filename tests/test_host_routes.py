@@ -0,0 +1,90 @@
+"""Tests de las rutas del host de agentes generados."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infrastructure.api import host_routes
+from src.infrastructure.storage.agent_store import get_agent_store
+
+ECHO_AGENT = b'''
+class Eco:
+    def arun(self, prompt, stream=False, **kwargs):
+        return self._stream(prompt) if stream else self._run(prompt, kwargs)
+
+    async def _run(self, prompt, kwargs):
+        if prompt == "falla":
+            raise RuntimeError("sin cuota")
+        return type("Respuesta", (), {"content": f"{prompt.upper()} {kwargs['session_id']}"})()
+
+    async def _stream(self, prompt):
+        for palabra in prompt.split():
+            yield type("Evento", (), {"content": palabra})()
+
+
+def crear_agente():
+    return Eco()
+'''
+
+
+@pytest.fixture
+def client(local_storage, make_client, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(host_routes, "_pools", {})
+    get_agent_store().put("acme", "eco_agent.py", ECHO_AGENT)
+    return make_client(host_routes.router, "/api/agent-host")
+
+
+def test_list_agents_is_tenant_scoped(client: TestClient) -> None:
+    acme = client.get("/api/agent-host/agents", headers={"X-Tenant-ID": "acme"}).json()
+    default = client.get("/api/agent-host/agents").json()
+
+    assert acme["agents"] == [{"name": "eco", "filename": "eco_agent.py"}]
+    assert acme["pool"]["size"] == 0
+    assert default["total"] == 0
+    assert client.get("/api/agent-host/agents", headers={"X-Tenant-ID": "../x"}).status_code == 422
+
+
+def test_run_agent_reuses_pool(client: TestClient) -> None:
+    headers = {"X-Tenant-ID": "acme"}
+    body = {"prompt": "hola", "session_id": "s1"}
+
+    first = client.post("/api/agent-host/run/eco", json=body, headers=headers)
+    second = client.post("/api/agent-host/run/eco", json=body, headers=headers)
+    listed = client.get("/api/agent-host/agents", headers=headers).json()
+
+    assert first.json() == {"agent": "eco", "content": "HOLA s1"}
+    assert second.status_code == 200
+    assert listed["loaded"] == ["eco"]
+    assert (listed["pool"]["misses"], listed["pool"]["hits"]) == (1, 1)
+    # Las ejecuciones terminadas liberan su reserva
+    assert host_routes.get_pool("acme")._leases == {}
+
+
+def test_run_agent_streams_events(client: TestClient, sse_events) -> None:
+    response = client.post(
+        "/api/agent-host/run/eco",
+        json={"prompt": "hola mundo", "stream": True},
+        headers={"X-Tenant-ID": "acme"},
+    )
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert sse_events(response) == [
+        {"type": "content", "content": "hola"},
+        {"type": "content", "content": "mundo"},
+        {"type": "complete", "agent": "eco"},
+    ]
+    assert host_routes.get_pool("acme")._leases == {}
+
+
+def test_run_agent_errors(client: TestClient) -> None:
+    headers = {"X-Tenant-ID": "acme"}
+    get_agent_store().put("acme", "viejo_agent.py", b"x = 1\n")
+
+    missing = client.post("/api/agent-host/run/eco", json={"prompt": "hola"})
+    broken = client.post("/api/agent-host/run/viejo", json={"prompt": "hola"}, headers=headers)
+    failed = client.post("/api/agent-host/run/eco", json={"prompt": "falla"}, headers=headers)
+
+    assert missing.status_code == 404
+    assert broken.status_code == 500
+    assert "crear_agente" in broken.json()["detail"]
+    assert failed.status_code == 500
+    assert "sin cuota" in failed.json()["detail"]
@@ -0,0 +1,33 @@
+"""Tests unitarios para ETags y peticiones condicionales."""
+
+from src.infrastructure.api.http_cache import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_stable_and_quoted() -> None:
+    etag = make_etag({"b": 1, "a": 2}, "python")
+
+    assert etag == make_etag({"a": 2, "b": 1}, "python")
+    assert etag != make_etag({"a": 2, "b": 1}, "spec")
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_etag_matches_variants() -> None:
+    etag = make_etag("plan")
+    opaque = etag.strip('"')
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"otro", W/{etag}', etag)
+    # Variantes comprimidas del mismo recurso
+    assert etag_matches(f'"{opaque}-gzip"', etag)
+    assert etag_matches(f'"{opaque}-br"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"otro"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_not_modified_response() -> None:
+    response = not_modified('"abc"')
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == '"abc"'
+    assert response.body == b""
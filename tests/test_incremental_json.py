@@ -0,0 +1,45 @@
+"""Tests unitarios para el parser incremental de JSON."""
+
+import json
+
+from src.application.services.incremental_json import IncrementalJsonObject
+
+
+def _feed_in_chunks(text: str, size: int) -> list:
+    parser = IncrementalJsonObject()
+    fields = []
+    for index in range(0, len(text), size):
+        fields.extend(parser.feed(text[index : index + size]))
+    return fields
+
+
+def test_fields_are_emitted_as_soon_as_complete() -> None:
+    parser = IncrementalJsonObject()
+
+    assert parser.feed('```json\n{"nombre": "Bus') == []
+    assert parser.feed('cador", "herramientas": ["web",') == [("nombre", "Buscador")]
+    assert parser.feed(' "yfinance"], "nivel": 2') == [("herramientas", ["web", "yfinance"])]
+    assert parser.feed("}\n```") == [("nivel", 2)]
+    assert parser.done
+
+
+def test_any_chunking_yields_same_fields() -> None:
+    plan = {
+        "nombre": 'Agente "citado" {raro}',
+        "rol": "Usa , : y ] dentro de strings \\ escapes",
+        "miembros_equipo": [{"nombre": "A", "herramientas": ["x"]}],
+        "es_equipo": True,
+        "nivel": 4,
+        "ejemplo_uso": None,
+    }
+    text = 'Aquí va el "plan":\n' + json.dumps(plan, ensure_ascii=False, indent=2)
+
+    for size in (1, 3, 7, len(text)):
+        assert _feed_in_chunks(text, size) == list(plan.items())
+
+
+def test_ignores_text_after_object() -> None:
+    parser = IncrementalJsonObject()
+
+    assert parser.feed('{"a": 1} {"b": 2}') == [("a", 1)]
+    assert parser.feed(', "c": 3}') == []
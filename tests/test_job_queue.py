@@ -0,0 +1,143 @@
+"""Tests unitarios para `JobQueue`."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.infrastructure.runtime.job_queue import JobQueue, QueueFullError
+
+
+def _wait_for(queue: JobQueue, job_id: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo {job_id} no terminó")
+
+
+class TestJobQueue:
+    def test_runs_jobs_by_priority_then_fifo(self, tmp_path: Path) -> None:
+        order = []
+        queue = JobQueue(tmp_path / "jobs.sqlite3", lambda payload: order.append(payload["n"]) or {})
+
+        batch = queue.submit({"n": "batch"}, "batch")
+        first = queue.submit({"n": "normal-1"})
+        second = queue.submit({"n": "normal-2"})
+        urgent = queue.submit({"n": "interactive"}, "interactive")
+
+        assert urgent["position"] == 0
+        assert batch["position"] == 0
+        assert queue.get(batch["job_id"])["position"] == 3
+
+        queue.workers = 1
+        queue.start()
+        for job in (batch, first, second, urgent):
+            _wait_for(queue, job["job_id"])
+        queue.stop()
+
+        assert order == ["interactive", "normal-1", "normal-2", "batch"]
+
+    def test_stores_result_and_error(self, tmp_path: Path) -> None:
+        def runner(payload):
+            if payload.get("fail"):
+                raise RuntimeError("sin cuota")
+            return {"filename": "demo_agent.py"}
+
+        queue = JobQueue(tmp_path / "jobs.sqlite3", runner)
+        queue.start()
+        ok = _wait_for(queue, queue.submit({})["job_id"])
+        failed = _wait_for(queue, queue.submit({"fail": True})["job_id"])
+        queue.stop()
+
+        assert ok["result"] == {"filename": "demo_agent.py"}
+        assert failed["status"] == "failed"
+        assert failed["error"] == "sin cuota"
+        assert queue.stats()["done"] == 1
+
+    def test_bounded_queue_reserves_room_for_interactive(self, tmp_path: Path) -> None:
+        queue = JobQueue(tmp_path / "jobs.sqlite3", lambda payload: {}, max_pending=3)
+
+        queue.submit({}, "batch")
+        queue.submit({}, "normal")
+        with pytest.raises(QueueFullError):
+            queue.submit({}, "batch")
+        queue.submit({}, "interactive")
+        with pytest.raises(QueueFullError):
+            queue.submit({}, "interactive")
+        with pytest.raises(ValueError):
+            queue.submit({}, "urgente")
+
+        assert queue.stats()["rejected"] == 2
+
+    def test_interrupted_jobs_survive_restart(self, tmp_path: Path) -> None:
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(payload):
+            started.set()
+            release.wait(5)
+            return {}
+
+        db_path = tmp_path / "jobs.sqlite3"
+        queue = JobQueue(db_path, slow, workers=1)
+        queue.start()
+        running = queue.submit({"n": 1})
+        pending = queue.submit({"n": 2})
+        assert started.wait(5)
+
+        # Simular una caída: otra instancia abre la misma base de datos
+        restored = JobQueue(db_path, lambda payload: {"n": payload["n"]})
+        assert restored.get(running["job_id"])["status"] == "queued"
+        restored.start()
+        assert _wait_for(restored, running["job_id"])["result"] == {"n": 1}
+        assert _wait_for(restored, pending["job_id"])["result"] == {"n": 2}
+        restored.stop()
+        release.set()
+        queue.stop()
+
+    def test_migrates_queue_without_tenants(self, tmp_path: Path) -> None:
+        db = sqlite3.connect(tmp_path / "jobs.sqlite3")
+        db.execute(
+            "CREATE TABLE jobs (seq INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT UNIQUE NOT NULL, "
+            "priority INTEGER NOT NULL, status TEXT NOT NULL, payload TEXT NOT NULL, result TEXT, "
+            "error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+        )
+        db.execute(
+            "INSERT INTO jobs (id, priority, status, payload, created_at) "
+            "VALUES ('viejo', 1, 'queued', '{}', 0)"
+        )
+        db.commit()
+        db.close()
+
+        queue = JobQueue(tmp_path / "jobs.sqlite3", lambda payload: {})
+
+        assert queue.get("viejo", "default")["tenant"] == "default"
+        assert queue.get("viejo", "acme") is None
+        assert queue.cancel("viejo", "acme") is None
+        assert queue.cancel("viejo")["status"] == "cancelled"
+        assert queue.stats()["cancelled"] == 1
+
+    def test_stats_by_tenant_and_prunes_finished_jobs(self, tmp_path: Path) -> None:
+        db_path = tmp_path / "jobs.sqlite3"
+        queue = JobQueue(db_path, lambda payload: {}, max_pending=2, reserved_interactive=0)
+        acme = queue.submit({}, tenant="acme")
+        queue.submit({}, tenant="otro")
+        with pytest.raises(QueueFullError):
+            queue.submit({}, tenant="acme")
+        queue.cancel(acme["job_id"], "acme")
+
+        assert queue.stats("acme")["cancelled"] == 1
+        assert queue.stats("acme")["queued"] == 0
+        assert queue.stats("otro")["queued"] == 1
+        assert queue.stats("otro")["rejected"] == 0
+        assert queue.stats()["rejected"] == 1
+
+        # Los terminados se borran pasado el TTL; los pendientes se conservan
+        restored = JobQueue(db_path, lambda payload: {}, result_ttl=0)
+        assert restored.get(acme["job_id"]) is None
+        assert restored.stats()["queued"] == 1
@@ -0,0 +1,112 @@
+"""Tests de las rutas de trabajos de generación."""
+
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.services.meta_agent import AgentPlan
+from src.infrastructure.api import job_routes
+from src.infrastructure.runtime.job_queue import JobQueue
+from src.infrastructure.storage.agent_store import get_agent_store
+
+ACME = {"X-Tenant-ID": "acme"}
+
+
+class FakeMetaAgent:
+    """Meta-agente con analyzer y planner deterministas."""
+
+    def analyze_request(self, request, conversation):
+        return "¿Qué fuentes usa?"
+
+    def create_plan(self, conversation):
+        return AgentPlan(nombre="Cobre", rol="Analista", herramientas=["web"])
+
+
+@pytest.fixture
+def queue(tmp_path: Path, local_storage, monkeypatch: pytest.MonkeyPatch) -> JobQueue:
+    monkeypatch.setattr(job_routes, "get_meta_agent", lambda: FakeMetaAgent())
+    job_queue = JobQueue(tmp_path / "jobs.sqlite3", job_routes.run_generation_job, workers=1)
+    monkeypatch.setattr(job_routes, "_queue", job_queue)
+    yield job_queue
+    job_queue.stop()
+
+
+@pytest.fixture
+def client(queue: JobQueue, make_client) -> TestClient:
+    return make_client(job_routes.router, "/api/meta-agent/jobs")
+
+
+def _wait_done(client: TestClient, job_id: str, headers: dict) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/meta-agent/jobs/{job_id}", headers=headers).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo {job_id} no terminó")
+
+
+def test_job_runs_and_saves_in_tenant(client: TestClient, queue: JobQueue) -> None:
+    submitted = client.post(
+        "/api/meta-agent/jobs", json={"request": "un analista del cobre"}, headers=ACME
+    )
+    job_id = submitted.json()["job_id"]
+
+    assert submitted.status_code == 202
+    assert submitted.json()["status"] == "queued"
+    queue.start()
+    job = _wait_done(client, job_id, ACME)
+    result = client.get(f"/api/meta-agent/jobs/{job_id}/result", headers=ACME).json()
+
+    assert (job["status"], job["tenant"]) == ("done", "acme")
+    assert "result" not in job
+    assert result["preguntas_pendientes"] == "¿Qué fuentes usa?"
+    assert result["plan"]["nombre"] == "Cobre"
+    assert [entry.filename for entry in get_agent_store().list("acme")] == [result["filename"]]
+    assert get_agent_store().list("default") == []
+    assert client.get("/api/meta-agent/jobs", headers=ACME).json()["done"] == 1
+    assert client.get("/api/meta-agent/jobs").json()["done"] == 0
+    assert client.delete(f"/api/meta-agent/jobs/{job_id}", headers=ACME).status_code == 409
+
+
+def test_jobs_are_tenant_scoped(client: TestClient) -> None:
+    job_id = client.post(
+        "/api/meta-agent/jobs", json={"request": "un agente"}, headers=ACME
+    ).json()["job_id"]
+
+    assert client.get(f"/api/meta-agent/jobs/{job_id}").status_code == 404
+    assert client.get(f"/api/meta-agent/jobs/{job_id}/result").status_code == 404
+    assert client.delete(f"/api/meta-agent/jobs/{job_id}").status_code == 404
+    assert client.get(f"/api/meta-agent/jobs/{job_id}", headers=ACME).json()["position"] == 0
+    assert client.get(f"/api/meta-agent/jobs/{job_id}/result", headers=ACME).status_code == 409
+
+
+def test_cancel_queued_job(client: TestClient, queue: JobQueue) -> None:
+    job_id = client.post(
+        "/api/meta-agent/jobs", json={"request": "un agente"}, headers=ACME
+    ).json()["job_id"]
+
+    cancelled = client.delete(f"/api/meta-agent/jobs/{job_id}", headers=ACME)
+    queue.start()
+    time.sleep(0.05)
+
+    assert cancelled.json() == {"job_id": job_id, "status": "cancelled"}
+    assert get_agent_store().list("acme") == []
+    assert client.get(f"/api/meta-agent/jobs/{job_id}", headers=ACME).json()["status"] == "cancelled"
+    assert client.delete("/api/meta-agent/jobs/nope", headers=ACME).status_code == 404
+
+
+def test_submit_validation_and_backpressure(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    assert client.post("/api/meta-agent/jobs", json={"request": "  "}).status_code == 422
+
+    full = JobQueue(tmp_path / "full.sqlite3", job_routes.run_generation_job, max_pending=1)
+    monkeypatch.setattr(job_routes, "_queue", full)
+    full.submit({"request": "x"}, "interactive")
+    rejected = client.post("/api/meta-agent/jobs", json={"request": "otro"})
+
+    assert rejected.status_code == 429
+    assert rejected.headers["retry-after"] == "30"
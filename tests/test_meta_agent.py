@@ -9,6 +9,8 @@ from unittest.mock import MagicMock
 import pytest
 
 from src.application.services.meta_agent import AgentPlan, MetaAgent
+from src.infrastructure.storage.agent_store import DEFAULT_TENANT, get_agent_store
+from src.infrastructure.storage.agent_versions import get_agent_versions
 
 
 def _ensure_stub_agno_modules() -> None:
@@ -164,6 +166,195 @@ class TestGenerateCode:
         assert plan.modelo == "deepseek-reasoner"
 
 
+class TestTeamPlanning:
+    def _skeleton(self, members: int) -> str:
+        return json.dumps(
+            _build_plan_dict(
+                es_equipo=True,
+                nivel=4,
+                miembros_equipo=[
+                    {"nombre": f"M{idx}", "rol": f"rol {idx}"} for idx in range(members)
+                ],
+            )
+        )
+
+    def test_team_members_are_elaborated_concurrently(
+        self, meta_agent: MetaAgent, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import threading
+        import time
+
+        meta_agent.planner_agent.run.return_value = SimpleNamespace(content=self._skeleton(6))
+        meta_agent.max_member_concurrency = 3
+        lock = threading.Lock()
+        active = {"now": 0, "max": 0}
+
+        def run(prompt: str):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            name = prompt.split('Detalla el miembro "')[1].split('"')[0]
+            detail = {
+                "rol": f"rol detallado {name}",
+                "herramientas": ["web", "search"],
+                "instrucciones": ["Sé breve", "Sé breve"],
+            }
+            return SimpleNamespace(content=f"```json\n{json.dumps(detail)}\n```")
+
+        monkeypatch.setattr(
+            meta_agent, "_create_member_planner", lambda: SimpleNamespace(run=run)
+        )
+
+        plan = meta_agent.create_plan("Equipo de investigación")
+
+        assert active["max"] == 3
+        assert [m["nombre"] for m in plan.miembros_equipo] == [f"M{idx}" for idx in range(6)]
+        assert plan.miembros_equipo[2] == {
+            "nombre": "M2",
+            "rol": "rol detallado M2",
+            "herramientas": ["duckduckgo"],
+            "instrucciones": ["Sé breve"],
+        }
+
+    def test_failed_member_keeps_skeleton(
+        self, meta_agent: MetaAgent, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        meta_agent.planner_agent.run.return_value = SimpleNamespace(content=self._skeleton(2))
+
+        def run(prompt: str):
+            if '"M1"' in prompt:
+                return SimpleNamespace(content="sin json")
+            return SimpleNamespace(content='{"herramientas": "reasoning"}')
+
+        monkeypatch.setattr(
+            meta_agent, "_create_member_planner", lambda: SimpleNamespace(run=run)
+        )
+
+        plan = meta_agent.create_plan("Equipo")
+
+        assert plan.miembros_equipo[0]["herramientas"] == ["reasoning"]
+        assert plan.miembros_equipo[0]["rol"] == "rol 0"
+        assert plan.miembros_equipo[1] == {"nombre": "M1", "rol": "rol 1"}
+
+    def test_async_plan_elaborates_members_as_cancellable_tasks(
+        self, meta_agent: MetaAgent, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        import asyncio
+
+        monkeypatch.setenv("LLM_REQUESTS_PER_SECOND", "1000")
+        meta_agent.max_member_concurrency = 2
+        active = {"now": 0, "max": 0}
+        cancelled = []
+        block = {"members": False}
+
+        async def planner_arun(prompt):
+            return SimpleNamespace(content=self._skeleton(4))
+
+        async def member_arun(prompt):
+            name = prompt.split('Detalla el miembro "')[1].split('"')[0]
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+            try:
+                await asyncio.sleep(3600 if block["members"] else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+            finally:
+                active["now"] -= 1
+            return SimpleNamespace(content=json.dumps({"rol": f"rol detallado {name}"}))
+
+        meta_agent.planner_agent.arun = planner_arun
+        monkeypatch.setattr(
+            meta_agent, "_create_member_planner", lambda: SimpleNamespace(arun=member_arun)
+        )
+
+        async def cancel_midway():
+            block["members"] = True
+            task = asyncio.create_task(meta_agent.acreate_plan("Equipo"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        plan = asyncio.run(meta_agent.acreate_plan("Equipo"))
+
+        assert active["max"] == 2
+        assert [m["rol"] for m in plan.miembros_equipo] == [f"rol detallado M{idx}" for idx in range(4)]
+
+        asyncio.run(cancel_midway())
+
+        # Se cancelan las llamadas en curso y las que esperaban lugar no empiezan
+        assert sorted(cancelled) == ["M0", "M1"]
+        assert active["now"] == 0
+
+
+class TestCanonicalPlan:
+    def test_canonical_resolves_aliases_and_dedupes(self) -> None:
+        plan = AgentPlan(
+            **_build_plan_dict(
+                modelo=" GPT-4o ",
+                herramientas=["web", "DuckDuckGo", "stock", "finance", "reasoning", "web "],
+                instrucciones=["Sé útil", "  Sé   útil", "Cita fuentes", ""],
+            )
+        )
+
+        canonical = plan.canonical()
+
+        assert canonical.herramientas == ["duckduckgo", "reasoning", "yfinance"]
+        assert canonical.instrucciones == ["Sé útil", "Cita fuentes"]
+        assert canonical.modelo == "gpt-4o"
+        assert plan.herramientas[0] == "web"
+
+    def test_canonical_normalizes_members_and_steps(self) -> None:
+        plan = AgentPlan(
+            **_build_plan_dict(
+                es_equipo=True,
+                miembros_equipo=[
+                    {"nombre": " A ", "rol": "r", "herramientas": ["search", "web"], "modelo": "Claude"}
+                ],
+                pasos_workflow=[
+                    {"nombre": "b", "herramientas": ["stock"], "depende_de": ["a", "a"]},
+                    {"nombre": "a"},
+                ],
+            )
+        )
+
+        canonical = plan.canonical()
+
+        assert canonical.miembros_equipo == [
+            {"nombre": "A", "rol": "r", "herramientas": ["duckduckgo"], "modelo": "claude-sonnet-4-20250514"}
+        ]
+        assert canonical.pasos_workflow[0].depende_de == ["a"]
+        assert canonical.pasos_workflow[0].herramientas == ["yfinance"]
+
+    def test_workflow_steps_are_validated(self) -> None:
+        plan = AgentPlan(
+            **_build_plan_dict(
+                pasos_workflow=[{"nombre": "buscar"}, {"nombre": "resumir", "depende_de": "buscar"}]
+            )
+        )
+        assert plan.pasos_workflow[1].depende_de == ["buscar"]
+
+        for pasos in (
+            [{"nombre": "a", "depende_de": ["zeta"]}],
+            [{"nombre": "a", "depende_de": ["b"]}, {"nombre": "b", "depende_de": ["a"]}],
+            [{"nombre": "a", "depende_de": ["a"]}],
+            [{"nombre": "a"}, {"nombre": "a"}],
+        ):
+            with pytest.raises(ValueError):
+                AgentPlan(**_build_plan_dict(pasos_workflow=pasos))
+
+    def test_equivalent_plans_share_canonical_form(self) -> None:
+        first = AgentPlan(**_build_plan_dict(herramientas=["finance", "web"]))
+        second = AgentPlan(**_build_plan_dict(herramientas=["duckduckgo", "yfinance", "search"]))
+
+        assert first.canonical() == second.canonical()
+        assert first.canonical().canonical() == first.canonical()
+
+
 class TestInteractiveCreation:
     def test_interactive_creation_generates_agent_file(
         self,
@@ -196,14 +387,17 @@ class TestInteractiveCreation:
         stub_console = SimpleNamespace(print=lambda *args, **kwargs: None)
         monkeypatch.setattr(meta_agent_module, "console", stub_console)
         monkeypatch.setattr("os.getcwd", lambda: str(tmp_path))
+        monkeypatch.setenv("AGENT_STORAGE", "local")
+        monkeypatch.delenv("GENERATED_AGENTS_DIR", raising=False)
 
         meta_agent.interactive_creation()
 
-        expected_file = (
-            tmp_path / "generated" / "agents" / "agente_interactivo_agent.py"
-        )
-        assert expected_file.exists()
-        assert expected_file.read_text(encoding="utf-8") == "print('listo')\n"
+        store = get_agent_store()
+        [entry] = store.list(DEFAULT_TENANT)
+        assert store.root == tmp_path / "generated" / "agents"
+        assert entry.filename.startswith("agente_interactivo_")
+        assert store.read(DEFAULT_TENANT, entry.filename) == b"print('listo')\n"
+        assert len(get_agent_versions().list(DEFAULT_TENANT, entry.filename)) == 1
 
         assert "Necesito un agente interactivo" in captured_conversation.get(
             "value", ""
@@ -296,4 +490,71 @@ def meta_agent(monkeypatch: pytest.MonkeyPatch) -> MetaAgent:
 
     monkeypatch.setattr("src.application.services.meta_agent.Agent", FakeAgent)
     monkeypatch.setattr("src.application.services.meta_agent.DeepSeek", FakeDeepSeek)
+    # Limitadores nuevos por test para no heredar el consumo de otros
+    monkeypatch.setattr("src.application.services.rate_limiter._limiters", {})
     return MetaAgent()
+
+
+class TestStreamPlan:
+    def test_astream_plan_emits_fields_then_plan(self, meta_agent: MetaAgent) -> None:
+        import asyncio
+
+        content = json.dumps(_build_plan_dict(nombre="Plan Stream", herramientas=["web"]))
+        chunks = [content[index : index + 20] for index in range(0, len(content), 20)]
+
+        async def fake_arun(prompt, stream=False):
+            yield SimpleNamespace(reasoning_content="pensando", content=None)
+            for chunk in chunks:
+                yield SimpleNamespace(content=chunk)
+
+        meta_agent.planner_agent.arun = fake_arun
+
+        async def collect():
+            return [event async for event in meta_agent.astream_plan("Conversación")]
+
+        events = asyncio.run(collect())
+        types = [event["type"] for event in events]
+        fields = [event for event in events if event["type"] == "field"]
+
+        assert types[0] == "reasoning"
+        assert types[-1] == "plan"
+        assert fields[0] == {"type": "field", "name": "nombre", "value": "Plan Stream"}
+        # El primer campo llega antes de terminar la respuesta
+        assert types.index("field") < len(chunks)
+        assert events[-1]["plan"]["herramientas"] == ["duckduckgo"]
+
+    def test_astream_analysis_yields_content_chunks(self, meta_agent: MetaAgent) -> None:
+        import asyncio
+
+        prompts = []
+
+        async def fake_arun(prompt, stream=False):
+            prompts.append(prompt)
+            yield SimpleNamespace(content="¿Qué ")
+            yield SimpleNamespace(content=None)
+            yield SimpleNamespace(content="fuentes?")
+
+        meta_agent.analyzer_agent.arun = fake_arun
+
+        async def collect():
+            return [chunk async for chunk in meta_agent.astream_analysis("Noticias", "Usuario: Noticias")]
+
+        assert asyncio.run(collect()) == ["¿Qué ", "fuentes?"]
+        assert "Usuario: Noticias" in prompts[0]
+
+    def test_astream_analysis_charges_reported_usage(self, meta_agent: MetaAgent) -> None:
+        import asyncio
+
+        async def fake_arun(prompt, stream=False):
+            yield SimpleNamespace(content="INFO_COMPLETA")
+            yield SimpleNamespace(content=None, metrics=SimpleNamespace(total_tokens=5000))
+
+        meta_agent.analyzer_agent.arun = fake_arun
+        limiter = meta_agent._limiter(meta_agent.analysis_model)
+
+        async def collect():
+            return [chunk async for chunk in meta_agent.astream_analysis("Noticias")]
+
+        assert asyncio.run(collect()) == ["INFO_COMPLETA"]
+        # Se cobra el consumo informado al cerrar el stream, no solo la estimación
+        assert limiter.tokens.tokens < limiter.tokens.capacity - 4000
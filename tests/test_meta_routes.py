@@ -0,0 +1,92 @@
+"""Tests de las rutas de generación del meta-agente."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infrastructure.api import meta_routes
+from src.infrastructure.storage.agent_store import get_agent_store
+
+ACME = {"X-Tenant-ID": "acme"}
+PLAN = {"nombre": " Cobre ", "rol": "Analista", "herramientas": ["Web", "duckduckgo"]}
+
+
+@pytest.fixture
+def client(local_storage, make_client) -> TestClient:
+    return make_client(meta_routes.router, "/api/meta-agent")
+
+
+def test_generate_stream_saves_canonical_plan(client: TestClient, sse_events) -> None:
+    generated = client.post("/api/meta-agent/generate", json={"plan": PLAN}, headers=ACME).json()
+    streamed = client.post("/api/meta-agent/generate-stream", json={"plan": PLAN}, headers=ACME)
+    events = sse_events(streamed)
+    code = "".join(event["content"] for event in events if event["type"] == "code_chunk")
+
+    assert events[-1]["type"] == "complete"
+    assert events[-1]["filename"] == generated["filename"]
+    assert code == generated["code"]
+    assert [entry.filename for entry in get_agent_store().list("acme")] == [generated["filename"]]
+    assert get_agent_store().read("acme", generated["filename"]).decode("utf-8") == code
+
+
+def test_generate_always_saves_despite_if_none_match(client: TestClient) -> None:
+    first = client.post("/api/meta-agent/generate", json={"plan": PLAN}, headers=ACME)
+    filename = first.json()["filename"]
+    get_agent_store().delete("acme", filename)
+
+    again = client.post(
+        "/api/meta-agent/generate",
+        json={"plan": PLAN},
+        headers={**ACME, "If-None-Match": first.headers["etag"]},
+    )
+
+    assert again.status_code == 200
+    assert again.headers["etag"] == first.headers["etag"]
+    assert [entry.filename for entry in get_agent_store().list("acme")] == [filename]
+
+
+def _resume(client: TestClient, body: dict, last_event_id: str):
+    return client.post(
+        "/api/meta-agent/generate-stream",
+        json=body,
+        headers={**ACME, "Last-Event-ID": last_event_id},
+    )
+
+
+def test_generate_stream_resume_checks_request_and_saves_once(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, sse_events
+) -> None:
+    saved = []
+    save = meta_routes.save_agent_file
+    monkeypatch.setattr(
+        meta_routes, "save_agent_file", lambda *args: saved.append(args) or save(*args)
+    )
+    streamed = client.post("/api/meta-agent/generate-stream", json={"plan": PLAN}, headers=ACME)
+    ids = [line[len("id: "):] for line in streamed.text.splitlines() if line.startswith("id: ")]
+    stream_id = ids[0].split(":")[0]
+    # Simula que el stream original sigue en curso
+    meta_routes._stream_buffer._streams[stream_id].finished = False
+
+    spliced = _resume(client, {"plan": {**PLAN, "rol": "Otro"}}, ids[1])
+    resumed = _resume(client, {"plan": PLAN}, ids[1])
+    events = sse_events(resumed)
+
+    assert spliced.status_code == 409
+    assert events[-1]["type"] == "complete"
+    assert events[-1]["filename"] == sse_events(streamed)[-1]["filename"]
+    assert len(saved) == 1
+
+
+def test_generate_stream_resume_always_reports_errors(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, sse_events
+) -> None:
+    streamed = client.post("/api/meta-agent/generate-stream", json={"plan": PLAN}, headers=ACME)
+    ids = [line[len("id: "):] for line in streamed.text.splitlines() if line.startswith("id: ")]
+    meta_routes._stream_buffer._streams[ids[0].split(":")[0]].finished = False
+
+    async def failing_render(plan, output_format="python"):
+        raise RuntimeError("plantilla rota")
+
+    monkeypatch.setattr(meta_routes, "render_agent_coalesced", failing_render)
+    events = sse_events(_resume(client, {"plan": PLAN}, ids[-1]))
+
+    assert events == [{"type": "error", "error": "plantilla rota"}]
@@ -0,0 +1,81 @@
+"""Tests unitarios para el limitador de llamadas a proveedores de LLM."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from src.application.services.rate_limiter import (
+    ProviderLimiter,
+    TokenBucket,
+    get_limiter,
+    limiter_stats,
+)
+
+
+def test_token_bucket_refills_at_rate() -> None:
+    bucket = TokenBucket(rate=10, capacity=10)
+    now = bucket.updated_at
+
+    assert bucket.wait_time(10, now) == 0
+    bucket.consume(10)
+    assert abs(bucket.wait_time(5, now) - 0.5) < 1e-6
+    assert bucket.wait_time(5, now + 0.5) == 0
+
+
+def test_requests_per_second_spaces_calls() -> None:
+    limiter = ProviderLimiter(requests_per_second=20, max_in_flight=10)
+    started = time.monotonic()
+    for _ in range(25):
+        with limiter.limit():
+            pass
+    # 20 de ráfaga inicial y 5 más a 20 por segundo
+    assert time.monotonic() - started >= 0.2
+    assert limiter.stats()["admitted"] == 25
+    assert limiter.stats()["max_wait"] > 0
+
+
+def test_max_in_flight_caps_concurrency() -> None:
+    limiter = ProviderLimiter(requests_per_second=1000, max_in_flight=2)
+    peak = []
+    lock = threading.Lock()
+    active = [0]
+
+    def call():
+        with limiter.limit():
+            with lock:
+                active[0] += 1
+                peak.append(active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_async_limit_charges_reported_usage() -> None:
+    limiter = ProviderLimiter(requests_per_second=100, tokens_per_minute=6000)
+
+    async def scenario():
+        async with limiter.alimit(100) as call:
+            call.record_usage(SimpleNamespace(metrics=SimpleNamespace(total_tokens=1100)))
+
+    asyncio.run(scenario())
+
+    # Se cobra el consumo real (1100) y no solo la estimación (100)
+    assert limiter.tokens.tokens < 6000 - 1000
+
+
+def test_limiters_are_shared_per_provider_and_model() -> None:
+    first = get_limiter("deepseek", "deepseek-chat")
+
+    assert get_limiter("deepseek", "deepseek-chat") is first
+    assert get_limiter("deepseek", "deepseek-reasoner") is not first
+    assert "deepseek:deepseek-chat" in limiter_stats()
@@ -0,0 +1,151 @@
+"""Tests de las rutas de sesiones de aclaración."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.application.services.clarification import SessionStore
+from src.application.services.meta_agent import AgentPlan
+from src.infrastructure.api import session_routes
+
+
+class FakeMetaAgent:
+    """Meta-agente con analyzer y planner deterministas."""
+
+    def __init__(self):
+        self.conversations = []
+
+    async def astream_analysis(self, message, conversation):
+        self.conversations.append(conversation)
+        if message == "falla":
+            raise RuntimeError("sin cuota")
+        if "cobre" in message:
+            yield "INFO_"
+            yield "COMPLETA"
+        else:
+            yield "¿Qué "
+            yield "fuentes?"
+
+    async def acreate_plan(self, conversation):
+        return AgentPlan(nombre="Cobre", rol="Analista")
+
+
+@pytest.fixture
+def meta_agent(monkeypatch: pytest.MonkeyPatch) -> FakeMetaAgent:
+    fake = FakeMetaAgent()
+    monkeypatch.setattr(session_routes, "get_meta_agent", lambda: fake)
+    monkeypatch.setattr(session_routes, "_store", SessionStore())
+    return fake
+
+
+@pytest.fixture
+def client(meta_agent: FakeMetaAgent, make_client) -> TestClient:
+    return make_client(session_routes.router, "/api/meta-agent/sessions")
+
+
+def test_session_lifecycle(client: TestClient, meta_agent: FakeMetaAgent) -> None:
+    created = client.post("/api/meta-agent/sessions", json={"message": "un agente"}).json()
+    session_url = f"/api/meta-agent/sessions/{created['session_id']}"
+
+    assert (created["status"], created["question"]) == ("awaiting_answer", "¿Qué fuentes?")
+    assert client.get(session_url).json()["turns"] == 1
+
+    answered = client.post(f"{session_url}/messages", json={"message": "noticias del cobre"}).json()
+    plan = client.post(f"{session_url}/plan").json()
+
+    assert answered["status"] == "ready"
+    assert meta_agent.conversations[-1].endswith(
+        "Meta-Agente: ¿Qué fuentes?\nUsuario: noticias del cobre"
+    )
+    assert plan["nombre"] == "Cobre"
+    assert client.get(session_url).json()["plan"]["nombre"] == "Cobre"
+
+    assert client.delete(session_url).json() == {"session_id": created["session_id"], "deleted": True}
+    assert client.get(session_url).status_code == 404
+    assert client.delete(session_url).status_code == 404
+
+
+def test_session_streams_analysis(client: TestClient, sse_events) -> None:
+    response = client.post(
+        "/api/meta-agent/sessions", json={"message": "un agente", "stream": True}
+    )
+    events = sse_events(response)
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [event["type"] for event in events] == ["session", "token", "token", "question"]
+    assert events[-1]["question"] == "¿Qué fuentes?"
+    assert events[-1]["session_id"] == events[0]["session_id"]
+
+
+def test_session_errors_keep_conversation(client: TestClient) -> None:
+    assert client.post("/api/meta-agent/sessions", json={"message": " "}).status_code == 422
+    assert client.post("/api/meta-agent/sessions/nope/messages", json={}).status_code == 404
+
+    session_id = client.post("/api/meta-agent/sessions", json={"message": "un agente"}).json()[
+        "session_id"
+    ]
+    failed = client.post(
+        f"/api/meta-agent/sessions/{session_id}/messages", json={"message": "falla"}
+    )
+    state = client.get(f"/api/meta-agent/sessions/{session_id}").json()
+
+    assert failed.status_code == 500
+    assert (state["turns"], state["question"]) == (1, "¿Qué fuentes?")
+
+
+def test_session_websocket(client: TestClient) -> None:
+    with client.websocket_connect("/api/meta-agent/sessions/ws") as websocket:
+        websocket.send_json({"message": "un agente"})
+        session = websocket.receive_json()
+        tokens = [websocket.receive_json(), websocket.receive_json()]
+        question = websocket.receive_json()
+
+        websocket.send_json({"message": "del cobre"})
+        for _ in tokens:
+            websocket.receive_json()
+        ready = websocket.receive_json()
+
+    assert session["type"] == "session"
+    assert [token["content"] for token in tokens] == ["¿Qué ", "fuentes?"]
+    assert question["type"] == "question"
+    assert ready["type"] == "ready"
+
+    # Retomar la sesión desde otra conexión
+    with client.websocket_connect("/api/meta-agent/sessions/ws") as websocket:
+        websocket.send_json({"session_id": session["session_id"], "action": "plan"})
+        resumed = websocket.receive_json()
+        plan = websocket.receive_json()
+
+    with client.websocket_connect("/api/meta-agent/sessions/ws") as websocket:
+        websocket.send_json({"session_id": "nope", "message": "hola"})
+        missing = websocket.receive_json()
+
+    assert (resumed["type"], resumed["turns"]) == ("session", 2)
+    assert plan["plan"]["nombre"] == "Cobre"
+    assert missing == {"type": "error", "error": "Sesión no encontrada o expirada"}
+
+
+def test_session_websocket_limits_each_turn(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from src.infrastructure.api import admission
+
+    limit = admission.RouteLimit("llm", r"/", max_concurrency=1, max_queue=0)
+    monkeypatch.setattr(admission, "_route_limits", [limit])
+
+    with client.websocket_connect("/api/meta-agent/sessions/ws") as websocket:
+        # La conexión inactiva no ocupa lugar
+        websocket.send_json({"message": "un agente"})
+        for _ in range(4):
+            websocket.receive_json()
+        assert limit.active == 0
+
+        asyncio.run(limit.acquire())
+        websocket.send_json({"message": "del cobre"})
+        rejected = websocket.receive_json()
+
+    assert rejected["type"] == "error"
+    assert rejected["retry_after"] >= 1
+    assert limit.stats()["admitted"] == 2
+
@@ -0,0 +1,93 @@
+"""Tests unitarios para la coalescencia single-flight."""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.api.single_flight import SingleFlight, canonical_key
+
+
+def test_canonical_key_ignores_dict_order() -> None:
+    assert canonical_key({"a": 1, "b": [1, 2]}, "python") == canonical_key(
+        {"b": [1, 2], "a": 1}, "python"
+    )
+    assert canonical_key({"a": 1}, "python") != canonical_key({"a": 1}, "spec")
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "resultado"
+
+    async def scenario():
+        results = await asyncio.gather(*(flight.do("k", work) for _ in range(5)))
+        # Una vez liberada la clave, una nueva solicitud vuelve a ejecutar
+        results.append(await flight.do("k", work))
+        return results
+
+    assert asyncio.run(scenario()) == ["resultado"] * 6
+    assert len(calls) == 2
+    assert flight.stats() == {"in_flight": 0, "executed": 2, "coalesced": 4, "cancelled": 0}
+
+
+def test_errors_are_shared_and_released() -> None:
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_caller_does_not_cancel_followers() -> None:
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == 42
+
+
+def test_work_is_cancelled_when_every_caller_leaves() -> None:
+    flight = SingleFlight()
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    async def scenario():
+        callers = [asyncio.create_task(flight.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.06)
+
+    asyncio.run(scenario())
+    assert finished == []
+    assert flight.stats()["cancelled"] == 1
+    assert flight.stats()["in_flight"] == 0
@@ -0,0 +1,74 @@
+"""Tests unitarios para las utilidades SSE."""
+
+import asyncio
+
+import pytest
+
+from src.infrastructure.api.sse import (
+    HEARTBEAT,
+    ReplayBuffer,
+    format_event,
+    parse_event_id,
+    wait_with_heartbeats,
+)
+
+
+def test_format_event_with_and_without_id() -> None:
+    assert format_event({"type": "start"}) == 'data: {"type":"start"}\n\n'
+    assert format_event({"a": "ñ"}, "s:1") == 'id: s:1\ndata: {"a":"ñ"}\n\n'
+
+
+def test_parse_event_id() -> None:
+    assert parse_event_id("abc:12") == ("abc", 12)
+    assert parse_event_id("abc") is None
+    assert parse_event_id("abc:x") is None
+    assert parse_event_id(None) is None
+
+
+def test_replay_returns_events_after_last_id() -> None:
+    buffer = ReplayBuffer()
+    stream_id = buffer.create()
+    frames = [buffer.emit(stream_id, seq, {"n": seq}) for seq in range(4)]
+
+    resumed = buffer.replay(f"{stream_id}:1")
+
+    assert resumed == (stream_id, 4, frames[2:], False)
+    # Regenerar un evento ya emitido reutiliza el frame original
+    assert buffer.emit(stream_id, 1, {"n": "otro"}) == frames[1]
+
+    buffer.finish(stream_id)
+    assert buffer.replay(f"{stream_id}:3") == (stream_id, 4, [], True)
+    assert buffer.replay("desconocido:0") is None
+    assert buffer.stats() == {"streams": 1, "frames": 4, "resumed": 2}
+
+
+def test_replay_buffer_is_bounded() -> None:
+    buffer = ReplayBuffer(max_streams=2, ttl_seconds=60)
+    first = buffer.create()
+    buffer.create()
+    buffer.create()
+
+    assert buffer.replay(f"{first}:0") is None
+    assert buffer.stats()["streams"] == 2
+
+
+def test_wait_with_heartbeats_until_task_is_done() -> None:
+    async def scenario():
+        task = asyncio.ensure_future(asyncio.sleep(0.05, result="listo"))
+        beats = [beat async for beat in wait_with_heartbeats(task, 0.01)]
+        return beats, task.result()
+
+    beats, result = asyncio.run(scenario())
+
+    assert beats and set(beats) == {HEARTBEAT}
+    assert result == "listo"
+
+
+def test_replay_rejects_other_request() -> None:
+    buffer = ReplayBuffer()
+    stream_id = buffer.create("plan-a")
+    buffer.emit(stream_id, 0, {"n": 0})
+
+    with pytest.raises(ValueError):
+        buffer.replay(f"{stream_id}:0", "plan-b")
+    assert buffer.replay(f"{stream_id}:0", "plan-a") == (stream_id, 1, [], False)
@@ -0,0 +1,156 @@
+"""Benchmark de memoria de /generate-stream con muchos clientes SSE concurrentes.
+
+Abre N conexiones en proceso contra la aplicación ASGI, las mantiene
+abiertas a la vez (el renderizado espera a que todas hayan recibido los
+primeros eventos) y mide con ``tracemalloc``:
+
+- memoria por conexión con todas abiertas
+- pico por conexión mientras se transmite el código
+- memoria retenida al terminar (acotada por el ReplayBuffer, no por N)
+
+Uso:
+    python tools/bench_sse_memory.py --clientes 500 2000 --chunk-size 512
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from fastapi import FastAPI
+
+from src.application.services.meta_agent import AgentPlan
+from src.infrastructure.api import meta_routes
+from src.infrastructure.api.sse import ReplayBuffer
+
+PLAN = {
+    "nombre": "Analista del Cobre",
+    "rol": "Analizar noticias y precios del cobre",
+    "herramientas": ["duckduckgo", "yfinance"],
+    "instrucciones": ["Cita las fuentes", "Resume en viñetas"],
+}
+
+# Eventos emitidos antes de renderizar (start y dos de progreso)
+EVENTS_BEFORE_RENDER = 3
+
+
+async def _client(app: FastAPI, body: bytes, ready: "asyncio.Queue[None]") -> int:
+    """Abre una conexión SSE y retorna los bytes recibidos."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/meta-agent/generate-stream",
+        "raw_path": b"/api/meta-agent/generate-stream",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    sent = {"request": False}
+    disconnected = asyncio.Event()
+    received = {"bytes": 0, "frames": 0}
+
+    async def receive():
+        if not sent["request"]:
+            sent["request"] = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] != "http.response.body":
+            return
+        received["bytes"] += len(message.get("body", b""))
+        received["frames"] += 1
+        if received["frames"] == EVENTS_BEFORE_RENDER:
+            ready.put_nowait(None)
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        disconnected.set()
+    return received["bytes"]
+
+
+async def run(clients: int, chunk_size: int) -> dict:
+    """Ejecuta el benchmark con ``clients`` conexiones concurrentes."""
+    code = meta_routes.render_agent(AgentPlan(**PLAN))
+    gate = asyncio.Event()
+
+    async def gated_render(plan, output_format="python"):
+        await gate.wait()
+        return code
+
+    meta_routes.render_agent_coalesced = gated_render
+    meta_routes.SSE_HEARTBEAT_SECONDS = 3600
+    meta_routes._stream_buffer = ReplayBuffer()
+
+    app = FastAPI()
+    app.include_router(meta_routes.router, prefix="/api/meta-agent")
+    body = json.dumps(
+        {"plan": PLAN, "options": {"save_to_file": False, "chunk_size": chunk_size}}
+    ).encode("utf-8")
+    ready: "asyncio.Queue[None]" = asyncio.Queue()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    tasks = [asyncio.ensure_future(_client(app, body, ready)) for _ in range(clients)]
+    for _ in range(clients):
+        await ready.get()
+    open_memory = tracemalloc.get_traced_memory()[0] - baseline
+
+    tracemalloc.reset_peak()
+    gate.set()
+    received = await asyncio.gather(*tasks)
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    del tasks
+    # Los ciclos de las conexiones terminadas no cuentan como memoria retenida
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    return {
+        "clients": clients,
+        "code_bytes": len(code),
+        "bytes_per_client": sum(received) // clients,
+        "open_per_client": open_memory // clients,
+        "peak_per_client": peak // clients,
+        "retained": retained,
+        "buffer": meta_routes._stream_buffer.stats(),
+    }
+
+
+def main() -> None:
+    """Ejecuta el benchmark para cada cantidad de clientes indicada."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clientes", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--chunk-size", type=int, default=8192)
+    args = parser.parse_args()
+
+    print(f"{'clientes':>9} {'abierta/cli':>12} {'pico/cli':>10} {'retenida':>10} {'streams':>8}")
+    for clients in args.clientes:
+        result = asyncio.run(run(clients, args.chunk_size))
+        print(
+            f"{result['clients']:>9} {result['open_per_client']:>11}B "
+            f"{result['peak_per_client']:>9}B {result['retained']:>9}B "
+            f"{result['buffer']['streams']:>8}"
+        )
+    print(f"código: {result['code_bytes']} bytes, recibido por cliente: {result['bytes_per_client']} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 """Script de ejemplo para probar el Meta-Agente.
 
-Genera un agente sencillo usando `MetaAgent` y guarda el resultado
-en `generated/agents/demo_web_research_agent.py`.
+Genera un agente sencillo usando `MetaAgent` y lo guarda en el
+almacenamiento de agentes generados (tenant por defecto).
 """
 
 from pathlib import Path
@@ -12,6 +12,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from src.application.services.meta_agent import AgentPlan, MetaAgent
+from src.infrastructure.storage.agent_files import save_agent_file
 
 
 def main() -> None:
@@ -37,13 +38,11 @@ def main() -> None:
     meta_agent = MetaAgent()
     code = meta_agent.generate_code(plan)
 
-    output_path = Path("generated/agents/demo_web_research_agent.py")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(code, encoding="utf-8")
+    _, filepath = save_agent_file(plan, code)
 
     print("Agente generado correctamente")
-    print(f"Archivo: {output_path.resolve()}")
-    print("Puedes ejecutarlo con: python generated/agents/demo_web_research_agent.py")
+    print(f"Archivo: {filepath}")
+    print(f"Puedes ejecutarlo con: python {filepath}")
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ if str(PROJECT_ROOT) not in sys.path:
     sys.path.append(str(PROJECT_ROOT))
 
 from src.application.services.meta_agent import AgentPlan, MetaAgent
+from src.infrastructure.storage.agent_files import save_agent_file
 
 
 def main() -> None:
@@ -36,12 +37,10 @@ def main() -> None:
     meta_agent = MetaAgent()
     code = meta_agent.generate_code(plan)
 
-    output_path = Path("generated/agents/supervisor_proyecto_ia_agent.py")
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(code, encoding="utf-8")
+    _, filepath = save_agent_file(plan, code)
 
     print("Agente con memoria creado (Supervisor de Proyecto)")
-    print(f"Archivo: {output_path.resolve()}")
+    print(f"Archivo: {filepath}")
 
 
 if __name__ == "__main__":